@@ -0,0 +1,294 @@
+"""
+Módulo de control de admisión.
+Limita la carga que acepta el servicio antes de ejecutar las rutas: un token
+bucket por cliente (API key configurada o IP) cobra cada petición según su tamaño, y un
+límite global de peticiones en curso rechaza el exceso de inmediato en vez
+de encolarlo, para que la latencia de las peticiones admitidas no colapse.
+Principio SOLID: Single Responsibility - Solo se encarga de admitir o rechazar peticiones.
+"""
+
+import json
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class TokenBuckets:
+    """
+    Token buckets por clave en arreglos float64 (tokens y último acceso por slot).
+
+    Un bucket que lleva inactivo el tiempo de rellenarse está lleno, igual que
+    uno nuevo, así que se puede descartar sin cambiar ninguna decisión: el
+    barrido periódico libera esos slots con una sola pasada vectorizada y el
+    tamaño queda acotado por los clientes activos en la ventana de relleno.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        sweep_interval: float = 10.0,
+        initial_slots: int = 1_024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("El ritmo debe ser mayor que cero y la ráfaga al menos 1")
+        self.rate = rate
+        self.burst = burst
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._tokens = np.empty(0, dtype=np.float64)
+        self._updated = np.empty(0, dtype=np.float64)
+        self._used = np.empty(0, dtype=bool)
+        self._free: List[int] = []
+        self._grow(initial_slots)
+        self._next_sweep = clock() + sweep_interval
+        self.sweeps = 0
+        self.swept = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _grow(self, size: int) -> None:
+        """Agrega `size` slots libres."""
+        start = len(self._keys)
+        self._keys.extend([None] * size)
+        self._tokens = np.concatenate((self._tokens, np.zeros(size)))
+        self._updated = np.concatenate((self._updated, np.zeros(size)))
+        self._used = np.concatenate((self._used, np.zeros(size, dtype=bool)))
+        # Se asignan primero los slots más bajos
+        self._free.extend(range(start + size - 1, start - 1, -1))
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Cobra `cost` tokens del bucket de `key`.
+        Un costo mayor que la ráfaga se limita a la ráfaga (vacía el bucket).
+
+        Returns:
+            0.0 si se admitió, o los segundos hasta tener tokens suficientes
+        """
+        now = self._clock()
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        cost = min(cost, self.burst)
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._free:
+                self._grow(len(self._keys))
+            slot = self._free.pop()
+            self._slots[key] = slot
+            self._keys[slot] = key
+            self._used[slot] = True
+            tokens = self.burst
+        else:
+            elapsed = now - self._updated[slot]
+            tokens = min(self.burst, self._tokens[slot] + elapsed * self.rate)
+
+        self._updated[slot] = now
+        if tokens < cost:
+            self._tokens[slot] = tokens
+            return (cost - tokens) / self.rate
+        self._tokens[slot] = tokens - cost
+        return 0.0
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Libera los buckets que ya se rellenaron por completo.
+
+        Returns:
+            La cantidad de buckets liberados
+        """
+        if now is None:
+            now = self._clock()
+        self._next_sweep = now + self.sweep_interval
+        self.sweeps += 1
+        if not self._slots:
+            return 0
+
+        full = self._tokens + (now - self._updated) * self.rate >= self.burst
+        released = np.flatnonzero(self._used & full)
+        self._used[released] = False
+        slots = released.tolist()
+        for slot in slots:
+            del self._slots[self._keys[slot]]
+            self._keys[slot] = None
+        self._free.extend(slots)
+        self.swept += len(slots)
+        return len(slots)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna la cantidad de clientes, slots reservados y barridos."""
+        return {
+            "clients": len(self._slots),
+            "slots": len(self._keys),
+            "sweeps": self.sweeps,
+            "swept": self.swept,
+        }
+
+
+class AdmissionController:
+    """
+    Decide si se admite una petición: primero el límite global de peticiones
+    en curso (503) y luego el token bucket del cliente (429).
+
+    El costo de una petición es 1 token más uno por cada `cost_bytes` de
+    cuerpo, de modo que un lote o una cadena grande consume la ráfaga del
+    cliente y no puede desplazar a las peticiones pequeñas de los demás.
+    Un cuerpo sin Content-Length (chunked) cuesta la ráfaga completa, porque
+    su tamaño no se conoce al admitirlo.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        rate: float = 50.0,
+        burst: float = 100.0,
+        max_concurrency: int = 64,
+        cost_bytes: int = 4_096,
+        sweep_interval: float = 10.0,
+    ):
+        if max_concurrency < 1 or cost_bytes < 1:
+            raise ValueError("La concurrencia y los bytes por token deben ser mayores que cero")
+        self.enabled = enabled
+        self.buckets = TokenBuckets(rate, burst, sweep_interval)
+        self.max_concurrency = max_concurrency
+        self.cost_bytes = cost_bytes
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+
+    def cost(self, content_length: Optional[int]) -> float:
+        """
+        Retorna el costo en tokens de una petición con cuerpo de `content_length`
+        bytes, o la ráfaga completa si el tamaño es desconocido (None).
+        """
+        if content_length is None:
+            return self.buckets.burst
+        return 1.0 + content_length // self.cost_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna los contadores de admisión y el estado de los buckets."""
+        return {
+            "enabled": self.enabled,
+            "rate": self.buckets.rate,
+            "burst": self.buckets.burst,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "overloaded": self.overloaded,
+            **self.buckets.stats(),
+        }
+
+
+async def reject(send: Send, status: int, detail: str, retry_after: float) -> None:
+    """Envía una respuesta de rechazo con el formato de error de la API y Retry-After."""
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI de control de admisión para las peticiones HTTP.
+
+    El cliente es la API key del header si es una de `api_keys`; cualquier
+    otro valor se ignora y el cliente es la IP (si no, inventar claves daría
+    un bucket nuevo en cada petición). Las peticiones OPTIONS (preflight de
+    CORS) no se cobran.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        header: str = "X-API-Key",
+        api_keys: Sequence[str] = (),
+        exempt_paths: Sequence[str] = ("/health", "/metrics"),
+    ):
+        self.app = app
+        self.controller = controller
+        self.header = header.lower().encode("latin-1")
+        self.api_keys = frozenset(key.encode("latin-1") for key in api_keys)
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = self.controller
+        if (
+            scope["type"] != "http"
+            or not controller.enabled
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if await self._rejected(scope, send):
+            return
+
+        controller.admitted += 1
+        controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
+
+    async def _rejected(self, scope: Scope, send: Send) -> bool:
+        """
+        Rechaza la petición si el servicio está saturado (503) o el cliente no
+        tiene tokens (429).
+
+        Returns:
+            True si se envió el rechazo
+        """
+        controller = self.controller
+        if controller.in_flight >= controller.max_concurrency:
+            controller.overloaded += 1
+            await reject(send, 503, "Servicio saturado, intente más tarde", 1.0)
+            return True
+
+        client, content_length = self._identify(scope)
+        wait = controller.buckets.acquire(client, controller.cost(content_length))
+        if wait:
+            controller.rate_limited += 1
+            await reject(send, 429, "Demasiadas peticiones, intente más tarde", wait)
+            return True
+        return False
+
+    def _identify(self, scope: Scope) -> Tuple[str, Optional[int]]:
+        """
+        Retorna el cliente de la petición y el tamaño del body según Content-Length
+        (None si el body es chunked y su tamaño no se conoce).
+        """
+        client = None
+        content_length: Optional[int] = 0
+        chunked = False
+        for name, value in scope["headers"]:
+            if name == self.header:
+                if value in self.api_keys:
+                    client = "key:" + value.decode("latin-1")
+            elif name == b"content-length" and value.isdigit():
+                content_length = int(value)
+            elif name == b"transfer-encoding":
+                chunked = True
+        if client is None:
+            address = scope.get("client")
+            client = "ip:" + (address[0] if address else "")
+        return client, None if chunked else content_length
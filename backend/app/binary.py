@@ -0,0 +1,143 @@
+"""
+Módulo de protocolo binario.
+Negocia el formato del cuerpo por Content-Type en los endpoints que lo admiten:
+MessagePack o un buffer de float64 little-endian con un arreglo de códigos de
+operador. Los números se leen sin copiar con NumPy (frombuffer).
+Principio SOLID: Open/Closed - Los endpoints JSON no cambian; el formato binario se
+agrega con un manejador registrado por ruta.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+import numpy as np
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+FLOAT64 = "application/x-float64"
+
+# Content-Type aceptados para cada formato binario
+MEDIA_TYPES = {
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    FLOAT64: FLOAT64,
+}
+
+# Bytes por elemento en el formato float64: num1 y num2 (8 + 8) y el código de operador (1)
+ITEM_BYTES = 17
+
+FLOAT64_LE = np.dtype("<f8")
+
+BinaryHandler = Callable[[Request, str], Awaitable[Response]]
+
+
+def media_type_of(content_type: str) -> str:
+    """Retorna el formato binario de un Content-Type, o "" si no es binario."""
+    return MEDIA_TYPES.get(content_type.split(";", 1)[0].strip().lower(), "")
+
+
+def decode_float64(body: bytes, table: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decodifica un lote en formato float64.
+
+    El cuerpo contiene n float64 de num1, n float64 de num2 y n bytes con el
+    código de cada operador (su posición en `table`).
+
+    Returns:
+        Tupla (num1, num2, operadores); num1 y num2 son vistas del cuerpo
+
+    Raises:
+        ValueError: Si el tamaño del cuerpo no es válido o un código no existe
+    """
+    size, remainder = divmod(len(body), ITEM_BYTES)
+    if size == 0 or remainder:
+        raise ValueError(f"El cuerpo debe tener {ITEM_BYTES} bytes por operación")
+    num1 = np.frombuffer(body, dtype=FLOAT64_LE, count=size)
+    num2 = np.frombuffer(body, dtype=FLOAT64_LE, count=size, offset=8 * size)
+    codes = np.frombuffer(body, dtype=np.uint8, count=size, offset=16 * size)
+    if int(codes.max()) >= len(table):
+        raise ValueError(f"Código de operador inválido (hay {len(table)} operaciones)")
+    operators = np.asarray(table, dtype=object)[codes]
+    return num1, num2, operators
+
+
+def encode_float64(results: np.ndarray, failed: np.ndarray) -> bytes:
+    """Codifica n resultados float64 seguidos de n bytes (1 si el elemento falló)."""
+    return results.astype(FLOAT64_LE, copy=False).tobytes() + failed.astype(np.uint8).tobytes()
+
+
+def float64_column(value: Any) -> np.ndarray:
+    """Convierte una columna de MessagePack (bin de float64 o lista) a un arreglo."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if len(value) % 8:
+            raise ValueError("Las columnas binarias deben tener 8 bytes por número")
+        return np.frombuffer(value, dtype=FLOAT64_LE)
+    if isinstance(value, list):
+        return np.asarray(value, dtype=np.float64)
+    raise ValueError("Las columnas deben ser una lista o un bin de float64")
+
+
+def unpack(body: bytes) -> Dict[str, Any]:
+    """
+    Decodifica un cuerpo MessagePack que debe ser un mapa con claves de texto.
+
+    Raises:
+        ValueError: Si MessagePack no está instalado o el cuerpo no es válido
+    """
+    if msgpack is None:
+        raise ValueError("MessagePack no está disponible (instale msgpack)")
+    try:
+        data = msgpack.unpackb(body, raw=False)
+    except Exception as e:
+        raise ValueError(f"MessagePack inválido: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("El cuerpo MessagePack debe ser un mapa")
+    if not all(isinstance(key, str) for key in data):
+        raise ValueError("Las claves del mapa MessagePack deben ser texto")
+    return data
+
+
+def pack(content: Any) -> bytes:
+    """Codifica un valor en MessagePack."""
+    return msgpack.packb(content, use_bin_type=True)
+
+
+class BinaryRoute(APIRoute):
+    """
+    APIRoute que atiende los cuerpos binarios con el manejador registrado para
+    su ruta; el resto de las peticiones sigue el camino JSON de FastAPI.
+    """
+
+    handlers: Dict[str, BinaryHandler] = {}
+
+    @classmethod
+    def register(cls, path: str) -> Callable[[BinaryHandler], BinaryHandler]:
+        """Decorador que registra el manejador binario de una ruta."""
+
+        def decorator(handler: BinaryHandler) -> BinaryHandler:
+            cls.handlers[path] = handler
+            return handler
+
+        return decorator
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        json_handler = super().get_route_handler()
+        path = self.path
+
+        async def handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type")
+            if content_type is not None:
+                media_type = media_type_of(content_type)
+                binary_handler = self.handlers.get(path) if media_type else None
+                if binary_handler is not None:
+                    return await binary_handler(request, media_type)
+            return await json_handler(request)
+
+        return handler
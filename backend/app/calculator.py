@@ -4,8 +4,129 @@ Implementa la lógica principal de la calculadora con operaciones en cadena.
 Principio SOLID: Single Responsibility
 """
 
-from typing import List, Dict, Any
-from .operations import OperationFactory, Operation
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import ResultCache
+from .coalescing import SingleFlight
+from .compiler import ChainCompiler, CompiledChain
+from .config import settings
+from .expressions import CompiledExpression, ExpressionCache, TemplateRegistry
+from .history import HistoryStore, create_history_store
+from .executor import OffloadExecutor
+from .metrics import MetricsRegistry, TimedHistoryStore
+from .numeric import NumericMode, create_numeric_modes
+from .reduction import StreamingReducer, check_reduction, reduce_chunk, reduce_values
+from .operations import OVERFLOW_MESSAGE, OperationFactory, check_finite, overflow_mask
+
+Step = Tuple[float, float, str, float]
+
+
+def _execute(num1: float, num2: float, operator: str) -> float:
+    """Ejecuta una operación con la instancia compartida del factory (resultado finito)."""
+    return check_finite(OperationFactory.create_operation(operator).execute(num1, num2))
+
+
+def run_steps(
+    num1: float,
+    steps: Sequence[Tuple[str, float]],
+    execute: Callable[[float, float, str], float] = _execute,
+) -> Tuple[float, List[Step], Optional[str]]:
+    """
+    Ejecuta pasos (operator, num2) a partir de num1 sin registrar nada.
+    Es una función pura para poder ejecutarla en otro proceso.
+
+    Returns:
+        Tupla (resultado, pasos ejecutados como (num1, num2, operator, result),
+        mensaje de error del paso que falló o None)
+    """
+    recorded: List[Step] = []
+    result = num1
+    try:
+        for operator, num2 in steps:
+            if operator is None or num2 is None:
+                raise ValueError("Cada operación debe tener 'operator' y 'num2'")
+
+            step_result = execute(result, num2, operator)
+            recorded.append((result, num2, operator, step_result))
+            result = step_result
+    except ValueError as e:
+        return result, recorded, str(e)
+    return result, recorded, None
+
+
+def run_steps_columns(
+    num1: float, steps: Sequence[Tuple[str, float]]
+) -> Tuple[float, Tuple[np.ndarray, np.ndarray, List[str], np.ndarray], Optional[str]]:
+    """
+    Igual que run_steps, pero retorna los pasos ejecutados como columnas
+    (num1, num2, operator, result) listas para HistoryStore.extend: se
+    transponen en el worker y los float64 se transfieren más rápido que tuplas.
+    """
+    result, recorded, error = run_steps(num1, steps)
+    a, b, ops, results = zip(*recorded) if recorded else ((), (), (), ())
+    columns = (
+        np.array(a, dtype=np.float64),
+        np.array(b, dtype=np.float64),
+        list(ops),
+        np.array(results, dtype=np.float64),
+    )
+    return result, columns, error
+
+
+def compute_batch(
+    a: np.ndarray, b: np.ndarray, ops: np.ndarray, metrics: Optional[MetricsRegistry] = None
+) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+    """
+    Evalúa un lote agrupando por operador con el kernel vectorizado de cada operación,
+    sin registrar nada. Es una función pura para poder ejecutarla en otro proceso.
+
+    Returns:
+        Tupla (resultados, máscara de elementos con error, errores como lista
+        de {'index', 'detail'} ordenada por índice)
+    """
+    results = np.empty(len(ops), dtype=np.float64)
+    failed = np.zeros(len(ops), dtype=bool)
+    errors: List[Dict[str, Any]] = []
+
+    for operator in set(ops):
+        indexes = np.flatnonzero(ops == operator)
+        start = time.perf_counter() if metrics is not None else 0.0
+        try:
+            operation = OperationFactory.create_operation(operator)
+        except ValueError as e:
+            failed[indexes] = True
+            errors.extend({"index": int(i), "detail": str(e)} for i in indexes)
+            continue
+        finally:
+            if metrics is not None:
+                created = time.perf_counter()
+                metrics.stage("create_operation").observe(created - start)
+
+        group_a, group_b = a[indexes], b[indexes]
+        results[indexes] = operation.execute_batch(group_a, group_b)
+        if metrics is not None:
+            metrics.stage("execute").observe(time.perf_counter() - created)
+
+        invalid = operation.invalid_mask(group_a, group_b)
+        if invalid is not None and invalid.any():
+            bad = indexes[invalid]
+            failed[bad] = True
+            message = operation.get_error_message()
+            errors.extend({"index": int(i), "detail": message} for i in bad)
+
+        overflow = overflow_mask(group_a, group_b, results[indexes])
+        if invalid is not None:
+            overflow &= ~invalid
+        if overflow.any():
+            bad = indexes[overflow]
+            failed[bad] = True
+            errors.extend({"index": int(i), "detail": OVERFLOW_MESSAGE} for i in bad)
+
+    errors.sort(key=lambda error: error["index"])
+    return results, failed, errors
 
 
 class Calculator:
@@ -14,9 +135,90 @@ class Calculator:
     Principio SOLID: Single Responsibility - Solo se encarga de ejecutar cálculos.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        history: Optional[HistoryStore] = None,
+        result_cache: Optional[ResultCache] = None,
+        cache_records_history: Optional[bool] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        executor: Optional[OffloadExecutor] = None,
+        single_flight: Optional[SingleFlight] = None,
+        coalesced_records_history: Optional[bool] = None,
+    ):
         self.operation_factory = OperationFactory()
-        self.history: List[Dict[str, Any]] = []
+        if history is None:
+            history = create_history_store(settings)
+
+        # Las etapas internas solo se miden si se entrega un registro de métricas
+        self.metrics = metrics
+        if metrics is not None:
+            history = TimedHistoryStore(history, metrics.stage("history_write"))
+        self.history: HistoryStore = history
+        # Pool de procesos opcional para las peticiones grandes (métodos *_async)
+        self.executor = executor
+        self.chain_compiler = ChainCompiler(settings.compiled_chain_cache_size)
+        self.expression_cache = ExpressionCache(settings.expression_cache_size)
+        self.templates = TemplateRegistry(settings.template_max_entries)
+        self.numeric_modes = create_numeric_modes(settings)
+
+        # Caché de resultados opcional (activada por configuración)
+        if result_cache is None and settings.result_cache_enabled:
+            result_cache = ResultCache(
+                settings.result_cache_max_entries, settings.result_cache_ttl_seconds
+            )
+        self.result_cache = result_cache
+        self.cache_records_history = (
+            settings.result_cache_record_history
+            if cache_records_history is None
+            else cache_records_history
+        )
+
+        # Coalescencia opcional de cadenas idénticas en curso (activada por configuración).
+        # Solo se comparten las cadenas que se ejecutan en el pool
+        if single_flight is None and settings.coalescing_enabled:
+            if executor is None:
+                raise ValueError(
+                    "La coalescencia de cadenas requiere el pool de procesos "
+                    "(CALCULADORA_OFFLOAD_ENABLED=true)"
+                )
+            single_flight = SingleFlight()
+        self.single_flight = single_flight
+        self.coalesced_records_history = (
+            settings.coalescing_record_history
+            if coalesced_records_history is None
+            else coalesced_records_history
+        )
+
+    def _execute(self, num1: float, num2: float, operator: str) -> float:
+        """
+        Ejecuta una operación sin registrarla en el historial.
+
+        Raises:
+            ValueError: Si la operación no es válida o el resultado no es finito
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return check_finite(
+                self.operation_factory.create_operation(operator).execute(num1, num2)
+            )
+
+        start = time.perf_counter()
+        try:
+            operation = self.operation_factory.create_operation(operator)
+        finally:
+            created = time.perf_counter()
+            metrics.stage("create_operation").observe(created - start)
+        try:
+            return check_finite(operation.execute(num1, num2))
+        finally:
+            metrics.stage("execute").observe(time.perf_counter() - created)
+
+    def _record_steps(self, steps: Sequence[Step]) -> None:
+        """Registra en el historial una secuencia de (num1, num2, operator, result)."""
+        if len(steps) == 1:
+            self.history.append(*steps[0])
+        elif steps:
+            self.history.extend(*zip(*steps))
 
     def calculate(self, num1: float, num2: float, operator: str) -> float:
         """
@@ -33,14 +235,44 @@ class Calculator:
         Raises:
             ValueError: Si la operación no es válida o si hay división por cero
         """
-        operation = self.operation_factory.create_operation(operator)
-        result = operation.execute(num1, num2)
+        cache = self.result_cache
+        if cache is not None:
+            # 10 y 10.0 generan la misma clave
+            key = (operator, num1, num2)
+            hit, result = cache.get(key)
+            if hit:
+                if self.cache_records_history:
+                    self.history.append(num1, num2, operator, result)
+                return result
+
+        try:
+            result = self._execute(num1, num2, operator)
+        except ValueError:
+            self.history.record_errors()
+            raise
 
         # Guardar en historial
-        self.history.append({"num1": num1, "num2": num2, "operator": operator, "result": result})
+        self.history.append(num1, num2, operator, result)
 
+        if cache is not None:
+            cache.put(key, result)
         return result
 
+    def calculate_numeric(
+        self, num1: float, num2: float, operator: str, numeric: str
+    ) -> Tuple[float, str]:
+        """
+        Realiza una operación simple en un modo numérico (float, decimal o fraction).
+
+        Returns:
+            Tupla (aproximación float del resultado, representación exacta)
+
+        Raises:
+            ValueError: Si el modo o la operación no son válidos o hay división por cero
+        """
+        mode = self._numeric_mode(numeric)
+        return self._calculate_steps_numeric(num1, [(operator, num2)], mode)
+
     def calculate_chain(self, operations: List[Dict[str, Any]]) -> float:
         """
         Realiza operaciones en cadena.
@@ -60,6 +292,18 @@ class Calculator:
             ]
             Resultado: ((10 + 5) * 2) - 3 = 27
         """
+        return self._calculate_steps(*self._chain_steps(operations))
+
+    async def calculate_chain_async(self, operations: List[Dict[str, Any]]) -> float:
+        """
+        Igual que calculate_chain, pero las cadenas de al menos
+        executor.threshold pasos se ejecutan en el pool de procesos.
+        """
+        return await self._calculate_steps_async(*self._chain_steps(operations))
+
+    @staticmethod
+    def _chain_steps(operations: List[Dict[str, Any]]) -> Tuple[float, List[Tuple[str, float]]]:
+        """Valida una cadena y retorna (num1, pasos como (operator, num2))."""
         if not operations:
             raise ValueError("Se requiere al menos una operación")
 
@@ -68,25 +312,579 @@ class Calculator:
         if "num1" not in first_op:
             raise ValueError("La primera operación debe incluir 'num1'")
 
-        result = self.calculate(first_op["num1"], first_op["num2"], first_op["operator"])
+        steps = [(op.get("operator"), op.get("num2")) for op in operations]
+        return first_op["num1"], steps
 
-        # Continuar con las operaciones en cadena
-        for op in operations[1:]:
-            if "operator" not in op or "num2" not in op:
-                raise ValueError("Cada operación debe tener 'operator' y 'num2'")
+    def calculate_chain_numeric(
+        self, operations: List[Dict[str, Any]], numeric: str
+    ) -> Tuple[float, str]:
+        """
+        Realiza operaciones en cadena en un modo numérico (float, decimal o fraction).
+        El resultado intermedio se mantiene en el tipo del modo entre pasos.
+
+        Returns:
+            Tupla (aproximación float del resultado, representación exacta)
+        """
+        num1, steps = self._chain_steps(operations)
+        mode = self._numeric_mode(numeric)
+        return self._calculate_steps_numeric(num1, steps, mode)
+
+    def _numeric_mode(self, numeric: str) -> NumericMode:
+        """Retorna el modo numérico por nombre."""
+        mode = self.numeric_modes.get(numeric)
+        if mode is None:
+            raise ValueError(f"Modo numérico no soportado: {numeric}")
+        return mode
+
+    def _calculate_steps_numeric(
+        self, num1: float, steps: Sequence[Tuple[str, float]], mode: NumericMode
+    ) -> Tuple[float, str]:
+        """
+        Ejecuta pasos (operator, num2) con los números convertidos al modo.
+        El historial guarda la aproximación float de cada paso; no usa la caché.
+        """
+        recorded: List[Tuple[float, float, str, float]] = []
+        try:
+            with mode.context():
+                result = mode.convert(num1)
+                approximation = mode.to_float(result)
+                for operator, num2 in steps:
+                    if operator is None or num2 is None:
+                        raise ValueError("Cada operación debe tener 'operator' y 'num2'")
+
+                    step_result = mode.check(self._execute(result, mode.convert(num2), operator))
+                    step_approximation = mode.to_float(step_result)
+                    recorded.append((approximation, num2, operator, step_approximation))
+                    result, approximation = step_result, step_approximation
+                exact = mode.format(result)
+        except ValueError:
+            self.history.record_errors()
+            raise
+        finally:
+            self._record_steps(recorded)
+        return approximation, exact
+
+    def calculate_chain_compact(
+        self, num1: float, operators: Sequence[str], operands: Sequence[float]
+    ) -> float:
+        """
+        Realiza operaciones en cadena a partir de arreglos paralelos,
+        sin construir un diccionario por paso.
+
+        Args:
+            num1: Número inicial
+            operators: Operador de cada paso
+            operands: Segundo número de cada paso
+
+        Returns:
+            El resultado final de todas las operaciones
+
+        Raises:
+            ValueError: Si no hay pasos, los arreglos tienen distinta longitud,
+                        un operador no es válido o hay división por cero
+        """
+        return self._calculate_steps(num1, self._compact_steps(operators, operands))
+
+    async def calculate_chain_compact_async(
+        self, num1: float, operators: Sequence[str], operands: Sequence[float]
+    ) -> float:
+        """
+        Igual que calculate_chain_compact, pero las cadenas de al menos
+        executor.threshold pasos se ejecutan en el pool de procesos.
+        """
+        return await self._calculate_steps_async(num1, self._compact_steps(operators, operands))
+
+    @staticmethod
+    def _compact_steps(
+        operators: Sequence[str], operands: Sequence[float]
+    ) -> List[Tuple[str, float]]:
+        """Valida los arreglos paralelos de una cadena y retorna los pasos."""
+        if not operators:
+            raise ValueError("Se requiere al menos una operación")
+        if len(operators) != len(operands):
+            raise ValueError("operators y operands deben tener la misma longitud")
+        return list(zip(operators, operands))
+
+    def _calculate_steps(self, num1: float, steps: Sequence[Tuple[str, float]]) -> float:
+        """Ejecuta pasos (operator, num2) a partir de num1, con caché e historial."""
+        key, hit, result = self._cached_steps(num1, steps)
+        if hit:
+            return result
+
+        result, recorded, error = run_steps(num1, steps, self._execute)
+        # Cada paso se guarda en historial, incluso si un paso posterior falla
+        self._record_steps(recorded)
+        return self._finish_steps(key, result, recorded, error)
+
+    async def _calculate_steps_async(
+        self, num1: float, steps: Sequence[Tuple[str, float]]
+    ) -> float:
+        """
+        Igual que _calculate_steps, ejecutando los pasos en el pool si son muchos.
+
+        Solo las cadenas que van al pool se comparten entre peticiones idénticas:
+        las que quedan bajo el umbral corren en línea sin ceder el event loop, por
+        lo que nunca hay dos en curso a la vez.
+        """
+        if not self._offloads(len(steps)):
+            return self._calculate_steps(num1, steps)
+        key, hit, result = self._cached_steps(num1, steps)
+        if hit:
+            return result
+
+        # La caché y el historial quedan en este proceso; el worker solo calcula
+        flight = self.single_flight
+        shared = False
+        if flight is None:
+            outcome = await self.executor.run(run_steps_columns, num1, steps)
+        else:
+            # Las cadenas idénticas en curso comparten el cálculo (misma clave que la caché)
+            outcome, shared = await flight.run(
+                (num1,) + tuple(steps) if key is None else key,
+                lambda: self.executor.run(run_steps_columns, num1, steps),
+            )
+        result, columns, error = outcome
+
+        if shared:
+            # Otra petición que recibió este resultado ya lo registró y lo guardó en la caché
+            key = None
+            if not self.coalesced_records_history:
+                if error is not None:
+                    raise ValueError(error)
+                return result
+        if len(columns[3]):
+            self.history.extend(*columns)
+        recorded: Sequence[Step] = ()
+        if key is not None:
+            num1s, num2s, operators, results = columns
+            recorded = tuple(zip(num1s.tolist(), num2s.tolist(), operators, results.tolist()))
+        return self._finish_steps(key, result, recorded, error)
+
+    def _cached_steps(
+        self, num1: float, steps: Sequence[Tuple[str, float]]
+    ) -> Tuple[Optional[Tuple[Any, ...]], bool, float]:
+        """
+        Busca una cadena en la caché de resultados.
+
+        Returns:
+            Tupla (clave en la caché o None si no hay caché, si hubo acierto, resultado)
+        """
+        cache = self.result_cache
+        if cache is None:
+            return None, False, 0.0
+        key = (num1,) + tuple(steps)
+        hit, cached = cache.get(key)
+        if not hit:
+            return key, False, 0.0
+        result, recorded = cached
+        if self.cache_records_history:
+            self._record_steps(recorded)
+        return key, True, result
+
+    def _finish_steps(
+        self,
+        key: Optional[Tuple[Any, ...]],
+        result: float,
+        recorded: Sequence[Step],
+        error: Optional[str],
+    ) -> float:
+        """Guarda el resultado de pasos ya registrados en la caché (o lanza el error del paso)."""
+        if error is not None:
+            self.history.record_errors()
+            raise ValueError(error)
+
+        if key is not None:
+            self.result_cache.put(key, (result, tuple(recorded)))
+        return result
+
+    def _offloads(self, size: int) -> bool:
+        """Indica si una petición de `size` elementos se ejecuta en el pool de procesos."""
+        executor = self.executor
+        return executor is not None and executor.offloads(size)
+
+    def compile_chain(self, operations: List[Dict[str, Any]]) -> CompiledChain:
+        """
+        Compila una cadena de operaciones para ejecutarla varias veces
+        cambiando solo el número inicial.
+
+        Args:
+            operations: Lista de diccionarios con 'operator' y 'num2'
+                        (el 'num1' de la primera operación se ignora)
+
+        Returns:
+            La cadena compilada (cacheada por su forma)
+        """
+        return self.chain_compiler.compile(operations)
+
+    def get_compiled_chain(self, chain_id: str) -> Optional[CompiledChain]:
+        """Retorna una cadena compilada por su identificador, o None si no existe."""
+        return self.chain_compiler.get(chain_id)
+
+    def run_compiled_chain(self, compiled: CompiledChain, num1: float) -> float:
+        """
+        Ejecuta una cadena compilada a partir de num1.
 
-            result = self.calculate(result, op["num2"], op["operator"])
+        A diferencia de calculate_chain, registra una sola entrada en el historial
+        con el operador "chain" y la cantidad de pasos como num2.
 
+        Raises:
+            ValueError: Si algún paso no es válido (p. ej. división por cero)
+        """
+        try:
+            result = compiled(num1)
+        except ValueError:
+            self.history.record_errors()
+            raise
+        self.history.append(num1, len(compiled.source_steps), "chain", result)
+        return result
+
+    def evaluate(self, expression: str, variables: Optional[Dict[str, float]] = None) -> float:
+        """
+        Evalúa una expresión aritmética con precedencia y paréntesis.
+
+        La expresión se analiza y compila una sola vez (caché LRU por texto);
+        las siguientes evaluaciones solo cambian los valores de las variables.
+        No se registra en el historial.
+
+        Args:
+            expression: Expresión, p. ej. "(x + 5) * 2 - 3"
+            variables: Valores de las variables usadas en la expresión
+
+        Returns:
+            El resultado de la expresión
+
+        Raises:
+            ValueError: Si la expresión no es válida, falta una variable
+                        o hay división por cero
+        """
+        compiled = self.expression_cache.get(expression)
+        return compiled.evaluate(variables or {})
+
+    def register_template(self, expression: str) -> Tuple[str, CompiledExpression]:
+        """
+        Registra una plantilla de fórmula con variables (p. ej. "price * qty - discount").
+
+        Returns:
+            Tupla (identificador, plantilla compilada)
+
+        Raises:
+            ValueError: Si la expresión no es válida
+        """
+        return self.templates.register(expression)
+
+    def get_template(self, template_id: str) -> Optional[CompiledExpression]:
+        """Retorna una plantilla por su identificador, o None si no existe."""
+        return self.templates.get(template_id)
+
+    def evaluate_template(
+        self, template: CompiledExpression, bindings: Dict[str, Sequence[float]]
+    ) -> Dict[str, Any]:
+        """
+        Evalúa una plantilla sobre columnas de valores, una fila por elemento.
+
+        La evaluación es vectorizada sobre todas las filas. Los errores
+        (p. ej. división por cero) se reportan por fila. No se registra en el historial.
+
+        Args:
+            template: Plantilla registrada
+            bindings: Columna de valores por cada variable de la plantilla
+
+        Returns:
+            Diccionario con 'results' (None en las filas con error) y 'errors'
+
+        Raises:
+            ValueError: Si falta una variable o las columnas tienen distinta longitud
+        """
+        missing = sorted(template.variables - bindings.keys())
+        if missing:
+            raise ValueError(f"Faltan valores para: {', '.join(missing)}")
+        columns = {
+            name: np.asarray(bindings[name], dtype=np.float64) for name in template.variables
+        }
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError("Todas las columnas deben tener la misma longitud")
+        size = sizes.pop() if sizes else 1
+
+        results, errors = template.evaluate_vector(columns, size)
+        output: List[Any] = np.broadcast_to(results, (size,)).tolist()
+        error_list = errors.as_list()
+        for error in error_list:
+            output[error["index"]] = None
+        return {"results": output, "errors": error_list}
+
+    def calculate_batch(
+        self, num1: Sequence[float], num2: Sequence[float], operators: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        Realiza operaciones independientes en lote a partir de arreglos columnares.
+
+        Los elementos se agrupan por operador y cada grupo se evalúa con el
+        kernel vectorizado de su operación. Los errores (p. ej. división por
+        cero) se reportan por elemento sin interrumpir el resto del lote.
+
+        Args:
+            num1: Primeros números
+            num2: Segundos números
+            operators: Operador de cada elemento
+
+        Returns:
+            Diccionario con 'results' (None en los elementos con error)
+            y 'errors' (lista de {'index', 'detail'})
+
+        Raises:
+            ValueError: Si los arreglos no tienen la misma longitud
+        """
+        results, _, errors = self.calculate_batch_arrays(
+            *self._batch_columns(num1, num2, operators)
+        )
+        return self._batch_output(results, errors)
+
+    async def calculate_batch_async(
+        self, num1: Sequence[float], num2: Sequence[float], operators: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        Igual que calculate_batch, pero los lotes de al menos executor.threshold
+        elementos se dividen en bloques que se evalúan en el pool de procesos.
+        """
+        results, _, errors = await self.calculate_batch_arrays_async(
+            *self._batch_columns(num1, num2, operators)
+        )
+        return self._batch_output(results, errors)
+
+    @staticmethod
+    def _batch_columns(
+        num1: Sequence[float], num2: Sequence[float], operators: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Valida las longitudes de un lote y lo convierte a arreglos de NumPy."""
+        size = len(operators)
+        if len(num1) != size or len(num2) != size:
+            raise ValueError("num1, num2 y operator deben tener la misma longitud")
+        return (
+            np.asarray(num1, dtype=np.float64),
+            np.asarray(num2, dtype=np.float64),
+            np.asarray(operators, dtype=object),
+        )
+
+    @staticmethod
+    def _batch_output(results: np.ndarray, errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Construye la respuesta de un lote con None en los elementos con error."""
+        output: List[Any] = results.tolist()
+        for error in errors:
+            output[error["index"]] = None
+
+        return {"results": output, "errors": errors}
+
+    def calculate_batch_arrays(
+        self, a: np.ndarray, b: np.ndarray, ops: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Realiza operaciones en lote sobre arreglos de NumPy, sin convertir
+        los números a objetos de Python (p. ej. desde un buffer binario).
+
+        Args:
+            a: Primeros números (float64)
+            b: Segundos números (float64)
+            ops: Operador de cada elemento (arreglo de objetos str)
+
+        Returns:
+            Tupla (resultados con NaN en los elementos con error, máscara de
+            elementos con error, errores como lista de {'index', 'detail'})
+
+        Raises:
+            ValueError: Si los arreglos no tienen la misma longitud
+        """
+        self._check_batch_arrays(a, b, ops)
+        results, failed, errors = compute_batch(a, b, ops, self.metrics)
+        return self._finish_batch(a, b, ops, results, failed, errors)
+
+    async def calculate_batch_arrays_async(
+        self, a: np.ndarray, b: np.ndarray, ops: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Igual que calculate_batch_arrays, pero los lotes de al menos
+        executor.threshold elementos se dividen en bloques de executor.chunk_size
+        que se evalúan en paralelo en el pool de procesos.
+        """
+        self._check_batch_arrays(a, b, ops)
+        if not self._offloads(len(ops)):
+            return self.calculate_batch_arrays(a, b, ops)
+
+        parts = await self.executor.map_chunks(compute_batch, (a, b, ops))
+        results = np.concatenate([part[0] for _, part in parts])
+        failed = np.concatenate([part[1] for _, part in parts])
+        # Los índices de error de cada bloque son relativos a su inicio
+        errors = [
+            {"index": offset + error["index"], "detail": error["detail"]}
+            for offset, part in parts
+            for error in part[2]
+        ]
+        return self._finish_batch(a, b, ops, results, failed, errors)
+
+    @staticmethod
+    def _check_batch_arrays(a: np.ndarray, b: np.ndarray, ops: np.ndarray) -> None:
+        """Verifica que los arreglos de un lote tengan la misma longitud."""
+        size = len(ops)
+        if len(a) != size or len(b) != size:
+            raise ValueError("num1, num2 y operator deben tener la misma longitud")
+
+    def _finish_batch(
+        self,
+        a: np.ndarray,
+        b: np.ndarray,
+        ops: np.ndarray,
+        results: np.ndarray,
+        failed: np.ndarray,
+        errors: List[Dict[str, Any]],
+    ) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """Registra un lote evaluado en el historial y marca con NaN los elementos con error."""
+        ok = ~failed
+
+        # Guardar en historial solo los elementos exitosos
+        self.history.extend(a[ok], b[ok], ops[ok], results[ok])
+        if errors:
+            self.history.record_errors(len(errors))
+
+        results[failed] = np.nan
+        return results, failed, errors
+
+    def reduce(
+        self,
+        values: Sequence[float],
+        operation: str,
+        percentile: Optional[float] = None,
+        ddof: int = 0,
+    ) -> float:
+        """
+        Reduce un arreglo de valores a un solo número (sum, product, mean, min,
+        max, variance o percentile), por bloques de settings.reduce_chunk_size.
+
+        Registra una sola entrada en el historial con la reducción como operador,
+        la cantidad de valores como num1 y el percentil (o 0) como num2.
+
+        Raises:
+            ValueError: Si la reducción o sus parámetros no son válidos,
+                        no hay valores o hay valores no finitos
+        """
+        array = np.asarray(values, dtype=np.float64)
+        try:
+            result = reduce_values(array, operation, percentile, ddof, settings.reduce_chunk_size)
+        except ValueError:
+            self.history.record_errors()
+            raise
+        self.history.append(len(array), percentile or 0.0, operation, result)
+        return result
+
+    async def reduce_async(
+        self,
+        values: Sequence[float],
+        operation: str,
+        percentile: Optional[float] = None,
+        ddof: int = 0,
+    ) -> float:
+        """
+        Igual que reduce, pero los arreglos de al menos executor.threshold valores
+        se reducen en el pool de procesos: cada bloque de executor.chunk_size en
+        un worker y los reductores parciales se combinan aquí. El percentil
+        necesita todos los valores y se calcula en un solo worker.
+        """
+        array = np.asarray(values, dtype=np.float64)
+        if not self._offloads(len(array)):
+            return self.reduce(array, operation, percentile, ddof)
+
+        chunk_size = settings.reduce_chunk_size
+        try:
+            check_reduction(operation, percentile, ddof)
+            if operation == "percentile":
+                run = self.executor.run
+                result = await run(reduce_values, array, operation, percentile, ddof, chunk_size)
+            else:
+                parts = await self.executor.map_chunks(
+                    reduce_chunk, (array,), operation, chunk_size
+                )
+                reducer = StreamingReducer(operation)
+                for _, part in parts:
+                    reducer.merge(part)
+                result = reducer.result(ddof)
+        except ValueError:
+            self.history.record_errors()
+            raise
+        self.history.append(len(array), percentile or 0.0, operation, result)
         return result
 
-    def get_history(self) -> List[Dict[str, Any]]:
-        """Retorna el historial de operaciones."""
-        return self.history.copy()
+    def get_history(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna una ventana del historial de operaciones (de la más antigua a la más reciente).
+
+        Args:
+            offset: Cantidad de operaciones a omitir
+            limit: Máximo de operaciones a retornar (None para todas)
+        """
+        return self.history.get_page(offset, limit)
+
+    def query_history(
+        self, offset: int = 0, limit: Optional[int] = None, **filters: Any
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Retorna una ventana de las operaciones que cumplen los filtros
+        (operator, min_result, max_result, since, until).
+
+        Returns:
+            Tupla (ventana de operaciones, total de coincidencias)
+
+        Raises:
+            ValueError: Si el historial configurado no admite filtros
+        """
+        return self.history.query(offset, limit, **filters)
+
+    def get_history_stats(self) -> Dict[str, Any]:
+        """
+        Retorna los agregados del historial, mantenidos al agregar y descartar operaciones.
+
+        Raises:
+            ValueError: Si el historial configurado no mantiene estadísticas
+        """
+        return self.history.stats()
+
+    def get_history_count(self) -> int:
+        """Retorna la cantidad de operaciones en el historial."""
+        return len(self.history)
 
     def clear_history(self) -> None:
         """Limpia el historial de operaciones."""
         self.history.clear()
 
+    def close(self) -> None:
+        """Libera los recursos del historial (p. ej. confirma el log en disco)."""
+        self.history.close()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Retorna los contadores de la caché de resultados."""
+        if self.result_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.result_cache.stats()}
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores de la coalescencia de cadenas en curso.
+        `active` es False si no hay pool de procesos iniciado (nada se comparte).
+        """
+        if self.single_flight is None:
+            return {"enabled": False}
+        active = self.executor is not None and self.executor.running
+        return {"enabled": True, "active": active, **self.single_flight.stats()}
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Retorna la cola y la utilización del pool de procesos."""
+        if self.executor is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.executor.stats()}
+
+    def clear_cache(self) -> None:
+        """Limpia la caché de resultados (si está activada)."""
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
     def get_supported_operations(self) -> List[str]:
         """Retorna las operaciones soportadas."""
         return self.operation_factory.get_supported_operations()
@@ -0,0 +1,97 @@
+"""
+Módulo de coalescencia de peticiones (single-flight).
+Las peticiones concurrentes con la misma clave comparten un solo cálculo en
+curso: la primera (líder) lo inicia en una tarea de asyncio y todas esperan
+esa tarea en vez de repetir el cálculo.
+Principio SOLID: Single Responsibility - Solo se encarga de compartir cálculos en curso.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """Cálculo en curso: la tarea compartida y las peticiones que la esperan."""
+
+    __slots__ = ("task", "waiters", "claimed")
+
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+        self.claimed = False
+
+
+class SingleFlight:
+    """
+    Registro de cálculos en curso por clave.
+
+    Solo se comparten cálculos que están en curso: al terminar, la clave se
+    libera y la siguiente petición calcula de nuevo (la memorización entre
+    peticiones es tarea de la caché de resultados). El cálculo corre en su
+    propia tarea, así que cancelar la petición que lo inició no cancela a las
+    demás; solo se cancela cuando ya no queda ninguna esperándolo. Se usa desde
+    un solo event loop, por lo que no necesita lock.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Ejecuta compute() o espera el cálculo en curso con la misma clave.
+
+        Returns:
+            Tupla (resultado, shared). shared es False para una sola de las
+            peticiones que reciben el resultado (la primera en retomarse, en
+            general la que inició el cálculo) y True para las demás, que pueden
+            omitir el trabajo que ya hizo aquella (p. ej. registrar el historial)
+
+        Raises:
+            Cualquier excepción de compute(), en todas las peticiones que lo esperan
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(compute()))
+            flight.task.add_done_callback(lambda task: self._release(key, flight))
+            self._flights[key] = flight
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            # shield: cancelar una petición no cancela la tarea compartida
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nadie más espera el resultado: se cancela y la clave queda libre
+                flight.task.cancel()
+                self._release(key, flight)
+        shared, flight.claimed = flight.claimed, True
+        return result, shared
+
+    def _release(self, key: Hashable, flight: _Flight) -> None:
+        """Libera la clave si sigue asociada a este cálculo."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.done() and not flight.task.cancelled():
+            # Marca la excepción como leída aunque nadie la espere
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna los cálculos en curso, los ejecutados y las peticiones que los compartieron."""
+        requests = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / requests if requests else 0.0,
+        }
@@ -0,0 +1,201 @@
+"""
+Módulo de compilación de operaciones en cadena.
+Convierte una cadena de operaciones en un programa plano y reutilizable que se
+ejecuta con una sola llamada, cambiando solo el número inicial.
+Principio SOLID: Single Responsibility - Solo se encarga de compilar y cachear cadenas.
+"""
+
+import hashlib
+import math
+import re
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .operations import OVERFLOW_MESSAGE, OperationFactory, check_finite
+
+Step = Tuple[str, float]
+
+# Número con signo opcional, decimales y exponente (p. ej. -2, 1.5, .5, 1e-3)
+_NUMBER = r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+def parse_packed_chain(chain: str) -> Tuple[List[str], List[float]]:
+    """
+    Convierte una cadena empaquetada como "+5*2-3" en arreglos paralelos.
+
+    Cada paso es un operador soportado seguido de un número; se permiten
+    espacios entre pasos. Los operadores más largos se prueban primero.
+
+    Returns:
+        Tupla (operadores, operandos)
+
+    Raises:
+        ValueError: Si la cadena está vacía o tiene un paso inválido
+    """
+    symbols = sorted(OperationFactory.get_supported_operations(), key=len, reverse=True)
+    step = re.compile(r"\s*(%s)\s*(%s)" % ("|".join(map(re.escape, symbols)), _NUMBER))
+    text = chain.rstrip()
+    operators: List[str] = []
+    operands: List[float] = []
+    position = 0
+    while position < len(text):
+        match = step.match(text, position)
+        if match is None:
+            raise ValueError(f"Paso inválido en la posición {position}: {text[position:]!r}")
+        operand = float(match.group(2))
+        if not math.isfinite(operand):
+            raise ValueError(f"Número fuera de rango en la posición {position}: {OVERFLOW_MESSAGE}")
+        operators.append(match.group(1))
+        operands.append(operand)
+        position = match.end()
+    if not operators:
+        raise ValueError("Se requiere al menos una operación")
+    return operators, operands
+
+
+def _scales_up(operator: str, operand: float) -> bool:
+    """
+    Indica si el paso multiplica por ±2^k con k >= 0 (`*2`, `*-8`, `/0.5`).
+    Estos pasos son exactos salvo que desborden, y entonces desbordan igual
+    aplicados uno a uno o combinados.
+    """
+    if operator not in ("*", "/") or not math.isfinite(operand) or operand == 0:
+        return False
+    mantissa, exponent = math.frexp(abs(operand))
+    return mantissa == 0.5 and ((exponent >= 1) if operator == "*" else (exponent <= 1))
+
+
+def _exact_product(a: float, b: float) -> Optional[float]:
+    """Retorna a * b si el producto es exacto en punto flotante, o None."""
+    product = a * b
+    if not math.isfinite(product):
+        return None
+    return product if Fraction(a) * Fraction(b) == Fraction(product) else None
+
+
+def fold_steps(steps: Sequence[Step]) -> List[Step]:
+    """
+    Combina constantes de pasos consecutivos solo cuando el resultado es
+    idéntico para cualquier num1.
+
+    `*2, *4` se convierte en `*8` y `/0.5, /0.25` en `/0.125`: multiplicar por
+    potencias de dos mayores o iguales que 1 es exacto. Las sumas y los demás
+    productos no se combinan porque cada paso redondea (`+1, +1` no equivale a
+    `+2` para 1e16, ni `*3, *7` a `*21`) y al reducir la escala se redondea en
+    el rango subnormal.
+
+    Args:
+        steps: Pasos (operador, operando) en orden de ejecución
+
+    Returns:
+        Lista de pasos equivalente, posiblemente más corta
+    """
+    folded: List[Step] = []
+    for operator, operand in steps:
+        if folded and operator == folded[-1][0] and _scales_up(operator, operand):
+            previous = folded[-1][1]
+            if _scales_up(operator, previous):
+                combined = _exact_product(previous, operand)
+                if combined is not None:
+                    folded[-1] = (operator, combined)
+                    continue
+        folded.append((operator, operand))
+    return folded
+
+
+class CompiledChain:
+    """
+    Cadena de operaciones compilada.
+    Guarda un programa plano de (función, operando) que se ejecuta sobre num1.
+    """
+
+    def __init__(self, chain_id: str, source_steps: Sequence[Step], steps: Sequence[Step]):
+        self.chain_id = chain_id
+        self.source_steps = list(source_steps)
+        self.steps = list(steps)
+        self._program: List[Tuple[Callable[[float, float], float], float]] = [
+            (OperationFactory.create_operation(operator).execute, operand)
+            for operator, operand in self.steps
+        ]
+
+    def __call__(self, num1: float) -> float:
+        """
+        Ejecuta el programa compilado a partir de num1.
+
+        Raises:
+            ValueError: Si algún paso no es válido o su resultado no es finito
+        """
+        result = num1
+        for execute, operand in self._program:
+            result = check_finite(execute(result, operand))
+        return result
+
+
+class ChainCompiler:
+    """
+    Compila cadenas de operaciones y las cachea por su forma
+    (la secuencia de operadores y operandos, sin el número inicial).
+    Patrón de diseño: Flyweight - Cadenas con la misma forma comparten el programa.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._compiled: "OrderedDict[str, CompiledChain]" = OrderedDict()
+
+    @staticmethod
+    def chain_id(steps: Sequence[Step]) -> str:
+        """Retorna el identificador estable de la forma de una cadena."""
+        return hashlib.sha1(repr(list(steps)).encode()).hexdigest()[:16]
+
+    def compile(self, operations: Sequence[Dict[str, Any]]) -> CompiledChain:
+        """
+        Compila (o recupera de la caché) una cadena de operaciones.
+
+        Args:
+            operations: Lista de diccionarios con 'operator' y 'num2'.
+                        El 'num1' de la primera operación se ignora.
+
+        Returns:
+            La cadena compilada
+
+        Raises:
+            ValueError: Si la cadena está vacía, un paso está incompleto
+                        o el operador no es válido
+        """
+        if not operations:
+            raise ValueError("Se requiere al menos una operación")
+
+        steps: List[Step] = []
+        for op in operations:
+            if "operator" not in op or "num2" not in op:
+                raise ValueError("Cada operación debe tener 'operator' y 'num2'")
+            operator, operand = op["operator"], float(op["num2"])
+            OperationFactory.create_operation(operator)
+            steps.append((operator, operand))
+
+        chain_id = self.chain_id(steps)
+        compiled = self._compiled.get(chain_id)
+        if compiled is not None:
+            self._compiled.move_to_end(chain_id)
+            return compiled
+
+        compiled = CompiledChain(chain_id, steps, fold_steps(steps))
+        self._compiled[chain_id] = compiled
+        if len(self._compiled) > self.max_entries:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def get(self, chain_id: str) -> Optional[CompiledChain]:
+        """Retorna la cadena compilada con ese identificador, o None si no existe."""
+        compiled = self._compiled.get(chain_id)
+        if compiled is not None:
+            self._compiled.move_to_end(chain_id)
+        return compiled
+
+    def clear(self) -> None:
+        """Elimina todas las cadenas compiladas."""
+        self._compiled.clear()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
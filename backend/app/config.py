@@ -0,0 +1,174 @@
+"""
+Configuración de la aplicación.
+Los valores se pueden sobrescribir con variables de entorno con prefijo CALCULADORA_
+(por ejemplo CALCULADORA_HISTORY_CAPACITY=5000).
+"""
+
+from typing import List, Literal, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Parámetros configurables del servicio."""
+
+    model_config = SettingsConfigDict(env_prefix="CALCULADORA_")
+
+    history_capacity: int = Field(
+        10_000, ge=1, description="Máximo de operaciones en historial (se descartan las antiguas)"
+    )
+    history_backend: Literal["memory", "sqlite", "file"] = Field(
+        "memory",
+        description="memory (por proceso), sqlite (compartido entre workers) o file (persistente)",
+    )
+    history_sqlite_path: str = Field(
+        "history.db", description="Archivo SQLite del historial compartido"
+    )
+    history_log_path: str = Field(
+        "history.log", description="Log binario del historial persistente (backend file)"
+    )
+    history_log_sync_records: int = Field(
+        256, ge=1, description="Registros agrupados por cada fsync del log"
+    )
+    history_log_sync_interval_ms: float = Field(
+        50.0, ge=0, description="Tiempo máximo sin fsync con registros pendientes"
+    )
+    history_per_client: bool = Field(
+        False, description="Aislar el historial por cliente (header history_client_header)"
+    )
+    history_client_header: str = Field(
+        "X-Client-Id", description="Header con la clave de cliente del historial aislado"
+    )
+    history_max_clients: int = Field(
+        1_024, ge=1, description="Máximo de clientes con historial (se descartan los inactivos)"
+    )
+    compiled_chain_cache_size: int = Field(
+        256, ge=1, description="Máximo de cadenas compiladas en caché"
+    )
+    expression_cache_size: int = Field(
+        512, ge=1, description="Máximo de expresiones compiladas en caché (POST /evaluate)"
+    )
+    template_max_entries: int = Field(
+        256, ge=1, description="Máximo de plantillas de fórmulas registradas"
+    )
+    result_cache_enabled: bool = Field(
+        False, description="Memoriza resultados de /calculate y /calculate-chain"
+    )
+    result_cache_max_entries: int = Field(
+        1_024, ge=1, description="Máximo de resultados en caché (se descartan los menos usados)"
+    )
+    result_cache_ttl_seconds: Optional[float] = Field(
+        60.0, gt=0, description="Segundos de validez de un resultado (vacío para no expirar)"
+    )
+    result_cache_record_history: bool = Field(
+        True, description="Registrar en historial los resultados obtenidos de la caché"
+    )
+
+    coalescing_enabled: bool = Field(
+        False,
+        description="Las cadenas idénticas en curso en el pool de procesos comparten un cálculo",
+    )
+    coalescing_record_history: bool = Field(
+        True,
+        description="Registrar en historial también las peticiones que compartieron un cálculo",
+    )
+
+    metrics_enabled: bool = Field(
+        False, description="Mide latencias por ruta y por etapa y las expone en GET /metrics"
+    )
+
+    profiling_enabled: bool = Field(
+        False, description="Inicia el perfilador por muestreo al arrancar el servicio"
+    )
+    profiling_interval_ms: float = Field(
+        5.0, gt=0, description="Milisegundos entre muestras del perfilador"
+    )
+    admin_token: Optional[str] = Field(
+        None, description="Token del header X-Admin-Token (vacío desactiva /admin)"
+    )
+
+    fast_serialization: bool = Field(
+        False,
+        description="Serializa /calculate, /calculate-chain, /calculate-batch y /history "
+        "directamente a bytes (orjson) y omite el mensaje salvo ?message=true",
+    )
+
+    ws_max_sessions: int = Field(
+        1_000, ge=0, description="Máximo de sesiones WebSocket simultáneas (/ws/session)"
+    )
+    ws_idle_timeout_seconds: float = Field(
+        300.0, gt=0, description="Segundos sin mensajes antes de cerrar una sesión WebSocket"
+    )
+
+    reduce_chunk_size: int = Field(
+        65_536, ge=1, description="Valores por bloque en las reducciones de /reduce"
+    )
+
+    admission_enabled: bool = Field(
+        False,
+        description="Limita las peticiones por cliente (429) y las peticiones en curso (503)",
+    )
+    admission_rate: float = Field(
+        50.0, gt=0, description="Tokens por segundo que recupera cada cliente"
+    )
+    admission_burst: float = Field(
+        100.0, ge=1, description="Tokens máximos de cada cliente (tamaño de la ráfaga)"
+    )
+    admission_max_concurrency: int = Field(
+        64, ge=1, description="Máximo de peticiones HTTP en curso antes de responder 503"
+    )
+    admission_cost_bytes: int = Field(
+        4_096, ge=1, description="Bytes de cuerpo que cuestan un token adicional"
+    )
+    admission_client_header: str = Field(
+        "X-API-Key", description="Header con la clave del cliente (sin header se usa la IP)"
+    )
+    admission_api_keys: List[str] = Field(
+        [],
+        description=(
+            'Claves aceptadas en el header del cliente, en JSON (p. ej. ["k1","k2"]); '
+            "una clave desconocida se limita por IP"
+        ),
+    )
+    admission_sweep_interval_seconds: float = Field(
+        10.0, gt=0, description="Segundos entre barridos de los clientes inactivos"
+    )
+
+    offload_enabled: bool = Field(
+        False,
+        description="Ejecuta en un pool de procesos los lotes, cadenas y reducciones grandes",
+    )
+    offload_workers: int = Field(0, ge=0, description="Procesos del pool (0 para uno por CPU)")
+    offload_threshold: int = Field(
+        10_000, ge=1, description="Elementos a partir de los cuales una petición va al pool"
+    )
+    offload_chunk_size: int = Field(
+        100_000, ge=1, description="Elementos por bloque al repartir un lote o reducción"
+    )
+    offload_start_method: Literal["spawn", "forkserver", "fork"] = Field(
+        "spawn", description="Método de inicio de los procesos del pool"
+    )
+
+    decimal_precision: int = Field(
+        28, ge=1, description="Dígitos significativos del modo numérico decimal"
+    )
+    decimal_rounding: Literal[
+        "ROUND_HALF_EVEN",
+        "ROUND_HALF_UP",
+        "ROUND_HALF_DOWN",
+        "ROUND_UP",
+        "ROUND_DOWN",
+        "ROUND_CEILING",
+        "ROUND_FLOOR",
+        "ROUND_05UP",
+    ] = Field("ROUND_HALF_EVEN", description="Redondeo del modo numérico decimal")
+    fraction_max_digits: int = Field(
+        1000,
+        ge=1,
+        le=4000,
+        description="Dígitos máximos del numerador y el denominador en el modo fraction",
+    )
+
+
+settings = Settings()
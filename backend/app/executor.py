@@ -0,0 +1,263 @@
+"""
+Módulo del pool de procesos.
+Ejecuta en procesos aparte el trabajo de CPU de las peticiones grandes (lotes,
+cadenas largas y reducciones) para que el event loop siga atendiendo las demás
+peticiones. Las peticiones pequeñas se ejecutan en línea: enviar los datos a
+otro proceso cuesta más que calcularlas.
+Principio SOLID: Single Responsibility - Solo se encarga de despachar trabajo al pool.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> int:
+    """Importa los módulos de cálculo en el worker y retorna su pid."""
+    # Importación diferida: app.calculator importa este módulo
+    from . import calculator, reduction  # noqa: F401
+
+    return os.getpid()
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, Optional[str], float]:
+    """
+    Ejecuta fn en el worker y mide el tiempo ocupado.
+
+    Returns:
+        Tupla (resultado, mensaje del ValueError o None, segundos ocupados)
+    """
+    start = time.perf_counter()
+    try:
+        return fn(*args), None, time.perf_counter() - start
+    except ValueError as e:
+        return None, str(e), time.perf_counter() - start
+
+
+class OffloadExecutor:
+    """
+    Pool de procesos con workers precalentados.
+
+    Los contadores se actualizan desde el event loop, por lo que no necesitan
+    lock; el lock solo protege el reemplazo del pool, que tras la caída de un
+    worker se recrea en un hilo aparte. Las funciones enviadas deben ser
+    funciones de módulo (se serializan con pickle) y no pueden usar operaciones
+    registradas en tiempo de ejecución con el método de inicio "spawn".
+    Si recrear el pool falla, se reintenta con espera exponencial (desde
+    `restart_delay` hasta `MAX_RESTART_DELAY` segundos) y mientras tanto las
+    peticiones se siguen ejecutando en línea.
+    """
+
+    MAX_RESTART_DELAY = 30.0
+
+    def __init__(
+        self,
+        workers: int = 0,
+        threshold: int = 10_000,
+        chunk_size: int = 100_000,
+        start_method: str = "spawn",
+        restart_delay: float = 1.0,
+    ):
+        if workers < 0:
+            raise ValueError("La cantidad de workers no puede ser negativa")
+        if threshold < 1 or chunk_size < 1:
+            raise ValueError("El umbral y el tamaño de bloque deben ser mayores que cero")
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.start_method = start_method
+        self.restart_delay = restart_delay
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._started_at = 0.0
+        self._lock = threading.Lock()
+        # Se incrementa en shutdown para descartar un pool que se recreaba
+        self._generation = 0
+        self._restarting: Optional[threading.Thread] = None
+        # Interrumpe la espera entre reintentos de recreación al hacer shutdown
+        self._stopped = threading.Event()
+        self.restarts = 0
+        self.restart_errors = 0
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Indica si el pool está iniciado."""
+        return self._pool is not None
+
+    def _spawn(self) -> ProcessPoolExecutor:
+        """Crea un pool y espera a que cada worker haya importado los módulos de cálculo."""
+        context = multiprocessing.get_context(self.start_method)
+        pool = ProcessPoolExecutor(self.workers, mp_context=context)
+        # Cada tarea ocupa un worker hasta que todos existen; la primera
+        # petición grande no paga el arranque de los procesos
+        try:
+            for future in [pool.submit(warm_up) for _ in range(self.workers)]:
+                future.result()
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        return pool
+
+    def _install(self, pool: ProcessPoolExecutor, generation: int) -> bool:
+        """Publica un pool nuevo si no hay otro y no hubo shutdown desde `generation`."""
+        with self._lock:
+            if self._pool is not None or self._generation != generation:
+                return False
+            self._pool = pool
+            self._started_at = time.perf_counter()
+            return True
+
+    def start(self) -> None:
+        """Crea el pool y espera a que los workers estén listos (bloquea)."""
+        if self._pool is not None:
+            return
+        pool = self._spawn()
+        if not self._install(pool, self._generation):
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self, generation: int) -> None:
+        """
+        Recrea el pool en un hilo; mientras tanto las peticiones se ejecutan en línea.
+
+        Un error al crear el pool se registra en el log y se reintenta hasta
+        lograrlo o hasta un shutdown, en lugar de dejar el pool detenido.
+        """
+        delay = self.restart_delay
+        while self._generation == generation:
+            try:
+                pool = self._spawn()
+            except Exception:
+                self.restart_errors += 1
+                logger.exception(
+                    "No se pudo recrear el pool de procesos; reintento en %.1f s", delay
+                )
+                if self._stopped.wait(delay):
+                    return
+                delay = min(delay * 2, self.MAX_RESTART_DELAY)
+                continue
+            if not self._install(pool, generation):
+                pool.shutdown(wait=False, cancel_futures=True)
+            return
+
+    def shutdown(self) -> None:
+        """Detiene el pool esperando las tareas en curso."""
+        with self._lock:
+            self._generation += 1
+            pool, self._pool = self._pool, None
+        self._stopped.set()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def offloads(self, size: int) -> bool:
+        """Indica si una petición de `size` elementos se ejecuta en el pool (y la cuenta)."""
+        if self._pool is not None and size >= self.threshold:
+            self.offloaded += 1
+            return True
+        self.inline += 1
+        return False
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta fn(*args) en un worker sin bloquear el event loop.
+
+        Raises:
+            ValueError: Si fn lanza ValueError (se reenvía el mensaje)
+            RuntimeError: Si el pool no está iniciado
+            BrokenProcessPool: Si un worker terminó abruptamente (el pool se
+                recrea en un hilo sin bloquear el event loop)
+        """
+        pool = self._pool
+        if pool is None:
+            raise RuntimeError("El pool de procesos no está iniciado")
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            result, error, elapsed = await loop.run_in_executor(pool, _timed, fn, *args)
+        except BrokenProcessPool:
+            self.failed += 1
+            with self._lock:
+                broken = self._pool is pool
+                if broken:
+                    self._pool = None
+            if broken:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.restarts += 1
+                self._stopped.clear()
+                self._restarting = threading.Thread(
+                    target=self._restart,
+                    args=(self._generation,),
+                    name="offload-restart",
+                    daemon=True,
+                )
+                self._restarting.start()
+            raise
+        finally:
+            self.pending -= 1
+
+        self.busy_seconds += elapsed
+        if error is not None:
+            self.failed += 1
+            raise ValueError(error)
+        self.completed += 1
+        return result
+
+    async def map_chunks(
+        self, fn: Callable[..., Any], columns: Sequence[Any], *args: Any
+    ) -> List[Tuple[int, Any]]:
+        """
+        Divide columnas paralelas en bloques de chunk_size y ejecuta
+        fn(*bloques, *args) para cada bloque en paralelo.
+
+        Returns:
+            Lista de (índice inicial del bloque, resultado) en orden
+        """
+        size = len(columns[0])
+        step = self.chunk_size
+        offsets = range(0, size, step)
+        results = await asyncio.gather(
+            *(self.run(fn, *(column[o : o + step] for column in columns), *args) for o in offsets)
+        )
+        return list(zip(offsets, results))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna la profundidad de la cola y la utilización de los workers.
+
+        `busy` y `queued` se estiman a partir de las tareas pendientes;
+        `utilization` es el tiempo ocupado sobre el tiempo disponible desde el inicio.
+        """
+        pending = self.pending
+        busy = min(pending, self.workers)
+        uptime = time.perf_counter() - self._started_at if self.running else 0.0
+        capacity = uptime * self.workers
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "threshold": self.threshold,
+            "chunk_size": self.chunk_size,
+            "pending": pending,
+            "busy": busy,
+            "queued": pending - busy,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts,
+            "restart_errors": self.restart_errors,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "busy_seconds": self.busy_seconds,
+            "utilization": min(self.busy_seconds / capacity, 1.0) if capacity else 0.0,
+        }
@@ -0,0 +1,469 @@
+"""
+Módulo de expresiones aritméticas.
+Analiza expresiones como `(10 + 5) * 2 - 3` respetando precedencia y paréntesis,
+y las compila a funciones que reutilizan las operaciones de operations.py.
+Principio SOLID: Single Responsibility - Solo se encarga de analizar y compilar expresiones.
+"""
+
+import hashlib
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .operations import OVERFLOW_MESSAGE, OperationFactory, check_finite, overflow_mask
+
+# Precedencia de los operadores binarios (mayor número = mayor precedencia)
+PRECEDENCE: Dict[str, int] = {"+": 1, "-": 1, "*": 2, "/": 2, "//": 2, "%": 2, "^": 3}
+
+# Operadores que agrupan por la derecha: 2 ^ 3 ^ 2 == 2 ^ (3 ^ 2)
+RIGHT_ASSOCIATIVE = frozenset(("^",))
+# Precedencia de ^, mayor que la del signo unario (como ** en Python)
+POWER_PRECEDENCE = PRECEDENCE["^"]
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_][A-Za-z_0-9]*)"
+    r"|(?P<op>"
+    + "|".join(re.escape(op) for op in sorted(PRECEDENCE, key=len, reverse=True))
+    + r"|[()]))"
+)
+
+
+class Number:
+    """Nodo del AST: constante numérica."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Number({self.value!r})"
+
+
+class Variable:
+    """Nodo del AST: variable que se asigna al evaluar."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"Variable({self.name!r})"
+
+
+class Negate:
+    """Nodo del AST: negación unaria."""
+
+    __slots__ = ("operand",)
+
+    def __init__(self, operand: "Node"):
+        self.operand = operand
+
+    def __repr__(self) -> str:
+        return f"Negate({self.operand!r})"
+
+
+class BinaryOp:
+    """Nodo del AST: operación binaria (+, -, *, /, //, %, ^)."""
+
+    __slots__ = ("operator", "left", "right")
+
+    def __init__(self, operator: str, left: "Node", right: "Node"):
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"BinaryOp({self.operator!r}, {self.left!r}, {self.right!r})"
+
+
+Node = Union[Number, Variable, Negate, BinaryOp]
+
+
+def tokenize(expression: str) -> List[Tuple[str, str]]:
+    """
+    Divide la expresión en tokens (tipo, texto).
+
+    Raises:
+        ValueError: Si hay caracteres no válidos
+    """
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Carácter no válido en la posición {position}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """
+    Analizador por precedencia de operadores (precedence climbing).
+    Los operadores binarios asocian por la izquierda, igual que calculate_chain,
+    salvo `^`, que asocia por la derecha (`2 ^ 3 ^ 2` es `2 ^ 9`) y liga más que
+    el signo unario (`-2 ^ 2` es `-4`).
+    """
+
+    def __init__(self, expression: str):
+        self.tokens = tokenize(expression)
+        self.position = 0
+
+    def parse(self) -> Node:
+        """
+        Analiza la expresión completa.
+
+        Raises:
+            ValueError: Si la expresión está vacía o mal formada
+        """
+        if not self.tokens:
+            raise ValueError("La expresión está vacía")
+        node = self._expression(1)
+        if self.position < len(self.tokens):
+            raise ValueError(f"Token inesperado: {self.tokens[self.position][1]}")
+        return node
+
+    def _peek(self) -> Tuple[str, str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return ("end", "")
+
+    def _expression(self, min_precedence: int) -> Node:
+        left = self._unary()
+        while True:
+            kind, text = self._peek()
+            precedence = PRECEDENCE.get(text, 0) if kind == "op" else 0
+            if precedence < min_precedence:
+                return left
+            self.position += 1
+            right = self._expression(precedence + (text not in RIGHT_ASSOCIATIVE))
+            left = BinaryOp(text, left, right)
+
+    def _unary(self) -> Node:
+        kind, text = self._peek()
+        if kind == "op" and text in ("-", "+"):
+            self.position += 1
+            # El signo abarca las potencias que le siguen: -2 ^ 2 es -(2 ^ 2)
+            operand = self._expression(POWER_PRECEDENCE)
+            return Negate(operand) if text == "-" else operand
+        return self._primary()
+
+    def _primary(self) -> Node:
+        kind, text = self._peek()
+        self.position += 1
+        if kind == "number":
+            value = float(text)
+            if not math.isfinite(value):
+                raise ValueError(f"Número fuera de rango: {text}")
+            return Number(value)
+        if kind == "name":
+            return Variable(text)
+        if kind == "op" and text == "(":
+            node = self._expression(1)
+            if self._peek() != ("op", ")"):
+                raise ValueError("Falta cerrar un paréntesis")
+            self.position += 1
+            return node
+        if kind == "end":
+            raise ValueError("La expresión termina de forma inesperada")
+        raise ValueError(f"Token inesperado: {text}")
+
+
+def parse(expression: str) -> Node:
+    """
+    Analiza una expresión y retorna su AST.
+
+    Raises:
+        ValueError: Si la expresión no es válida o está demasiado anidada
+    """
+    try:
+        return Parser(expression).parse()
+    except RecursionError:
+        raise ValueError("La expresión está demasiado anidada") from None
+
+
+def variables(node: Node) -> FrozenSet[str]:
+    """Retorna los nombres de variables usados en el AST."""
+    if isinstance(node, Variable):
+        return frozenset((node.name,))
+    if isinstance(node, Negate):
+        return variables(node.operand)
+    if isinstance(node, BinaryOp):
+        return variables(node.left) | variables(node.right)
+    return frozenset()
+
+
+Evaluator = Callable[[Mapping[str, float]], float]
+
+
+Compiled = Tuple[Evaluator, Optional[float]]
+
+
+def _constant(value: float) -> Compiled:
+    """Retorna un evaluador constante con su valor."""
+    return (lambda bindings: value), value
+
+
+def _compile_number(node: Number) -> Compiled:
+    return _constant(node.value)
+
+
+def _compile_variable(node: Variable) -> Compiled:
+    name = node.name
+
+    def load(bindings: Mapping[str, float]) -> float:
+        try:
+            return bindings[name]
+        except KeyError:
+            raise ValueError(f"Variable sin valor: {name}") from None
+
+    return load, None
+
+
+def _compile_negate(node: Negate) -> Compiled:
+    operand, constant = _compile(node.operand)
+    if constant is not None:
+        return _constant(-constant)
+    return (lambda bindings: -operand(bindings)), None
+
+
+def _compile_binary(node: BinaryOp) -> Compiled:
+    execute = OperationFactory.create_operation(node.operator).execute
+    (left, left_constant), (right, right_constant) = _compile(node.left), _compile(node.right)
+    if left_constant is not None and right_constant is not None:
+        # Plegado de constantes; si falla (p. ej. 1/0) el error se reporta al evaluar
+        try:
+            return _constant(check_finite(execute(left_constant, right_constant)))
+        except ValueError:
+            pass
+    return (lambda bindings: check_finite(execute(left(bindings), right(bindings)))), None
+
+
+# Compilador de cada tipo de nodo
+_COMPILERS: Dict[type, Callable[[Any], Compiled]] = {
+    Number: _compile_number,
+    Variable: _compile_variable,
+    Negate: _compile_negate,
+    BinaryOp: _compile_binary,
+}
+
+
+def _compile(node: Node) -> Compiled:
+    """Compila un nodo; retorna (función, valor) donde valor no es None si es constante."""
+    return _COMPILERS[type(node)](node)
+
+
+def compile_node(node: Node) -> Evaluator:
+    """
+    Compila un AST a una función anidada de closures.
+
+    Las subexpresiones constantes se calculan una sola vez al compilar
+    y las operaciones binarias usan las estrategias de OperationFactory.
+    """
+    return _compile(node)[0]
+
+
+class VectorErrors:
+    """Errores por elemento acumulados durante una evaluación vectorizada."""
+
+    __slots__ = ("failed", "messages")
+
+    def __init__(self, size: int):
+        self.failed = np.zeros(size, dtype=bool)
+        self.messages = np.empty(size, dtype=object)
+
+    def add(self, invalid: np.ndarray, message: str) -> None:
+        """Marca los elementos inválidos, conservando el primer error de cada uno."""
+        fresh = invalid & ~self.failed
+        if fresh.any():
+            self.failed |= fresh
+            self.messages[fresh] = message
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Retorna los errores como lista de {'index', 'detail'}."""
+        indexes = np.flatnonzero(self.failed)
+        return [
+            {"index": i, "detail": detail}
+            for i, detail in zip(indexes.tolist(), self.messages[indexes].tolist())
+        ]
+
+
+VectorEvaluator = Callable[[Mapping[str, np.ndarray], VectorErrors], np.ndarray]
+
+
+def compile_vector(node: Node) -> VectorEvaluator:
+    """
+    Compila un AST a una función que evalúa columnas completas de valores.
+
+    Cada operación binaria usa el kernel vectorizado (execute_batch) de su
+    estrategia; los elementos inválidos (p. ej. división por cero) se registran
+    en VectorErrors sin interrumpir el resto.
+    """
+    if isinstance(node, Number):
+        value = node.value
+        return lambda columns, errors: np.full(len(errors.failed), value)
+
+    if isinstance(node, Variable):
+        name = node.name
+
+        def load(columns: Mapping[str, np.ndarray], errors: VectorErrors) -> np.ndarray:
+            try:
+                return columns[name]
+            except KeyError:
+                raise ValueError(f"Variable sin valor: {name}") from None
+
+        return load
+
+    if isinstance(node, Negate):
+        operand = compile_vector(node.operand)
+        return lambda columns, errors: np.negative(operand(columns, errors))
+
+    operation = OperationFactory.create_operation(node.operator)
+    left, right = compile_vector(node.left), compile_vector(node.right)
+
+    def run(columns: Mapping[str, np.ndarray], errors: VectorErrors) -> np.ndarray:
+        a, b = left(columns, errors), right(columns, errors)
+        invalid = operation.invalid_mask(a, b)
+        if invalid is not None:
+            errors.add(invalid, operation.get_error_message())
+        result = operation.execute_batch(a, b)
+        errors.add(overflow_mask(a, b, result), OVERFLOW_MESSAGE)
+        return result
+
+    return run
+
+
+class CompiledExpression:
+    """Expresión analizada y compilada, lista para evaluarse con distintas variables."""
+
+    __slots__ = ("source", "ast", "variables", "_evaluate", "_evaluate_vector")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.ast = parse(source)
+        try:
+            self.variables = variables(self.ast)
+            self._evaluate = compile_node(self.ast)
+        except RecursionError:
+            raise ValueError("La expresión está demasiado anidada") from None
+        self._evaluate_vector: Optional[VectorEvaluator] = None
+
+    def evaluate_vector(
+        self, columns: Mapping[str, np.ndarray], size: int
+    ) -> Tuple[np.ndarray, VectorErrors]:
+        """
+        Evalúa la expresión sobre columnas de valores (una por variable).
+
+        La versión vectorizada se compila la primera vez que se usa.
+
+        Returns:
+            Tupla (resultados, errores por elemento)
+
+        Raises:
+            ValueError: Si falta una variable
+        """
+        if self._evaluate_vector is None:
+            self._evaluate_vector = compile_vector(self.ast)
+        errors = VectorErrors(size)
+        with np.errstate(all="ignore"):
+            results = self._evaluate_vector(columns, errors)
+        return results, errors
+
+    def evaluate(self, bindings: Mapping[str, float]) -> float:
+        """
+        Evalúa la expresión con los valores de las variables.
+
+        Raises:
+            ValueError: Si falta una variable o una operación no es válida
+        """
+        return self._evaluate(bindings)
+
+
+class ExpressionCache:
+    """
+    Caché LRU de expresiones compiladas por su texto.
+    Permite analizar una vez y evaluar muchas veces con distintas variables.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._compiled: "OrderedDict[str, CompiledExpression]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, expression: str) -> CompiledExpression:
+        """
+        Retorna la expresión compilada, analizándola si no está en caché.
+
+        Raises:
+            ValueError: Si la expresión no es válida
+        """
+        compiled = self._compiled.get(expression)
+        if compiled is not None:
+            self._compiled.move_to_end(expression)
+            self.hits += 1
+            return compiled
+
+        self.misses += 1
+        compiled = CompiledExpression(expression)
+        self._compiled[expression] = compiled
+        if len(self._compiled) > self.max_entries:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+
+class TemplateRegistry:
+    """
+    Registro de plantillas de fórmulas (expresiones con variables) por identificador.
+    El identificador depende solo del texto, por lo que registrar dos veces la misma
+    fórmula retorna la misma plantilla.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._templates: "OrderedDict[str, CompiledExpression]" = OrderedDict()
+
+    @staticmethod
+    def template_id(expression: str) -> str:
+        """Retorna el identificador estable de una fórmula."""
+        return hashlib.sha1(expression.encode()).hexdigest()[:16]
+
+    def register(self, expression: str) -> Tuple[str, CompiledExpression]:
+        """
+        Registra (o recupera) una plantilla.
+
+        Returns:
+            Tupla (identificador, expresión compilada)
+
+        Raises:
+            ValueError: Si la expresión no es válida
+        """
+        template_id = self.template_id(expression)
+        compiled = self.get(template_id)
+        if compiled is None:
+            compiled = CompiledExpression(expression)
+            self._templates[template_id] = compiled
+            if len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        return template_id, compiled
+
+    def get(self, template_id: str) -> Optional[CompiledExpression]:
+        """Retorna la plantilla con ese identificador, o None si no existe."""
+        compiled = self._templates.get(template_id)
+        if compiled is not None:
+            self._templates.move_to_end(template_id)
+        return compiled
+
+    def __len__(self) -> int:
+        return len(self._templates)
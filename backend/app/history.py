@@ -0,0 +1,1171 @@
+"""
+Módulo de historial de operaciones.
+Define la interfaz de almacenamiento del historial, una implementación en memoria
+acotada (buffer circular) con almacenamiento columnar, una implementación en SQLite
+compartida entre procesos y un log binario persistente.
+Principio SOLID: Dependency Inversion - La calculadora depende de la abstracción HistoryStore.
+"""
+
+import itertools
+import logging
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import Settings
+from .stats import HistoryStats, stats_payload
+
+logger = logging.getLogger(__name__)
+
+# Cliente de la petición en curso; elige la partición de PartitionedHistory
+current_client: ContextVar[str] = ContextVar("current_client", default="")
+
+
+class HistoryStore(ABC):
+    """
+    Interfaz para los almacenes de historial.
+    Las lecturas son paginadas para no materializar el historial completo.
+    """
+
+    @abstractmethod
+    def append(self, num1: float, num2: float, operator: str, result: float) -> None:
+        """Agrega una operación al historial."""
+        pass
+
+    @abstractmethod
+    def extend(
+        self,
+        num1: Sequence[float],
+        num2: Sequence[float],
+        operators: Sequence[str],
+        results: Sequence[float],
+    ) -> None:
+        """Agrega varias operaciones al historial a partir de columnas."""
+        pass
+
+    @abstractmethod
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna una ventana del historial en orden cronológico.
+
+        Args:
+            offset: Cantidad de operaciones a omitir desde la más antigua
+            limit: Máximo de operaciones a retornar (None para todas)
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Limpia el historial."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def close(self) -> None:
+        """Libera los recursos del almacén (archivos, conexiones)."""
+        pass
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        operator: Optional[str] = None,
+        min_result: Optional[float] = None,
+        max_result: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Retorna una ventana de las operaciones que cumplen los filtros.
+
+        Args:
+            offset: Cantidad de coincidencias a omitir desde la más antigua
+            limit: Máximo de operaciones a retornar (None para todas)
+            operator: Solo operaciones con este operador
+            min_result: Solo resultados mayores o iguales
+            max_result: Solo resultados menores o iguales
+            since: Solo operaciones registradas desde este instante (epoch, segundos)
+            until: Solo operaciones registradas hasta este instante (epoch, segundos)
+
+        Returns:
+            Tupla (ventana de operaciones, total de coincidencias)
+
+        Raises:
+            ValueError: Si el almacén no admite filtros
+        """
+        filters = (operator, min_result, max_result, since, until)
+        if any(value is not None for value in filters):
+            raise ValueError("Este historial no admite filtros")
+        return self.get_page(offset, limit), len(self)
+
+    def record_errors(self, count: int = 1) -> None:
+        """Registra operaciones que fallaron (para la tasa de error de stats)."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna los agregados del historial (conteo por operador, suma, media,
+        mínimo, máximo y tasa de error).
+
+        Raises:
+            ValueError: Si el almacén no mantiene estadísticas
+        """
+        raise ValueError("Este historial no mantiene estadísticas")
+
+
+class RingBufferHistory(HistoryStore):
+    """
+    Historial en memoria con capacidad fija.
+    Al llenarse se descarta la operación más antigua; agregar es O(1).
+    Las columnas se guardan en arreglos de NumPy y el operador como código
+    de una tabla de símbolos, en lugar de un diccionario por operación.
+    Los filtros de query se evalúan como máscaras sobre las columnas.
+    Las estadísticas se actualizan al agregar y al descartar operaciones.
+    """
+
+    def __init__(self, capacity: int = 10_000, clock: Callable[[], float] = time.time):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser mayor que cero")
+        self.capacity = capacity
+        self._clock = clock
+        self._num1 = np.empty(capacity, dtype=np.float64)
+        self._num2 = np.empty(capacity, dtype=np.float64)
+        self._result = np.empty(capacity, dtype=np.float64)
+        self._operator = np.empty(capacity, dtype=np.uint16)
+        self._time = np.empty(capacity, dtype=np.float64)
+        self._symbols: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._start = 0
+        self._size = 0
+        self._stats = HistoryStats()
+
+    def _code(self, operator: str) -> int:
+        """Retorna el código del operador, registrándolo si es nuevo."""
+        code = self._codes.get(operator)
+        if code is None:
+            code = len(self._symbols)
+            self._symbols.append(operator)
+            self._codes[operator] = code
+        return code
+
+    def append(self, num1: float, num2: float, operator: str, result: float) -> None:
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+            self._stats.remove(self._symbols[self._operator[index]], float(self._result[index]))
+        self._stats.add(operator, result)
+        self._num1[index] = num1
+        self._num2[index] = num2
+        self._operator[index] = self._code(operator)
+        self._result[index] = result
+        self._time[index] = self._clock()
+
+    def extend(
+        self,
+        num1: Sequence[float],
+        num2: Sequence[float],
+        operators: Sequence[str],
+        results: Sequence[float],
+    ) -> None:
+        count = len(results)
+        if count == 0:
+            return
+
+        # Solo sobreviven los últimos `capacity` elementos
+        skip = max(0, count - self.capacity)
+        stored = count - skip
+        codes = self._codes_of(list(operators[skip:]))
+        columns = (
+            (self._num1, np.asarray(num1[skip:], dtype=np.float64)),
+            (self._num2, np.asarray(num2[skip:], dtype=np.float64)),
+            (self._operator, codes),
+            (self._result, np.asarray(results[skip:], dtype=np.float64)),
+        )
+
+        overflow = max(0, self._size + stored - self.capacity)
+        if overflow:
+            evicted = (self._start + np.arange(overflow)) % self.capacity
+            self._stats.remove_many(
+                self._count_codes(self._operator[evicted]), self._result[evicted]
+            )
+        self._stats.add_many(self._count_codes(codes), columns[3][1])
+
+        end = self._start + self._size
+        positions = (end + np.arange(stored)) % self.capacity
+        for column, values in columns:
+            column[positions] = values
+        self._time[positions] = self._clock()
+
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self.capacity, self._size + stored)
+
+    def _codes_of(self, operators: List[str]) -> np.ndarray:
+        """Convierte operadores a sus códigos, registrando los nuevos."""
+        for symbol in set(operators).difference(self._codes):
+            self._code(symbol)
+        return np.fromiter(map(self._codes.__getitem__, operators), np.uint16, len(operators))
+
+    def _count_codes(self, codes: np.ndarray) -> Dict[str, int]:
+        """Cuenta las operaciones por operador a partir de sus códigos."""
+        counts = np.bincount(codes, minlength=len(self._symbols))
+        return {self._symbols[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        stop = self._size if limit is None else min(self._size, offset + limit)
+        if offset >= stop:
+            return []
+        return self._rows((self._start + np.arange(offset, stop)) % self.capacity)
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        operator: Optional[str] = None,
+        min_result: Optional[float] = None,
+        max_result: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        filters = (operator, min_result, max_result, since, until)
+        if all(value is None for value in filters):
+            return self.get_page(offset, limit), self._size
+
+        positions = (self._start + np.arange(self._size)) % self.capacity
+        mask = np.ones(self._size, dtype=bool)
+        if operator is not None:
+            code = self._codes.get(operator)
+            if code is None:
+                return [], 0
+            mask &= self._operator[positions] == code
+        if min_result is not None or max_result is not None:
+            results = self._result[positions]
+            if min_result is not None:
+                mask &= results >= min_result
+            if max_result is not None:
+                mask &= results <= max_result
+        if since is not None or until is not None:
+            times = self._time[positions]
+            if since is not None:
+                mask &= times >= since
+            if until is not None:
+                mask &= times <= until
+
+        matches = positions[mask]
+        stop = None if limit is None else offset + limit
+        return self._rows(matches[offset:stop]), len(matches)
+
+    def _rows(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        """Materializa las operaciones de las posiciones dadas."""
+        symbols = self._symbols
+        return [
+            {"num1": a, "num2": b, "operator": symbols[code], "result": r}
+            for a, b, code, r in zip(
+                self._num1[positions].tolist(),
+                self._num2[positions].tolist(),
+                self._operator[positions].tolist(),
+                self._result[positions].tolist(),
+            )
+        ]
+
+    def record_errors(self, count: int = 1) -> None:
+        self._stats.record_errors(count)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.snapshot()
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+        self._stats.clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    Historial compartido entre procesos en SQLite (modo WAL).
+    Permite que varios workers de uvicorn vean y limpien el mismo historial.
+    La ventana visible son las últimas `capacity` operaciones; las más antiguas
+    se eliminan periódicamente al agregar.
+
+    append y extend solo encolan las filas: un hilo escritor las inserta en
+    lotes (una transacción por lote), así el event loop no espera el lock de
+    la base que comparten los procesos. Si la base está ocupada más de
+    BUSY_TIMEOUT segundos, el lote se reintenta. Las lecturas del mismo proceso
+    escriben antes las filas encoladas; los demás procesos las ven al escribirse.
+    clear reintenta igual que el escritor durante CLEAR_TIMEOUT segundos.
+    Los filtros de query son condiciones WHERE sobre la ventana visible.
+    """
+
+    PRUNE_INTERVAL = 256
+    BUSY_TIMEOUT = 0.1
+    CLEAR_TIMEOUT = 2.0
+    # Condición de las filas visibles: las últimas `capacity` (parámetro)
+    WINDOW = "id > (SELECT MAX(id) FROM history) - ?"
+
+    def __init__(self, path: str, capacity: int = 10_000, clock: Callable[[], float] = time.time):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser mayor que cero")
+        self.path = path
+        self.capacity = capacity
+        self._clock = clock
+        # _lock protege la conexión; _ready, las filas encoladas y el hilo escritor
+        self._lock = threading.Lock()
+        self._ready = threading.Condition()
+        self._queue: List[Tuple[float, float, str, float, float]] = []
+        # Contadores de stats aún sin escribir (operaciones registradas y fallidas)
+        self._pending_recorded = 0
+        self._pending_errors = 0
+        self._closed = False
+        self._writer_pid: Optional[int] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._pending_prune = 0
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre la conexión (una por proceso, se reabre tras un fork)."""
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "num1 REAL NOT NULL, num2 REAL NOT NULL, "
+                "operator TEXT NOT NULL, result REAL NOT NULL, "
+                "created REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(history)")]
+            if "created" not in columns:
+                # Bases creadas antes de los filtros por tiempo
+                connection.execute("ALTER TABLE history ADD COLUMN created REAL NOT NULL DEFAULT 0")
+            # Contadores compartidos de stats: operaciones registradas y fallidas
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS history_counters ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), "
+                "recorded INTEGER NOT NULL, errors INTEGER NOT NULL)"
+            )
+            connection.execute("INSERT OR IGNORE INTO history_counters VALUES (0, 0, 0)")
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _prune(self, connection: sqlite3.Connection, added: int) -> None:
+        """Elimina las operaciones fuera de la ventana cada PRUNE_INTERVAL inserciones."""
+        self._pending_prune += added
+        if self._pending_prune >= self.PRUNE_INTERVAL:
+            self._pending_prune = 0
+            connection.execute(
+                "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?",
+                (self.capacity,),
+            )
+
+    def _submit(
+        self, rows: List[Tuple[float, float, str, float, float]], recorded: int, errors: int = 0
+    ) -> None:
+        """
+        Encola filas y contadores para el hilo escritor (lo inicia en este
+        proceso si hace falta).
+
+        Args:
+            rows: Filas a insertar
+            recorded: Operaciones registradas (incluidas las que no entran en la ventana)
+            errors: Operaciones que fallaron
+        """
+        with self._ready:
+            self._queue.extend(rows)
+            self._pending_recorded += recorded
+            self._pending_errors += errors
+            # Las filas fuera de la ventana no se verían nunca
+            if len(self._queue) > self.capacity:
+                del self._queue[: -self.capacity]
+            if self._closed or self._writer_pid != os.getpid():
+                self._closed = False
+                self._writer_pid = os.getpid()
+                threading.Thread(
+                    target=self._write_loop, name="sqlite-history-writer", daemon=True
+                ).start()
+            self._ready.notify()
+
+    def _write_loop(self) -> None:
+        """
+        Escribe los lotes encolados hasta que se cierre el almacén. Un error no
+        detiene el hilo: el lote queda encolado y se reintenta.
+        """
+        failing = False
+        while True:
+            with self._ready:
+                while not self._has_pending() and not self._closed:
+                    self._ready.wait()
+                if not self._has_pending():
+                    return
+            try:
+                self._write_queue()
+            except sqlite3.OperationalError:
+                # Base ocupada por otro proceso
+                time.sleep(self.BUSY_TIMEOUT)
+            except Exception:
+                # Solo el primer error de una racha, para no llenar el log en cada reintento
+                if not failing:
+                    logger.exception("No se pudo escribir el historial en %s", self.path)
+                failing = True
+                time.sleep(self.BUSY_TIMEOUT)
+            else:
+                failing = False
+
+    def _has_pending(self) -> bool:
+        """Indica si hay filas o contadores encolados."""
+        return bool(self._queue) or self._pending_errors > 0
+
+    def _write_queue(self) -> None:
+        """
+        Inserta las filas encoladas y actualiza los contadores en una transacción.
+
+        Raises:
+            sqlite3.OperationalError: Si la base sigue ocupada (las filas vuelven a la cola)
+        """
+        with self._lock:
+            with self._ready:
+                rows, self._queue = self._queue, []
+                recorded, self._pending_recorded = self._pending_recorded, 0
+                errors, self._pending_errors = self._pending_errors, 0
+            if not rows and not errors:
+                return
+            connection = self._connect()
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    connection.executemany(
+                        "INSERT INTO history (num1, num2, operator, result, created) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    connection.execute(
+                        "UPDATE history_counters SET recorded = recorded + ?, errors = errors + ?",
+                        (recorded, errors),
+                    )
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+            except BaseException:
+                with self._ready:
+                    self._queue[:0] = rows
+                    self._pending_recorded += recorded
+                    self._pending_errors += errors
+                raise
+            self._prune(connection, len(rows))
+
+    def _write_queue_if_free(self) -> None:
+        """Escribe las filas encoladas antes de leer, salvo que la base esté ocupada."""
+        if self._has_pending():
+            try:
+                self._write_queue()
+            except sqlite3.OperationalError:
+                pass
+
+    def append(self, num1: float, num2: float, operator: str, result: float) -> None:
+        self._submit([(float(num1), float(num2), operator, float(result), self._clock())], 1)
+
+    def extend(
+        self,
+        num1: Sequence[float],
+        num2: Sequence[float],
+        operators: Sequence[str],
+        results: Sequence[float],
+    ) -> None:
+        count = len(results)
+        if count == 0:
+            return
+        skip = max(0, count - self.capacity)
+        rows = zip(
+            np.asarray(num1, dtype=np.float64)[skip:].tolist(),
+            np.asarray(num2, dtype=np.float64)[skip:].tolist(),
+            list(operators)[skip:],
+            np.asarray(results, dtype=np.float64)[skip:].tolist(),
+            itertools.repeat(self._clock()),
+        )
+        self._submit(list(rows), count)
+
+    def flush(self) -> None:
+        """Escribe en la base todas las filas encoladas."""
+        self._write_queue()
+
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        self._write_queue_if_free()
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT num1, num2, operator, result FROM history "
+                    "WHERE id >= MAX((SELECT MIN(id) FROM history), "
+                    "(SELECT MAX(id) FROM history) - ? + 1) + ? "
+                    "ORDER BY id LIMIT ?",
+                    (self.capacity, offset, -1 if limit is None else limit),
+                )
+                .fetchall()
+            )
+        return [{"num1": a, "num2": b, "operator": op, "result": r} for a, b, op, r in rows]
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        operator: Optional[str] = None,
+        min_result: Optional[float] = None,
+        max_result: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        conditions = [self.WINDOW]
+        parameters: List[Any] = [self.capacity]
+        for condition, value in (
+            ("operator = ?", operator),
+            ("result >= ?", min_result),
+            ("result <= ?", max_result),
+            ("created >= ?", since),
+            ("created <= ?", until),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        if len(conditions) == 1:
+            return super().query(offset, limit)
+
+        where = " AND ".join(conditions)
+        self._write_queue_if_free()
+        with self._lock:
+            connection = self._connect()
+            (total,) = connection.execute(
+                f"SELECT COUNT(*) FROM history WHERE {where}", parameters
+            ).fetchone()
+            rows = connection.execute(
+                f"SELECT num1, num2, operator, result FROM history WHERE {where} "
+                "ORDER BY id LIMIT ? OFFSET ?",
+                parameters + [-1 if limit is None else limit, offset],
+            ).fetchall()
+        page = [{"num1": a, "num2": b, "operator": op, "result": r} for a, b, op, r in rows]
+        return page, total
+
+    def record_errors(self, count: int = 1) -> None:
+        self._submit([], 0, errors=count)
+
+    def stats(self) -> Dict[str, Any]:
+        self._write_queue_if_free()
+        with self._lock:
+            connection = self._connect()
+            operators = connection.execute(
+                f"SELECT operator, COUNT(*) FROM history WHERE {self.WINDOW} GROUP BY operator",
+                (self.capacity,),
+            ).fetchall()
+            # Solo los resultados finitos (±inf se guardan como REAL)
+            finite, total, minimum, maximum = connection.execute(
+                "SELECT COUNT(*), SUM(result), MIN(result), MAX(result) FROM history "
+                f"WHERE {self.WINDOW} AND abs(result) <= ?",
+                (self.capacity, sys.float_info.max),
+            ).fetchone()
+            recorded, errors = connection.execute(
+                "SELECT recorded, errors FROM history_counters"
+            ).fetchone()
+        return stats_payload(
+            dict(operators), finite, total or 0.0, minimum, maximum, recorded, errors
+        )
+
+    def clear(self) -> None:
+        """
+        Elimina el historial de todos los procesos.
+
+        Raises:
+            TimeoutError: Si la base sigue ocupada tras CLEAR_TIMEOUT segundos
+        """
+        deadline = time.monotonic() + self.CLEAR_TIMEOUT
+        while True:
+            try:
+                with self._lock:
+                    with self._ready:
+                        self._queue.clear()
+                        self._pending_recorded = 0
+                        self._pending_errors = 0
+                    connection = self._connect()
+                    connection.execute("BEGIN IMMEDIATE")
+                    try:
+                        connection.execute("DELETE FROM history")
+                        connection.execute("UPDATE history_counters SET recorded = 0, errors = 0")
+                        connection.execute("COMMIT")
+                    except BaseException:
+                        connection.execute("ROLLBACK")
+                        raise
+                    self._pending_prune = 0
+                return
+            except sqlite3.OperationalError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        "El historial está ocupado por otro proceso, intente de nuevo"
+                    ) from None
+                time.sleep(self.BUSY_TIMEOUT)
+
+    def __len__(self) -> int:
+        self._write_queue_if_free()
+        with self._lock:
+            low, high = (
+                self._connect()
+                .execute("SELECT (SELECT MIN(id) FROM history), (SELECT MAX(id) FROM history)")
+                .fetchone()
+            )
+        if low is None:
+            return 0
+        return min(self.capacity, high - low + 1)
+
+    def close(self) -> None:
+        """Escribe las filas encoladas, detiene el hilo escritor y cierra la conexión."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        self._write_queue()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class FileHistoryStore(HistoryStore):
+    """
+    Historial persistente en un log binario de solo escritura al final (append-only).
+
+    Cada operación es un registro de ancho fijo (num1 float64, num2 float64,
+    código de operador de 1 byte, result float64, instante float64). Los registros se
+    agrupan en memoria y un hilo los escribe con un solo fsync al acumular
+    `sync_records` registros o a más tardar `sync_interval` segundos después del primero
+    (group commit), aunque no lleguen más operaciones; append y extend nunca esperan
+    el fsync. flush y close confirman los pendientes en el hilo que los llama. Las lecturas
+    y los filtros de query usan mmap sobre el archivo y la recuperación al iniciar solo
+    mira el tamaño del archivo. Un solo proceso escribe el log.
+    Los códigos de operador se guardan en un archivo auxiliar `<path>.ops`.
+    """
+
+    MAGIC = b"CALCLOG2"
+    RECORD = np.dtype(
+        [
+            ("num1", "<f8"),
+            ("num2", "<f8"),
+            ("operator", "u1"),
+            ("result", "<f8"),
+            ("time", "<f8"),
+        ]
+    )
+    # Formato anterior, sin el instante de cada operación; se convierte al abrirlo
+    LEGACY_MAGIC = b"CALCLOG1"
+    LEGACY_RECORD = np.dtype(
+        [("num1", "<f8"), ("num2", "<f8"), ("operator", "u1"), ("result", "<f8")]
+    )
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 10_000,
+        sync_records: int = 256,
+        sync_interval: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser mayor que cero")
+        self.path = path
+        self.capacity = capacity
+        self.sync_records = sync_records
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._pending_count = 0
+        # Contadores de stats de este proceso (el log no los guarda)
+        self._recorded = 0
+        self._errors = 0
+        self._unsynced = False
+        # Hilo de fsync: _wake lo despierta y _deadline es el límite de los pendientes
+        self._wake = threading.Condition(self._lock)
+        self._deadline: Optional[float] = None
+        self._closing = False
+        self._syncer: Optional[threading.Thread] = None
+        self._syncer_pid: Optional[int] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._symbols: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._load_symbols()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._count = self._recover()
+        if self._count > 2 * capacity:
+            self._compact()
+
+    def _load_symbols(self) -> None:
+        """Carga la tabla de códigos de operador."""
+        try:
+            with open(self.path + ".ops", encoding="utf-8") as f:
+                self._symbols = f.read().splitlines()
+        except FileNotFoundError:
+            self._symbols = []
+        self._codes = {symbol: code for code, symbol in enumerate(self._symbols)}
+
+    def _code(self, operator: str) -> int:
+        """Retorna el código del operador, persistiéndolo si es nuevo."""
+        code = self._codes.get(operator)
+        if code is None:
+            if len(self._symbols) > 255 or "\n" in operator:
+                raise ValueError(f"No se puede registrar el operador en el log: {operator}")
+            code = len(self._symbols)
+            with open(self.path + ".ops", "a", encoding="utf-8") as f:
+                f.write(operator + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._symbols.append(operator)
+            self._codes[operator] = code
+        return code
+
+    def _recover(self) -> int:
+        """
+        Valida la cabecera y descarta un registro final incompleto.
+
+        Returns:
+            Cantidad de registros en el log
+        """
+        size = os.fstat(self._fd).st_size
+        header = len(self.MAGIC)
+        if size == 0:
+            os.write(self._fd, self.MAGIC)
+            os.fsync(self._fd)
+            return 0
+        magic = os.pread(self._fd, header, 0)
+        if magic == self.LEGACY_MAGIC:
+            return self._upgrade(size)
+        if magic != self.MAGIC:
+            raise ValueError(f"El archivo no es un log de historial: {self.path}")
+        count, torn = divmod(size - header, self.RECORD.itemsize)
+        if torn:
+            os.ftruncate(self._fd, size - torn)
+            os.fsync(self._fd)
+        return count
+
+    def _upgrade(self, size: int) -> int:
+        """
+        Convierte un log del formato anterior conservando los últimos `capacity`
+        registros; como no guardaba el instante, queda en 0 (epoch).
+
+        Returns:
+            Cantidad de registros en el log convertido
+        """
+        width = self.LEGACY_RECORD.itemsize
+        total = (size - len(self.LEGACY_MAGIC)) // width
+        count = min(total, self.capacity)
+        data = os.pread(self._fd, count * width, len(self.LEGACY_MAGIC) + (total - count) * width)
+        legacy = np.frombuffer(data, dtype=self.LEGACY_RECORD)
+        records = np.zeros(count, dtype=self.RECORD)
+        for name in self.LEGACY_RECORD.names:
+            records[name] = legacy[name]
+        self._rewrite(records.tobytes())
+        return count
+
+    def _compact(self) -> None:
+        """Reescribe el log conservando solo los últimos `capacity` registros."""
+        self._rewrite(self._records()[-self.capacity :].tobytes())
+        self._count = min(self._count, self.capacity)
+
+    def _rewrite(self, records: bytes) -> None:
+        """Reemplaza el log de forma atómica por uno con los registros dados."""
+        temporary = self.path + ".compact"
+        with open(temporary, "wb") as f:
+            f.write(self.MAGIC + records)
+            f.flush()
+            os.fsync(f.fileno())
+        self._unmap()
+        os.replace(temporary, self.path)
+        os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR)
+
+    def _write_pending(self) -> None:
+        """Escribe al archivo los registros en memoria (sin fsync)."""
+        if self._pending:
+            os.lseek(self._fd, 0, os.SEEK_END)
+            os.write(self._fd, self._pending)
+            self._count += self._pending_count
+            self._pending = bytearray()
+            self._pending_count = 0
+            self._unsynced = True
+
+    def _sync(self) -> None:
+        """Escribe los registros pendientes y los confirma con un solo fsync."""
+        self._write_pending()
+        self._deadline = None
+        if self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = False
+
+    def _maybe_sync(self) -> None:
+        """Avisa al hilo de fsync si los pendientes llegaron a sync_records o son los primeros."""
+        if self._pending_count >= self.sync_records:
+            self._deadline = self._clock()
+        elif self._deadline is None:
+            self._deadline = self._clock() + self.sync_interval
+        else:
+            return
+        if self._syncer_pid != os.getpid():
+            # Se inicia en este proceso (también tras un fork)
+            self._syncer_pid = os.getpid()
+            self._syncer = threading.Thread(
+                target=self._sync_loop, name="history-log-sync", daemon=True
+            )
+            self._syncer.start()
+        self._wake.notify()
+
+    def _sync_loop(self) -> None:
+        """Escribe y confirma los pendientes al vencer _deadline, hasta que se cierre el log."""
+        while True:
+            with self._lock:
+                while not self._closing and (
+                    self._deadline is None or self._clock() < self._deadline
+                ):
+                    timeout = None if self._deadline is None else self._deadline - self._clock()
+                    self._wake.wait(timeout)
+                if self._closing:
+                    return
+                self._write_pending()
+                self._deadline = None
+                self._unsynced = False
+                fd = self._fd
+            # El fsync se hace sin el lock: append y extend siguen agregando a _pending
+            try:
+                os.fsync(fd)
+            except OSError:
+                logger.exception("No se pudo confirmar el historial en %s", self.path)
+                with self._lock:
+                    self._unsynced = True
+
+    def _unmap(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Aún hay vistas de NumPy sobre el mapa; se libera al recolectarlas
+                pass
+            self._mmap = None
+
+    def _records(self) -> np.ndarray:
+        """Retorna una vista (sin copiar) de los registros escritos en el archivo."""
+        if self._count == 0:
+            return np.empty(0, dtype=self.RECORD)
+        length = len(self.MAGIC) + self._count * self.RECORD.itemsize
+        if self._mmap is None or len(self._mmap) < length:
+            self._unmap()
+            self._mmap = mmap.mmap(self._fd, length, access=mmap.ACCESS_READ)
+        return np.frombuffer(
+            self._mmap, dtype=self.RECORD, count=self._count, offset=len(self.MAGIC)
+        )
+
+    def append(self, num1: float, num2: float, operator: str, result: float) -> None:
+        with self._lock:
+            self._pending += struct.pack(
+                "<ddBdd", num1, num2, self._code(operator), result, self._wall_clock()
+            )
+            self._pending_count += 1
+            self._recorded += 1
+            self._maybe_sync()
+
+    def extend(
+        self,
+        num1: Sequence[float],
+        num2: Sequence[float],
+        operators: Sequence[str],
+        results: Sequence[float],
+    ) -> None:
+        count = len(results)
+        if count == 0:
+            return
+        with self._lock:
+            symbols, inverse = np.unique(np.asarray(operators, dtype=object), return_inverse=True)
+            records = np.empty(count, dtype=self.RECORD)
+            records["num1"] = num1
+            records["num2"] = num2
+            records["operator"] = np.array([self._code(s) for s in symbols], dtype=np.uint8)[
+                inverse
+            ]
+            records["result"] = results
+            records["time"] = self._wall_clock()
+            self._pending += records.tobytes()
+            self._pending_count += count
+            self._recorded += count
+            self._maybe_sync()
+
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._write_pending()
+            records = self._records()
+            first = max(0, len(records) - self.capacity) + offset
+            last = len(records) if limit is None else min(len(records), first + limit)
+            if first >= last:
+                return []
+            return self._rows(records[first:last])
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        operator: Optional[str] = None,
+        min_result: Optional[float] = None,
+        max_result: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        filters = (operator, min_result, max_result, since, until)
+        if all(value is None for value in filters):
+            return super().query(offset, limit)
+
+        with self._lock:
+            self._write_pending()
+            window = self._records()[-self.capacity :]
+            mask = np.ones(len(window), dtype=bool)
+            if operator is not None:
+                code = self._codes.get(operator)
+                if code is None:
+                    return [], 0
+                mask &= window["operator"] == code
+            for column, low, high in (("result", min_result, max_result), ("time", since, until)):
+                if low is not None:
+                    mask &= window[column] >= low
+                if high is not None:
+                    mask &= window[column] <= high
+
+            matches = window[mask]
+            stop = None if limit is None else offset + limit
+            return self._rows(matches[offset:stop]), len(matches)
+
+    def record_errors(self, count: int = 1) -> None:
+        with self._lock:
+            self._errors += count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._write_pending()
+            window = self._records()[-self.capacity :]
+            counts = np.bincount(window["operator"], minlength=len(self._symbols))
+            operators = {self._symbols[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+            results = window["result"][np.isfinite(window["result"])]
+            finite = len(results)
+            return stats_payload(
+                operators,
+                finite,
+                math.fsum(results.tolist()),
+                float(results.min()) if finite else None,
+                float(results.max()) if finite else None,
+                self._recorded,
+                self._errors,
+            )
+
+    def _rows(self, records: np.ndarray) -> List[Dict[str, Any]]:
+        """Materializa los registros dados."""
+        symbols = self._symbols
+        return [
+            {"num1": a, "num2": b, "operator": symbols[code], "result": r}
+            for a, b, code, r in zip(
+                records["num1"].tolist(),
+                records["num2"].tolist(),
+                records["operator"].tolist(),
+                records["result"].tolist(),
+            )
+        ]
+
+    def flush(self) -> None:
+        """Confirma en disco todos los registros pendientes."""
+        with self._lock:
+            self._sync()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending = bytearray()
+            self._pending_count = 0
+            self._deadline = None
+            self._unmap()
+            os.ftruncate(self._fd, len(self.MAGIC))
+            os.fsync(self._fd)
+            self._count = 0
+            self._recorded = 0
+            self._errors = 0
+            self._unsynced = False
+
+    def __len__(self) -> int:
+        return min(self.capacity, self._count + self._pending_count)
+
+    def close(self) -> None:
+        """Detiene el hilo de fsync, confirma los registros pendientes y cierra el archivo."""
+        with self._lock:
+            self._closing = True
+            self._wake.notify()
+            syncer = self._syncer
+        # Espera un fsync en curso antes de cerrar el descriptor
+        if syncer is not None and syncer is not threading.current_thread():
+            syncer.join()
+        with self._lock:
+            if self._fd < 0:
+                return
+            self._sync()
+            self._unmap()
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PartitionedHistory(HistoryStore):
+    """
+    Historial aislado por cliente.
+    Cada cliente (la clave en `current_client`) tiene su propio historial acotado;
+    las lecturas y la limpieza solo ven la partición del cliente en curso.
+    Al superar max_partitions se descarta la partición usada hace más tiempo.
+    """
+
+    def __init__(self, factory: Callable[[], HistoryStore], max_partitions: int = 1_024):
+        if max_partitions < 1:
+            raise ValueError("Se requiere al menos una partición")
+        self._factory = factory
+        self.max_partitions = max_partitions
+        self._partitions: "OrderedDict[str, HistoryStore]" = OrderedDict()
+
+    def _partition(self, create: bool) -> Optional[HistoryStore]:
+        """Retorna la partición del cliente en curso (creándola si se indica)."""
+        key = current_client.get()
+        store = self._partitions.get(key)
+        if store is not None:
+            self._partitions.move_to_end(key)
+        elif create:
+            store = self._partitions[key] = self._factory()
+            if len(self._partitions) > self.max_partitions:
+                _, evicted = self._partitions.popitem(last=False)
+                evicted.close()
+        return store
+
+    def append(self, num1: float, num2: float, operator: str, result: float) -> None:
+        self._partition(create=True).append(num1, num2, operator, result)
+
+    def extend(
+        self,
+        num1: Sequence[float],
+        num2: Sequence[float],
+        operators: Sequence[str],
+        results: Sequence[float],
+    ) -> None:
+        if len(results):
+            self._partition(create=True).extend(num1, num2, operators, results)
+
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        store = self._partition(create=False)
+        return [] if store is None else store.get_page(offset, limit)
+
+    def query(self, offset: int = 0, limit: Optional[int] = None, **filters: Any):
+        store = self._partition(create=False)
+        if store is None:
+            return [], 0
+        return store.query(offset, limit, **filters)
+
+    def record_errors(self, count: int = 1) -> None:
+        self._partition(create=True).record_errors(count)
+
+    def stats(self) -> Dict[str, Any]:
+        store = self._partition(create=False)
+        return HistoryStats().snapshot() if store is None else store.stats()
+
+    def clear(self) -> None:
+        store = self._partitions.pop(current_client.get(), None)
+        if store is not None:
+            store.close()
+
+    def close(self) -> None:
+        for store in self._partitions.values():
+            store.close()
+        self._partitions.clear()
+
+    def __len__(self) -> int:
+        store = self._partition(create=False)
+        return 0 if store is None else len(store)
+
+    def partitions(self) -> int:
+        """Retorna la cantidad de clientes con historial."""
+        return len(self._partitions)
+
+
+class ClientHistoryMiddleware:
+    """
+    Middleware ASGI que toma la clave de cliente de un header y la deja en
+    `current_client` durante la petición (HTTP o WebSocket).
+    """
+
+    def __init__(self, app: ASGIApp, header: str = "X-Client-Id"):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        client = ""
+        for name, value in scope["headers"]:
+            if name == self.header:
+                client = value.decode("latin-1")
+                break
+        token = current_client.set(client)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_client.reset(token)
+
+
+def create_history_store(config: Settings) -> HistoryStore:
+    """
+    Crea el almacén de historial configurado.
+
+    Args:
+        config: Configuración con history_backend ("memory" por proceso,
+                "sqlite" compartido entre procesos o "file" persistente)
+
+    Raises:
+        ValueError: Si el backend no es válido o no admite historial por cliente
+    """
+    backend = config.history_backend
+    if config.history_per_client:
+        if backend != "memory":
+            raise ValueError("El historial por cliente requiere el backend memory")
+        capacity = config.history_capacity
+        return PartitionedHistory(lambda: RingBufferHistory(capacity), config.history_max_clients)
+    if backend == "memory":
+        return RingBufferHistory(config.history_capacity)
+    if backend == "sqlite":
+        return SQLiteHistoryStore(config.history_sqlite_path, config.history_capacity)
+    if backend == "file":
+        return FileHistoryStore(
+            config.history_log_path,
+            config.history_capacity,
+            config.history_log_sync_records,
+            config.history_log_sync_interval_ms / 1000,
+        )
+    raise ValueError(f"Backend de historial no soportado: {backend}")
@@ -3,15 +3,48 @@ Aplicación principal de FastAPI.
 Principio SOLID: Dependency Inversion - Los endpoints dependen de abstracciones.
 """
 
-from fastapi import FastAPI, HTTPException, status
+import asyncio
+import math
+import secrets
+
+import numpy as np
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, status
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import ValidationError
+from typing import Dict, Any, Optional, Union
+from .admission import AdmissionController, AdmissionMiddleware
+from .binary import FLOAT64, MSGPACK, BinaryRoute, decode_float64, encode_float64
+from .binary import float64_column, pack, unpack
 from .calculator import Calculator
+from .history import ClientHistoryMiddleware
+from .config import settings
+from .executor import OffloadExecutor
+from .metrics import MetricsMiddleware, MetricsRegistry
+from .profiling import ProfilingMiddleware, StackSampler
+from .serialization import FastJSONResponse, history_payload, operation_payload
+from .sessions import SessionManager
+from .streaming import DuplexStreamingResponse, evaluate_stream
 from .schemas import (
     OperationRequest,
     ChainOperationRequest,
+    CompactChainRequest,
+    BatchOperationRequest,
+    ReduceRequest,
+    CompiledChainRequest,
+    EvaluateRequest,
+    TemplateRequest,
+    TemplateEvaluateRequest,
     OperationResponse,
+    BatchOperationResponse,
+    ReduceResponse,
+    CompiledChainResponse,
+    TemplateResponse,
     HistoryResponse,
+    HistoryStatsResponse,
     ErrorResponse,
 )
 
@@ -22,7 +55,54 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Configurar CORS para permitir peticiones desde el frontend
+# Las rutas con manejador binario aceptan también MessagePack y float64 (ver binary.py)
+app.router.route_class = BinaryRoute
+
+
+def _json_safe(value: Any) -> Any:
+    """Reemplaza los float no finitos (inf, nan) por su texto para poder serializarlos."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(
+    request: Request, exc: RequestValidationError
+) -> JSONResponse:
+    """
+    Responde 422 como el manejador de FastAPI. Los números no finitos de la
+    entrada (1e400, NaN) se rechazan en los esquemas y se devuelven como texto.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": _json_safe(jsonable_encoder(exc.errors()))},
+    )
+
+
+# Control de admisión por cliente y de concurrencia (desactivado por defecto).
+# Se agrega antes que las métricas para que estas cuenten también los rechazos
+admission = AdmissionController(
+    enabled=settings.admission_enabled,
+    rate=settings.admission_rate,
+    burst=settings.admission_burst,
+    max_concurrency=settings.admission_max_concurrency,
+    cost_bytes=settings.admission_cost_bytes,
+    sweep_interval=settings.admission_sweep_interval_seconds,
+)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    header=settings.admission_client_header,
+    api_keys=settings.admission_api_keys,
+)
+
+# Configurar CORS para permitir peticiones desde el frontend. Envuelve la admisión:
+# los rechazos 429/503 también llevan los headers CORS y los preflight no cobran tokens
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -36,8 +116,85 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas por ruta y por etapa (desactivadas por defecto)
+metrics = MetricsRegistry(enabled=settings.metrics_enabled)
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Perfilador por muestreo (se inicia por configuración o desde /admin/profiler)
+profiler = StackSampler(settings.profiling_interval_ms)
+app.add_middleware(ProfilingMiddleware, sampler=profiler)
+
+# Historial aislado por cliente según un header (desactivado por defecto)
+if settings.history_per_client:
+    app.add_middleware(ClientHistoryMiddleware, header=settings.history_client_header)
+
+# Pool de procesos para las peticiones grandes (desactivado por defecto)
+executor = (
+    OffloadExecutor(
+        settings.offload_workers,
+        settings.offload_threshold,
+        settings.offload_chunk_size,
+        settings.offload_start_method,
+    )
+    if settings.offload_enabled
+    else None
+)
+
 # Instancia global de la calculadora (Singleton pattern)
-calculator = Calculator()
+calculator = Calculator(metrics=metrics if metrics.enabled else None, executor=executor)
+
+# Sesiones WebSocket con acumulador (/ws/session)
+sessions = SessionManager(settings.ws_max_sessions, settings.ws_idle_timeout_seconds)
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    """Inicia el perfilador y el pool de procesos si están activados por configuración."""
+    # Se inicia desde el hilo del event loop, que es el hilo que se muestrea
+    if settings.profiling_enabled:
+        profiler.start()
+    if executor is not None:
+        executor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """Libera los recursos de la calculadora al detener el servicio."""
+    profiler.stop()
+    if executor is not None:
+        executor.shutdown()
+    calculator.close()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Verifica el token de administración del header X-Admin-Token."""
+    if settings.admin_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Administración desactivada"
+        )
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Token de administración inválido"
+        )
+
+
+MESSAGE_QUERY = Query(
+    None, description="Incluir el mensaje formateado (por defecto no, en modo rápido)"
+)
+
+
+def include_message(message: Optional[bool]) -> bool:
+    """Indica si se debe generar el mensaje de la respuesta."""
+    return not settings.fast_serialization if message is None else message
+
+
+def operation_response(
+    result: float, message: Optional[str], exact: Optional[str] = None
+) -> Union[OperationResponse, FastJSONResponse]:
+    """Construye la respuesta de una operación según el modo de serialización."""
+    if settings.fast_serialization:
+        return FastJSONResponse(operation_payload(result, message, exact))
+    return OperationResponse(result=result, message=message, exact=exact)
 
 
 @app.get("/", tags=["Root"])
@@ -58,24 +215,37 @@ async def get_operations() -> Dict[str, Any]:
 @app.post(
     "/calculate",
     response_model=OperationResponse,
+    response_model_exclude_none=True,
     responses={400: {"model": ErrorResponse}},
     tags=["Calculator"],
 )
-async def calculate(request: OperationRequest) -> OperationResponse:
+async def calculate(
+    request: OperationRequest, message: Optional[bool] = MESSAGE_QUERY
+) -> Union[OperationResponse, FastJSONResponse]:
     """
     Realiza una operación matemática simple.
 
     Args:
-        request: Objeto con num1, num2 y operator
+        request: Objeto con num1, num2, operator y el modo numérico (numeric)
+        message: Incluir el mensaje formateado
 
     Returns:
         Resultado de la operación
     """
     try:
-        result = calculator.calculate(request.num1, request.num2, request.operator)
-        return OperationResponse(
-            result=result, message=f"{request.num1} {request.operator} {request.num2} = {result}"
+        exact = None
+        if request.numeric == "float":
+            result = calculator.calculate(request.num1, request.num2, request.operator)
+        else:
+            result, exact = calculator.calculate_numeric(
+                request.num1, request.num2, request.operator, request.numeric
+            )
+        text = (
+            f"{request.num1} {request.operator} {request.num2} = {exact or result}"
+            if include_message(message)
+            else None
         )
+        return operation_response(result, text, exact)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -84,28 +254,108 @@ async def calculate(request: OperationRequest) -> OperationResponse:
         )
 
 
+@BinaryRoute.register("/calculate")
+async def calculate_binary(request: Request, media_type: str) -> Response:
+    """
+    Realiza una operación simple recibida en MessagePack ({num1, num2, operator})
+    o float64 (una operación). Responde en el mismo formato.
+    """
+    body = await request.body()
+    try:
+        if media_type == FLOAT64:
+            num1, num2, operators = decode_float64(body, calculator.get_supported_operations())
+            if len(operators) != 1:
+                raise ValueError("Se espera una sola operación")
+            result = calculator.calculate(float(num1[0]), float(num2[0]), operators[0])
+            return Response(
+                encode_float64(np.array([result]), np.zeros(1, dtype=bool)), media_type=FLOAT64
+            )
+        data = unpack(body)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        operation = OperationRequest(**data)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    try:
+        if operation.numeric == "float":
+            content = {
+                "result": calculator.calculate(operation.num1, operation.num2, operation.operator)
+            }
+        else:
+            result, exact = calculator.calculate_numeric(
+                operation.num1, operation.num2, operation.operator, operation.numeric
+            )
+            content = {"result": result, "exact": exact}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(pack(content), media_type=MSGPACK)
+
+
 @app.post(
     "/calculate-chain",
     response_model=OperationResponse,
+    response_model_exclude_none=True,
     responses={400: {"model": ErrorResponse}},
     tags=["Calculator"],
 )
-async def calculate_chain(request: ChainOperationRequest) -> OperationResponse:
+async def calculate_chain(
+    request: ChainOperationRequest, message: Optional[bool] = MESSAGE_QUERY
+) -> Union[OperationResponse, FastJSONResponse]:
     """
     Realiza operaciones en cadena.
 
     Args:
-        request: Lista de operaciones a realizar en secuencia
+        request: Lista de operaciones a realizar en secuencia y el modo numérico
+        message: Incluir el mensaje
 
     Returns:
         Resultado final de todas las operaciones
     """
     try:
         operations = [op.dict() for op in request.operations]
-        result = calculator.calculate_chain(operations)
-        return OperationResponse(
-            result=result, message="Operaciones en cadena ejecutadas exitosamente"
+        exact = None
+        if request.numeric == "float":
+            result = await calculator.calculate_chain_async(operations)
+        else:
+            result, exact = calculator.calculate_chain_numeric(operations, request.numeric)
+        text = "Operaciones en cadena ejecutadas exitosamente" if include_message(message) else None
+        return operation_response(result, text, exact)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error inesperado: {str(e)}"
+        )
+
+
+@app.post(
+    "/calculate-chain/compact",
+    response_model=OperationResponse,
+    response_model_exclude_none=True,
+    responses={400: {"model": ErrorResponse}},
+    tags=["Calculator"],
+)
+async def calculate_chain_compact(
+    request: CompactChainRequest, message: Optional[bool] = MESSAGE_QUERY
+) -> Union[OperationResponse, FastJSONResponse]:
+    """
+    Realiza operaciones en cadena recibidas en formato compacto.
+
+    Args:
+        request: num1 y los pasos como arreglos paralelos o cadena empaquetada ("+5*2-3")
+        message: Incluir el mensaje
+
+    Returns:
+        Resultado final de todas las operaciones
+    """
+    try:
+        result = await calculator.calculate_chain_compact_async(
+            request.num1, request.operators, request.operands
         )
+        text = "Operaciones en cadena ejecutadas exitosamente" if include_message(message) else None
+        return operation_response(result, text)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -114,20 +364,488 @@ async def calculate_chain(request: ChainOperationRequest) -> OperationResponse:
         )
 
 
-@app.get("/history", response_model=HistoryResponse, tags=["History"])
-async def get_history() -> HistoryResponse:
-    """Obtiene el historial de operaciones realizadas."""
-    history = calculator.get_history()
-    return HistoryResponse(history=history, count=len(history))
+@app.post(
+    "/calculate-chain/compile",
+    response_model=CompiledChainResponse,
+    responses={400: {"model": ErrorResponse}},
+    tags=["Calculator"],
+)
+async def compile_chain(request: ChainOperationRequest) -> CompiledChainResponse:
+    """
+    Compila una cadena de operaciones para ejecutarla varias veces.
+
+    Args:
+        request: Lista de operaciones (el num1 de la primera se ignora)
+
+    Returns:
+        Identificador de la cadena compilada y sus pasos tras combinar constantes
+    """
+    try:
+        compiled = calculator.compile_chain([op.dict() for op in request.operations])
+        return CompiledChainResponse(
+            compiled_id=compiled.chain_id,
+            steps=[{"operator": operator, "num2": num2} for operator, num2 in compiled.steps],
+            source_steps=len(compiled.source_steps),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.post(
+    "/calculate-chain/{compiled_id}",
+    response_model=OperationResponse,
+    response_model_exclude_none=True,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+    tags=["Calculator"],
+)
+async def run_compiled_chain(compiled_id: str, request: CompiledChainRequest) -> OperationResponse:
+    """
+    Ejecuta una cadena compilada con un nuevo número inicial.
+
+    Args:
+        compiled_id: Identificador retornado por /calculate-chain/compile
+        request: Número inicial
+
+    Returns:
+        Resultado final de la cadena
+    """
+    compiled = calculator.get_compiled_chain(compiled_id)
+    if compiled is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Cadena compilada no encontrada"
+        )
+    try:
+        result = calculator.run_compiled_chain(compiled, request.num1)
+        return OperationResponse(result=result, message="Cadena compilada ejecutada exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.post(
+    "/calculate-batch",
+    response_model=BatchOperationResponse,
+    responses={400: {"model": ErrorResponse}},
+    tags=["Calculator"],
+)
+async def calculate_batch(
+    request: BatchOperationRequest,
+) -> Union[BatchOperationResponse, FastJSONResponse]:
+    """
+    Realiza operaciones independientes en lote.
+
+    Args:
+        request: Arreglos columnares num1, num2 y operator
+
+    Returns:
+        Resultado por elemento y errores por elemento (p. ej. división por cero)
+    """
+    try:
+        batch = await calculator.calculate_batch_async(request.num1, request.num2, request.operator)
+        if settings.fast_serialization:
+            return FastJSONResponse({**batch, "count": len(batch["results"])})
+        return BatchOperationResponse(
+            results=batch["results"], errors=batch["errors"], count=len(batch["results"])
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error inesperado: {str(e)}"
+        )
+
+
+@BinaryRoute.register("/calculate-batch")
+async def calculate_batch_binary(request: Request, media_type: str) -> Response:
+    """
+    Realiza operaciones en lote recibidas en float64 o MessagePack, sin convertir
+    los números a objetos de Python.
+
+    - float64: n float64 de num1, n de num2 y n bytes con el código de operador
+      (su posición en GET /operations). Responde n float64 de resultados y n bytes
+      (1 si el elemento falló).
+    - MessagePack: mapa con num1 y num2 (bin de float64 o listas) y operator
+      (lista). Responde {results (bin de float64, NaN si falló), errors, count}.
+    """
+    body = await request.body()
+    try:
+        if media_type == FLOAT64:
+            a, b, ops = decode_float64(body, calculator.get_supported_operations())
+            results, failed, _ = await calculator.calculate_batch_arrays_async(a, b, ops)
+            return Response(encode_float64(results, failed), media_type=FLOAT64)
+
+        data = unpack(body)
+        a, b = float64_column(data.get("num1")), float64_column(data.get("num2"))
+        operators = data.get("operator")
+        if not isinstance(operators, list) or not operators:
+            raise ValueError("operator debe ser una lista no vacía")
+        if not all(isinstance(operator, str) for operator in operators):
+            raise ValueError("Cada operador debe ser un texto")
+        results, _, errors = await calculator.calculate_batch_arrays_async(
+            a, b, np.asarray(operators, dtype=object)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(
+        pack({"results": results.astype("<f8").tobytes(), "errors": errors, "count": len(results)}),
+        media_type=MSGPACK,
+    )
+
+
+@app.post(
+    "/reduce",
+    response_model=ReduceResponse,
+    responses={400: {"model": ErrorResponse}},
+    tags=["Calculator"],
+)
+async def reduce_array(request: ReduceRequest) -> ReduceResponse:
+    """
+    Reduce un arreglo de valores a un solo número: sum, product, mean, min, max,
+    variance (ddof 0 o 1) o percentile. Registra una sola entrada en el historial.
+    """
+    try:
+        result = await calculator.reduce_async(
+            request.values, request.operation, request.percentile, request.ddof
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ReduceResponse(operation=request.operation, result=result, count=len(request.values))
+
+
+@BinaryRoute.register("/reduce")
+async def reduce_array_binary(request: Request, media_type: str) -> Response:
+    """
+    Reduce valores recibidos en float64 o MessagePack.
+
+    - float64: el cuerpo son los valores (float64 little-endian); operation,
+      percentile y ddof van en la query. Responde el resultado como un float64.
+    - MessagePack: mapa con operation, values (bin de float64 o lista) y
+      opcionalmente percentile y ddof. Responde {operation, result, count}.
+    """
+    body = await request.body()
+    try:
+        if media_type == FLOAT64:
+            options: Dict[str, Any] = dict(request.query_params)
+            for field, convert in (("percentile", float), ("ddof", int)):
+                if field in options:
+                    try:
+                        options[field] = convert(options[field])
+                    except ValueError:
+                        raise ValueError(f"'{field}' debe ser un número")
+        else:
+            options = unpack(body)
+        values = float64_column(body if media_type == FLOAT64 else options.get("values"))
+        operation = options.get("operation")
+        if not isinstance(operation, str):
+            raise ValueError("Se requiere 'operation'")
+        result = await calculator.reduce_async(
+            values, operation, options.get("percentile"), options.get("ddof", 0)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if media_type == FLOAT64:
+        return Response(np.array([result], dtype="<f8").tobytes(), media_type=FLOAT64)
+    return Response(
+        pack({"operation": operation, "result": result, "count": len(values)}),
+        media_type=MSGPACK,
+    )
+
+
+@app.post(
+    "/evaluate",
+    response_model=OperationResponse,
+    response_model_exclude_none=True,
+    responses={400: {"model": ErrorResponse}},
+    tags=["Calculator"],
+)
+async def evaluate(request: EvaluateRequest) -> OperationResponse:
+    """
+    Evalúa una expresión aritmética respetando precedencia y paréntesis.
+
+    Args:
+        request: Expresión y valores de sus variables
+
+    Returns:
+        Resultado de la expresión
+    """
+    try:
+        result = calculator.evaluate(request.expression, request.variables)
+        return OperationResponse(result=result, message=f"{request.expression} = {result}")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.post(
+    "/templates",
+    response_model=TemplateResponse,
+    responses={400: {"model": ErrorResponse}},
+    tags=["Templates"],
+)
+async def register_template(request: TemplateRequest) -> TemplateResponse:
+    """
+    Registra una plantilla de fórmula con variables.
+
+    Args:
+        request: Fórmula, p. ej. "price * qty - discount"
+
+    Returns:
+        Identificador de la plantilla y sus variables
+    """
+    try:
+        template_id, template = calculator.register_template(request.expression)
+        return TemplateResponse(
+            template_id=template_id,
+            expression=template.source,
+            variables=sorted(template.variables),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.post(
+    "/templates/{template_id}/evaluate",
+    response_model=BatchOperationResponse,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+    tags=["Templates"],
+)
+async def evaluate_template(
+    template_id: str, request: TemplateEvaluateRequest
+) -> BatchOperationResponse:
+    """
+    Evalúa una plantilla sobre columnas de valores (una fila por elemento).
+
+    Args:
+        template_id: Identificador retornado por POST /templates
+        request: Columna de valores por variable
+
+    Returns:
+        Resultado por fila y errores por fila
+    """
+    template = calculator.get_template(template_id)
+    if template is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plantilla no encontrada")
+    try:
+        evaluated = calculator.evaluate_template(template, request.bindings)
+        return BatchOperationResponse(
+            results=evaluated["results"],
+            errors=evaluated["errors"],
+            count=len(evaluated["results"]),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.post(
+    "/calculate-stream",
+    response_class=DuplexStreamingResponse,
+    tags=["Calculator"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {"type": "string"},
+                    "example": '{"num1": 10, "num2": 5, "operator": "+"}\n'
+                    '{"num1": 1, "num2": 0, "operator": "/"}\n',
+                }
+            },
+        }
+    },
+)
+async def calculate_stream(request: Request) -> DuplexStreamingResponse:
+    """
+    Evalúa un stream de operaciones en formato NDJSON (un objeto por línea).
+
+    Los resultados se retornan como NDJSON a medida que se procesan:
+    {"result": ..., "line": n} o {"error": ..., "line": n} por cada línea.
+    La memoria usada no depende del tamaño de la entrada.
+    """
+    return DuplexStreamingResponse(
+        evaluate_stream(calculator, request.stream()), media_type="application/x-ndjson"
+    )
+
+
+@app.websocket("/ws/session")
+async def calculator_session(websocket: WebSocket) -> None:
+    """
+    Sesión interactiva con un acumulador en el servidor.
+
+    Al conectar se recibe {"session": id, "result": 0}. Cada mensaje
+    {"operator": "+", "num2": 5} se aplica al acumulador y se responde
+    {"result": ...} (o {"error": ..., "result": ...} sin cambiar el acumulador).
+    También se aceptan {"num1": x} para fijar el acumulador y {"action": "clear"}.
+    """
+    await websocket.accept()
+    try:
+        session = sessions.open()
+    except ValueError as e:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e))
+        return
+
+    try:
+        await websocket.send_json({"session": session.session_id, "result": session.accumulator})
+        while True:
+            try:
+                text = await asyncio.wait_for(websocket.receive_text(), sessions.idle_timeout)
+            except asyncio.TimeoutError:
+                sessions.evict(session)
+                await websocket.close(code=status.WS_1001_GOING_AWAY, reason="Sesión inactiva")
+                return
+            await websocket.send_json(session.handle(calculator, text))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sessions.close(session)
+
+
+@app.get(
+    "/history",
+    response_model=HistoryResponse,
+    responses={400: {"model": ErrorResponse}},
+    tags=["History"],
+)
+async def get_history(
+    offset: int = Query(0, ge=0, description="Operaciones a omitir desde la más antigua"),
+    limit: Optional[int] = Query(None, ge=1, description="Máximo de operaciones a retornar"),
+    operator: Optional[str] = Query(None, description="Solo operaciones con este operador"),
+    min_result: Optional[float] = Query(None, description="Solo resultados mayores o iguales"),
+    max_result: Optional[float] = Query(None, description="Solo resultados menores o iguales"),
+    since: Optional[float] = Query(None, description="Desde este instante (epoch, segundos)"),
+    until: Optional[float] = Query(None, description="Hasta este instante (epoch, segundos)"),
+) -> Union[HistoryResponse, FastJSONResponse]:
+    """
+    Obtiene una ventana del historial de operaciones realizadas.
+    Con filtros, `total` es la cantidad de coincidencias.
+    """
+    try:
+        history, total = calculator.query_history(
+            offset,
+            limit,
+            operator=operator,
+            min_result=min_result,
+            max_result=max_result,
+            since=since,
+            until=until,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if settings.fast_serialization:
+        return FastJSONResponse(history_payload(history, total, offset))
+    return HistoryResponse(history=history, count=len(history), total=total, offset=offset)
+
+
+@app.get(
+    "/history/stats",
+    response_model=HistoryStatsResponse,
+    responses={400: {"model": ErrorResponse}},
+    tags=["History"],
+)
+async def get_history_stats() -> HistoryStatsResponse:
+    """
+    Obtiene los agregados del historial: conteo por operador, suma, media,
+    mínimo, máximo y tasa de error. Se mantienen al agregar y descartar
+    operaciones, por lo que la consulta no recorre el historial.
+    """
+    try:
+        return HistoryStatsResponse(**calculator.get_history_stats())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @app.delete("/history", tags=["History"])
 async def clear_history() -> Dict[str, str]:
     """Limpia el historial de operaciones."""
-    calculator.clear_history()
+    try:
+        calculator.clear_history()
+    except TimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     return {"message": "Historial limpiado exitosamente"}
 
 
+@app.get("/cache/stats", tags=["Cache"])
+async def get_cache_stats() -> Dict[str, Any]:
+    """Obtiene los contadores de la caché de resultados (aciertos, fallos, entradas)."""
+    return calculator.get_cache_stats()
+
+
+@app.get("/admission/stats", tags=["Admission"])
+async def get_admission_stats() -> Dict[str, Any]:
+    """Obtiene los contadores del control de admisión (admitidas, 429, 503, clientes)."""
+    return admission.stats()
+
+
+@app.get("/coalescing/stats", tags=["Executor"])
+async def get_coalescing_stats() -> Dict[str, Any]:
+    """Obtiene los contadores de la coalescencia de cadenas (cálculos y peticiones compartidas)."""
+    return calculator.get_coalescing_stats()
+
+
+@app.get("/executor/stats", tags=["Executor"])
+async def get_executor_stats() -> Dict[str, Any]:
+    """Obtiene la cola (pendientes, en espera) y la utilización del pool de procesos."""
+    return calculator.get_executor_stats()
+
+
+@app.delete("/cache", tags=["Cache"])
+async def clear_cache() -> Dict[str, str]:
+    """Limpia la caché de resultados."""
+    calculator.clear_cache()
+    return {"message": "Caché limpiada exitosamente"}
+
+
+@app.get("/admin/profiler", dependencies=[Depends(require_admin)], tags=["Admin"])
+async def get_profiler() -> Dict[str, Any]:
+    """Obtiene el estado del perfilador (activo, intervalo, muestras)."""
+    return profiler.stats()
+
+
+@app.post("/admin/profiler/start", dependencies=[Depends(require_admin)], tags=["Admin"])
+async def start_profiler() -> Dict[str, Any]:
+    """Inicia el muestreo de pilas de las peticiones en curso."""
+    profiler.start()
+    return profiler.stats()
+
+
+@app.post("/admin/profiler/stop", dependencies=[Depends(require_admin)], tags=["Admin"])
+async def stop_profiler() -> Dict[str, Any]:
+    """Detiene el muestreo conservando las pilas acumuladas."""
+    profiler.stop()
+    return profiler.stats()
+
+
+@app.get(
+    "/admin/profiler/collapsed",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin)],
+    tags=["Admin"],
+)
+async def get_profile() -> PlainTextResponse:
+    """
+    Exporta las pilas muestreadas en formato collapsed ("a;b;c cantidad" por línea),
+    compatible con flamegraph.pl y speedscope.
+    """
+    return PlainTextResponse(profiler.collapsed())
+
+
+@app.delete("/admin/profiler", dependencies=[Depends(require_admin)], tags=["Admin"])
+async def reset_profiler() -> Dict[str, str]:
+    """Descarta las pilas acumuladas."""
+    profiler.reset()
+    return {"message": "Perfil descartado exitosamente"}
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    responses={404: {"model": ErrorResponse}},
+    tags=["Health"],
+)
+async def get_metrics() -> PlainTextResponse:
+    """Exporta las métricas en el formato de texto de Prometheus."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Métricas desactivadas")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health", tags=["Health"])
 async def health_check() -> Dict[str, str]:
     """Endpoint de verificación de salud del servicio."""
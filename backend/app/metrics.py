@@ -0,0 +1,250 @@
+"""
+Módulo de métricas.
+Registra contadores e histogramas de latencia por ruta y por etapa interna
+(búsqueda de la operación, ejecución y escritura del historial) y los exporta
+en el formato de texto de Prometheus.
+Principio SOLID: Single Responsibility - Solo se encarga de medir y exportar.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .history import HistoryStore
+
+# Límites superiores de los buckets, en segundos (100 µs a 10 s)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Etapas internas medidas por la calculadora
+STAGES = ("create_operation", "execute", "history_write")
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos.
+    Los contadores se reservan al crearlo; observar un valor solo busca el
+    bucket (búsqueda binaria) e incrementa su contador.
+    """
+
+    __slots__ = ("bounds", "_counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        # Un contador por bucket más el bucket +Inf
+        self._counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Registra una observación (en segundos)."""
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Retorna los pares (le, cantidad acumulada) incluyendo +Inf."""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float("inf"),), self._counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del servicio.
+    Si está desactivado, el middleware y la calculadora no miden nada.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self.stages: Dict[str, Histogram] = {stage: Histogram(self.buckets) for stage in STAGES}
+
+    def stage(self, name: str) -> Histogram:
+        """Retorna el histograma de una etapa interna."""
+        return self.stages[name]
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        """Registra una petición HTTP terminada."""
+        key = (method, route)
+        histogram = self._latency.get(key)
+        if histogram is None:
+            histogram = self._latency[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        counter_key = (method, route, str(status_code))
+        self._requests[counter_key] = self._requests.get(counter_key, 0) + 1
+
+    def reset(self) -> None:
+        """Reinicia todas las métricas."""
+        self._latency.clear()
+        self._requests.clear()
+        self.stages = {stage: Histogram(self.buckets) for stage in STAGES}
+
+    def render(self) -> str:
+        """Exporta las métricas en el formato de texto de Prometheus."""
+        lines = [
+            "# HELP calculadora_http_requests_total Peticiones HTTP atendidas.",
+            "# TYPE calculadora_http_requests_total counter",
+        ]
+        for (method, route, code), count in sorted(self._requests.items()):
+            labels = _labels(method=method, route=route, status=code)
+            lines.append(f"calculadora_http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP calculadora_http_request_duration_seconds Latencia de las peticiones HTTP.",
+            "# TYPE calculadora_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self._latency.items()):
+            lines += _histogram_lines(
+                "calculadora_http_request_duration_seconds",
+                _labels(method=method, route=route),
+                histogram,
+            )
+
+        lines += [
+            "# HELP calculadora_stage_duration_seconds Latencia de las etapas internas.",
+            "# TYPE calculadora_stage_duration_seconds histogram",
+        ]
+        for stage, histogram in self.stages.items():
+            lines += _histogram_lines(
+                "calculadora_stage_duration_seconds", _labels(stage=stage), histogram
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    """Formatea etiquetas de Prometheus escapando los valores."""
+    return ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    """Retorna las líneas _bucket, _sum y _count de un histograma."""
+    lines = [
+        f'{name}_bucket{{{labels},le="{bound}"}} {count}' for bound, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide la latencia y el código de estado por ruta.
+    La ruta se etiqueta con su plantilla (p. ej. /calculate-chain/{compiled_id})
+    para no crear una serie por cada identificador.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.registry.observe_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                time.perf_counter() - start,
+            )
+
+
+class TimedHistoryStore(HistoryStore):
+    """
+    Historial que mide el tiempo de cada escritura en otro historial.
+    Patrón de diseño: Decorator - Agrega medición sin modificar el historial original.
+    """
+
+    def __init__(self, store: HistoryStore, histogram: Histogram):
+        self.store = store
+        self.histogram = histogram
+
+    def append(self, num1: float, num2: float, operator: str, result: float) -> None:
+        start = time.perf_counter()
+        try:
+            self.store.append(num1, num2, operator, result)
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+
+    def extend(
+        self,
+        num1: Sequence[float],
+        num2: Sequence[float],
+        operators: Sequence[str],
+        results: Sequence[float],
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            self.store.extend(num1, num2, operators, results)
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+
+    def get_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.store.get_page(offset, limit)
+
+    def query(
+        self, offset: int = 0, limit: Optional[int] = None, **filters: Any
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        return self.store.query(offset, limit, **filters)
+
+    def record_errors(self, count: int = 1) -> None:
+        self.store.record_errors(count)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def close(self) -> None:
+        self.store.close()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getattr__(self, name: str) -> Any:
+        # Métodos propios del historial decorado (p. ej. flush del log en disco)
+        return getattr(self.store, name)
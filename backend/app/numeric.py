@@ -0,0 +1,139 @@
+"""
+Módulo de modos numéricos.
+Define con qué tipo de número se ejecutan las operaciones: float (por defecto,
+el más rápido), decimal.Decimal con un contexto configurable o fractions.Fraction
+(aritmética exacta). Las operaciones usan los operadores de Python, por lo que
+funcionan con cualquiera de estos tipos sin cambios.
+Principio SOLID: Open/Closed - Un modo nuevo es una subclase de NumericMode.
+"""
+
+import decimal
+import math
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from fractions import Fraction
+from typing import Any, ContextManager, Dict, Iterator
+
+from .config import Settings
+from .operations import OVERFLOW_MESSAGE
+
+NUMERIC_MODES = ("float", "decimal", "fraction")
+
+
+class NumericMode(ABC):
+    """Interfaz de un modo numérico."""
+
+    name = ""
+
+    @abstractmethod
+    def convert(self, value: float) -> Any:
+        """Convierte un número de la petición al tipo del modo."""
+        pass
+
+    def context(self) -> ContextManager[Any]:
+        """Contexto en el que se ejecutan las operaciones del modo."""
+        return nullcontext()
+
+    def check(self, value: Any) -> Any:
+        """Valida el resultado de una operación en el modo y lo retorna."""
+        return value
+
+    def to_float(self, value: Any) -> float:
+        """
+        Retorna la aproximación float de un valor (para el historial y `result`).
+
+        Raises:
+            ValueError: Si el valor excede el rango de los float
+        """
+        try:
+            approximation = float(value)
+        except OverflowError:
+            raise ValueError(OVERFLOW_MESSAGE) from None
+        if math.isinf(approximation):
+            raise ValueError(OVERFLOW_MESSAGE)
+        return approximation
+
+    def format(self, value: Any) -> str:
+        """Retorna la representación exacta de un valor."""
+        return str(value)
+
+
+class FloatMode(NumericMode):
+    """Modo float: los números se usan tal cual."""
+
+    name = "float"
+
+    def convert(self, value: float) -> float:
+        return value
+
+    def format(self, value: Any) -> str:
+        return repr(float(value))
+
+
+class DecimalMode(NumericMode):
+    """
+    Modo decimal: cada número se convierte desde su representación decimal
+    más corta (0.1 es exactamente Decimal("0.1")) y las operaciones se
+    redondean según el contexto (precisión y modo de redondeo).
+    """
+
+    name = "decimal"
+
+    def __init__(self, precision: int = 28, rounding: str = decimal.ROUND_HALF_EVEN):
+        if precision < 1:
+            raise ValueError("La precisión decimal debe ser mayor que cero")
+        self._context = decimal.Context(prec=precision, rounding=rounding)
+
+    def convert(self, value: float) -> decimal.Decimal:
+        return decimal.Decimal(repr(float(value)))
+
+    @contextmanager
+    def context(self) -> Iterator[decimal.Context]:
+        with decimal.localcontext(self._context) as context:
+            try:
+                yield context
+            except decimal.DecimalException as e:
+                raise ValueError(f"Error en aritmética decimal: {type(e).__name__}")
+
+
+class FractionMode(NumericMode):
+    """
+    Modo fracción: aritmética racional exacta a partir de la representación
+    decimal más corta de cada número (0.1 es exactamente 1/10).
+    """
+
+    name = "fraction"
+
+    def __init__(self, max_digits: int = 1000):
+        if max_digits < 1:
+            raise ValueError("El máximo de dígitos del modo fraction debe ser mayor que cero")
+        self.max_digits = max_digits
+        self._limit = 10**max_digits
+
+    def convert(self, value: float) -> Fraction:
+        if not math.isfinite(value):
+            raise ValueError("El modo fraction requiere números finitos")
+        return Fraction(repr(float(value)))
+
+    def check(self, value: Any) -> Any:
+        # ^ con exponente no entero, root, log y exp retornan float: no son exactos
+        if not isinstance(value, (Fraction, int)):
+            raise ValueError(
+                "El resultado no es racional, no se puede representar en modo fraction"
+            )
+        # Sin cota, una cadena larga hace crecer la fracción sin límite y tarda cada vez más
+        if abs(value.numerator) >= self._limit or value.denominator >= self._limit:
+            raise ValueError(
+                f"La fracción excede el máximo de {self.max_digits} dígitos del modo fraction"
+            )
+        return value
+
+
+def create_numeric_modes(config: Settings) -> Dict[str, NumericMode]:
+    """Crea los modos numéricos disponibles, indexados por nombre."""
+    modes = (
+        FloatMode(),
+        DecimalMode(config.decimal_precision, config.decimal_rounding),
+        FractionMode(config.fraction_max_digits),
+    )
+    return {mode.name: mode for mode in modes}
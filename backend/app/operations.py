@@ -1,19 +1,36 @@
 """
 Módulo de operaciones matemáticas.
-Implementa el patrón Strategy para las operaciones básicas.
+Implementa el patrón Strategy para las operaciones básicas (+, -, *, /) y las
+extendidas (potencia, módulo, división entera, raíz, logaritmo y exponencial).
+Cada operación tiene una versión escalar (execute) y un kernel vectorizado
+(execute_batch); las escalares funcionan con float, Decimal y Fraction.
 Principio SOLID: Single Responsibility - Cada clase tiene una única responsabilidad.
 """
 
+import math
 from abc import ABC, abstractmethod
-from typing import Union
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, Dict, Optional, Tuple, Type
+
+import numpy as np
+
+# Exponente máximo de una potencia con fracciones (el resultado exacto crece sin límite)
+MAX_EXACT_EXPONENT = 10_000
+
+OVERFLOW_MESSAGE = "El resultado excede el rango de los números de punto flotante"
 
 
 class Operation(ABC):
     """
     Clase abstracta que define la interfaz para todas las operaciones.
     Principio SOLID: Open/Closed - Abierto para extensión, cerrado para modificación.
+    Las operaciones no tienen estado, por lo que una misma instancia se comparte
+    entre todas las llamadas (ver OperationFactory).
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def execute(self, a: float, b: float) -> float:
         """Ejecuta la operación matemática."""
@@ -24,40 +41,79 @@ class Operation(ABC):
         """Retorna el símbolo de la operación."""
         pass
 
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Ejecuta la operación sobre arreglos completos (versión vectorizada).
+
+        La implementación por defecto recorre los elementos con `execute`;
+        las subclases la sobrescriben con un kernel de NumPy.
+        """
+        return np.fromiter(
+            map(self.execute, a.tolist(), b.tolist()), dtype=np.float64, count=len(a)
+        )
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Retorna una máscara con los elementos que `execute` rechazaría,
+        o None si la operación es válida para cualquier entrada.
+        """
+        return None
+
+    def get_error_message(self) -> str:
+        """Retorna el mensaje de error para los elementos inválidos."""
+        return "Operación inválida"
+
 
 class Addition(Operation):
     """Implementación de la operación de suma."""
 
+    __slots__ = ()
+
     def execute(self, a: float, b: float) -> float:
         return a + b
 
     def get_symbol(self) -> str:
         return "+"
 
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.add(a, b)
+
 
 class Subtraction(Operation):
     """Implementación de la operación de resta."""
 
+    __slots__ = ()
+
     def execute(self, a: float, b: float) -> float:
         return a - b
 
     def get_symbol(self) -> str:
         return "-"
 
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.subtract(a, b)
+
 
 class Multiplication(Operation):
     """Implementación de la operación de multiplicación."""
 
+    __slots__ = ()
+
     def execute(self, a: float, b: float) -> float:
         return a * b
 
     def get_symbol(self) -> str:
         return "*"
 
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.multiply(a, b)
+
 
 class Division(Operation):
     """Implementación de la operación de división."""
 
+    __slots__ = ()
+
     def execute(self, a: float, b: float) -> float:
         if b == 0:
             raise ValueError("No se puede dividir por cero")
@@ -66,6 +122,232 @@ class Division(Operation):
     def get_symbol(self) -> str:
         return "/"
 
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.divide(a, b)
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        return b == 0
+
+    def get_error_message(self) -> str:
+        return "No se puede dividir por cero"
+
+
+def _is_integer(value: Any) -> bool:
+    """Indica si un número escalar finito es entero."""
+    return math.isfinite(value) and value == int(value)
+
+
+def _is_odd_integer(value: Any) -> bool:
+    """Indica si un número escalar es un entero impar."""
+    return _is_integer(value) and int(value) % 2 == 1
+
+
+def _floor_divmod(a: Any, b: Any) -> Tuple[Any, Any]:
+    """
+    divmod con cociente redondeado hacia abajo (el resto tiene el signo del divisor)
+    para cualquier tipo; Decimal trunca hacia cero, por lo que se corrige.
+    """
+    quotient, remainder = divmod(a, b)
+    if isinstance(a, Decimal) and remainder and (remainder < 0) != (b < 0):
+        quotient, remainder = quotient - 1, remainder + b
+    return quotient, remainder
+
+
+def check_finite(result: Any) -> Any:
+    """
+    Rechaza un resultado float no finito (un desborde) con el mismo error que los lotes.
+    Los Decimal y Fraction se retornan sin cambios.
+
+    Raises:
+        ValueError: Si el resultado es ±inf o NaN
+    """
+    if isinstance(result, float) and not math.isfinite(result):
+        raise ValueError(OVERFLOW_MESSAGE)
+    return result
+
+
+def overflow_mask(a: np.ndarray, b: np.ndarray, results: np.ndarray) -> np.ndarray:
+    """
+    Máscara de los resultados no finitos obtenidos a partir de números finitos
+    (desbordes del kernel vectorizado); se reportan como errores por elemento.
+    """
+    return ~np.isfinite(results) & np.isfinite(a) & np.isfinite(b)
+
+
+class Power(Operation):
+    """Implementación de la potencia (a ^ b)."""
+
+    __slots__ = ()
+
+    def execute(self, a: Any, b: Any) -> Any:
+        if (a == 0 and b < 0) or (a < 0 and math.isfinite(b) and not _is_integer(b)):
+            raise ValueError(self.get_error_message())
+        if isinstance(a, Fraction) and abs(b) > MAX_EXACT_EXPONENT:
+            raise ValueError(f"El exponente exacto debe ser como máximo {MAX_EXACT_EXPONENT}")
+        try:
+            return a**b
+        except OverflowError:
+            raise ValueError(OVERFLOW_MESSAGE) from None
+
+    def get_symbol(self) -> str:
+        return "^"
+
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            return np.power(a, b)
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        return ((a == 0) & (b < 0)) | ((a < 0) & (b != np.floor(b)) & np.isfinite(b))
+
+    def get_error_message(self) -> str:
+        return (
+            "Potencia no definida (base cero con exponente negativo "
+            "o base negativa con exponente no entero)"
+        )
+
+
+class Modulo(Operation):
+    """Implementación del módulo (a % b, con el signo del divisor)."""
+
+    __slots__ = ()
+
+    def execute(self, a: Any, b: Any) -> Any:
+        if b == 0:
+            raise ValueError(self.get_error_message())
+        return _floor_divmod(a, b)[1]
+
+    def get_symbol(self) -> str:
+        return "%"
+
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            return np.mod(a, b)
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        return b == 0
+
+    def get_error_message(self) -> str:
+        return "No se puede calcular el módulo por cero"
+
+
+class FloorDivision(Operation):
+    """Implementación de la división entera (a // b, redondeada hacia abajo)."""
+
+    __slots__ = ()
+
+    def execute(self, a: Any, b: Any) -> Any:
+        if b == 0:
+            raise ValueError(self.get_error_message())
+        return _floor_divmod(a, b)[0]
+
+    def get_symbol(self) -> str:
+        return "//"
+
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            return np.floor_divide(a, b)
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        return b == 0
+
+    def get_error_message(self) -> str:
+        return "No se puede dividir por cero"
+
+
+class Root(Operation):
+    """
+    Implementación de la raíz b-ésima de a (la raíz cuadrada es `a root 2`).
+    Las raíces impares de números negativos son reales (p. ej. -8 root 3 = -2).
+    """
+
+    __slots__ = ()
+
+    def execute(self, a: Any, b: Any) -> Any:
+        if b == 0 or (a == 0 and b < 0) or (a < 0 and not _is_odd_integer(b)):
+            raise ValueError(self.get_error_message())
+        try:
+            if a < 0:
+                return -((-a) ** (1 / b))
+            return a ** (1 / b)
+        except OverflowError:
+            raise ValueError(OVERFLOW_MESSAGE) from None
+
+    def get_symbol(self) -> str:
+        return "root"
+
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            magnitude = np.power(np.abs(a), 1 / b)
+        return np.copysign(magnitude, a)
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        odd = (b == np.floor(b)) & (np.mod(b, 2) == 1)
+        return (b == 0) | ((a == 0) & (b < 0)) | ((a < 0) & ~odd)
+
+    def get_error_message(self) -> str:
+        return (
+            "Raíz no definida (índice cero, raíz de cero con índice negativo "
+            "o raíz par de un número negativo)"
+        )
+
+
+class Logarithm(Operation):
+    """Implementación del logaritmo de a en base b."""
+
+    __slots__ = ()
+
+    def execute(self, a: Any, b: Any) -> Any:
+        if a <= 0 or b <= 0 or b == 1:
+            raise ValueError(self.get_error_message())
+        if isinstance(a, Decimal):
+            return a.ln() / b.ln()
+        return math.log(a) / math.log(b)
+
+    def get_symbol(self) -> str:
+        return "log"
+
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            return np.log(a) / np.log(b)
+
+    def invalid_mask(self, a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        return (a <= 0) | (b <= 0) | (b == 1)
+
+    def get_error_message(self) -> str:
+        return (
+            "Logaritmo no definido (el número y la base deben ser positivos "
+            "y la base distinta de 1)"
+        )
+
+
+class Exponential(Operation):
+    """
+    Implementación de a · e^b (crecimiento continuo: capital a con exponente b = tasa · tiempo).
+    """
+
+    __slots__ = ()
+
+    def execute(self, a: Any, b: Any) -> Any:
+        if isinstance(b, Decimal):
+            return a * b.exp()
+        try:
+            return check_finite(a * math.exp(b))
+        except OverflowError:
+            if a == 0:
+                return 0.0
+            raise ValueError(OVERFLOW_MESSAGE) from None
+
+    def get_symbol(self) -> str:
+        return "exp"
+
+    def execute_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            result = a * np.exp(b)
+        # 0 · e^b es 0 aunque e^b desborde (como execute)
+        result[a == 0] = 0.0
+        return result
+
 
 class OperationFactory:
     """
@@ -79,15 +361,26 @@ class OperationFactory:
         "-": Subtraction,
         "*": Multiplication,
         "/": Division,
+        "^": Power,
+        "%": Modulo,
+        "//": FloorDivision,
+        "root": Root,
+        "log": Logarithm,
+        "exp": Exponential,
+    }
+
+    # Instancias compartidas: las operaciones no tienen estado
+    _instances: Dict[str, Operation] = {
+        symbol: operation_class() for symbol, operation_class in _operations.items()
     }
 
     @classmethod
     def create_operation(cls, operator: str) -> Operation:
         """
-        Crea y retorna una instancia de operación basada en el operador.
+        Retorna la instancia compartida de la operación basada en el operador.
 
         Args:
-            operator: El símbolo de la operación (+, -, *, /)
+            operator: El símbolo de la operación (p. ej. +, -, *, /, ^, root)
 
         Returns:
             Una instancia de Operation
@@ -95,10 +388,50 @@ class OperationFactory:
         Raises:
             ValueError: Si el operador no es válido
         """
-        operation_class = cls._operations.get(operator)
-        if operation_class is None:
+        operation = cls._instances.get(operator)
+        if operation is None:
             raise ValueError(f"Operación no soportada: {operator}")
-        return operation_class()
+        return operation
+
+    @classmethod
+    def register_operation(cls, operation_class: Type[Operation]) -> Operation:
+        """
+        Registra una nueva operación (o reemplaza una existente) usando su símbolo.
+
+        Args:
+            operation_class: Subclase de Operation sin estado
+
+        Returns:
+            La instancia compartida registrada
+
+        Raises:
+            ValueError: Si la clase no es una subclase de Operation
+        """
+        if not (isinstance(operation_class, type) and issubclass(operation_class, Operation)):
+            raise ValueError("La operación debe ser una subclase de Operation")
+        operation = operation_class()
+        symbol = operation.get_symbol()
+        cls._operations[symbol] = operation_class
+        cls._instances[symbol] = operation
+        return operation
+
+    @classmethod
+    def unregister_operation(cls, operator: str) -> None:
+        """
+        Elimina una operación registrada.
+
+        Raises:
+            ValueError: Si el operador no está registrado
+        """
+        if operator not in cls._operations:
+            raise ValueError(f"Operación no soportada: {operator}")
+        del cls._operations[operator]
+        del cls._instances[operator]
+
+    @classmethod
+    def is_supported(cls, operator: str) -> bool:
+        """Indica si el operador está registrado."""
+        return operator in cls._instances
 
     @classmethod
     def get_supported_operations(cls) -> list:
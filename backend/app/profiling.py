@@ -0,0 +1,145 @@
+"""
+Módulo de perfilado por muestreo.
+Un hilo toma periódicamente la pila del hilo que atiende las peticiones y
+acumula las pilas en formato "collapsed" (una línea por pila con su cantidad
+de muestras), listo para generar un flamegraph.
+Principio SOLID: Single Responsibility - Solo se encarga de muestrear y agregar pilas.
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Pila agregada cuando se alcanza el máximo de pilas distintas
+OTHER_STACKS = "[otras pilas]"
+
+
+def frame_label(frame: FrameType) -> str:
+    """Retorna la etiqueta de un frame: archivo (con su carpeta) y función."""
+    code = frame.f_code
+    directory, filename = os.path.split(code.co_filename)
+    return f"{os.path.basename(directory)}/{filename}:{code.co_name}"
+
+
+def collapse_stack(frame: Optional[FrameType], max_depth: int = 64) -> str:
+    """Retorna la pila de un frame en formato collapsed (de la raíz a la hoja)."""
+    labels: List[str] = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """
+    Perfilador por muestreo de pilas basado en la biblioteca estándar.
+    Solo registra muestras mientras hay peticiones en curso, para no llenar
+    el perfil con la espera del event loop.
+    """
+
+    def __init__(self, interval_ms: float = 5.0, max_stacks: int = 10_000, max_depth: int = 64):
+        if interval_ms <= 0:
+            raise ValueError("El intervalo de muestreo debe ser mayor que cero")
+        self.interval_ms = interval_ms
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.active_requests = 0
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._target: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Indica si el hilo de muestreo está activo."""
+        return self._thread is not None
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """
+        Inicia el muestreo del hilo indicado (por defecto, el hilo que llama).
+        No hace nada si ya está en marcha.
+        """
+        if self._thread is not None:
+            return
+        self._target = threading.get_ident() if thread_id is None else thread_id
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="calculadora-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el muestreo conservando las pilas acumuladas."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        while not self._stop.wait(interval):
+            if self.active_requests > 0:
+                self.sample()
+
+    def sample(self) -> None:
+        """Toma una muestra de la pila del hilo objetivo."""
+        frame = sys._current_frames().get(self._target)
+        if frame is None:
+            return
+        stack = collapse_stack(frame, self.max_depth)
+        with self._lock:
+            if stack not in self._stacks and len(self._stacks) >= self.max_stacks:
+                stack = OTHER_STACKS
+            self._stacks[stack] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Retorna las pilas en formato collapsed, de la más muestreada a la menos."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def reset(self) -> None:
+        """Descarta las pilas acumuladas."""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna el estado del perfilador."""
+        return {
+            "running": self.running,
+            "interval_ms": self.interval_ms,
+            "samples": self.samples,
+            "stacks": len(self._stacks),
+        }
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que marca las peticiones en curso para el perfilador.
+    Si el perfilador está detenido, solo delega la petición.
+    """
+
+    def __init__(self, app: ASGIApp, sampler: StackSampler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.sampler.running:
+            await self.app(scope, receive, send)
+            return
+
+        self.sampler.active_requests += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.sampler.active_requests -= 1
@@ -0,0 +1,224 @@
+"""
+Módulo de reducciones estadísticas.
+Reduce un arreglo de números a un solo valor (suma, producto, media, mínimo,
+máximo, varianza o percentil) recorriéndolo por bloques: cada bloque se reduce
+con NumPy (suma por pares) y los resultados parciales se combinan con
+algoritmos estables (suma compensada, el producto como mantisa y exponente y la
+fórmula de Chan/Welford para la varianza).
+Principio SOLID: Single Responsibility - Solo se encarga de las reducciones.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from .operations import OVERFLOW_MESSAGE
+from .stats import CompensatedSum
+
+REDUCTIONS = ("sum", "product", "mean", "min", "max", "variance", "percentile")
+
+
+class StreamingReducer:
+    """
+    Acumula por bloques los agregados de una reducción.
+    Solo se calculan los agregados que necesita la operación; la memoria
+    adicional es la de un bloque, sin importar cuántos valores se agreguen.
+    """
+
+    def __init__(self, operation: str):
+        if operation not in REDUCTIONS or operation == "percentile":
+            raise ValueError(f"Reducción no soportada por bloques: {operation}")
+        self.operation = operation
+        self.count = 0
+        self._sum = CompensatedSum()
+        # Producto como mantisa * 2**exponente: los productos parciales no desbordan
+        self._mantissa = 1.0
+        self._exponent = 0
+        self._zero = False
+        self._min = math.inf
+        self._max = -math.inf
+        # Media y suma de cuadrados de las desviaciones (M2) de Welford
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, chunk: np.ndarray) -> None:
+        """
+        Agrega un bloque de valores.
+
+        Raises:
+            ValueError: Si el bloque tiene valores no finitos
+        """
+        size = len(chunk)
+        if size == 0:
+            return
+        if not np.isfinite(chunk).all():
+            raise ValueError("Los valores deben ser números finitos")
+
+        operation = self.operation
+        if operation in ("sum", "mean"):
+            # np.sum usa suma por pares dentro del bloque
+            self._sum.add(float(np.sum(chunk)))
+        elif operation == "product":
+            self._multiply(chunk)
+        elif operation == "min":
+            self._min = min(self._min, float(chunk.min()))
+        elif operation == "max":
+            self._max = max(self._max, float(chunk.max()))
+        else:
+            mean = float(chunk.mean())
+            self._combine(size, mean, float(np.sum(np.square(chunk - mean))))
+        self.count += size
+
+    def merge(self, other: "StreamingReducer") -> None:
+        """Agrega los valores acumulados por otro reductor de la misma operación."""
+        if other.operation != self.operation:
+            raise ValueError("Solo se pueden combinar reducciones de la misma operación")
+        if other.count == 0:
+            return
+        self._sum.add(other._sum.value)
+        self._zero = self._zero or other._zero
+        self._scale(self._mantissa * other._mantissa, other._exponent)
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        if self.operation == "variance":
+            self._combine(other.count, other._mean, other._m2)
+        self.count += other.count
+
+    # Mantisas por producto parcial: 1000 factores en [0.5, 1) no bajan de 2**-1000
+    MANTISSA_BLOCK = 1_000
+
+    def _multiply(self, chunk: np.ndarray) -> None:
+        """
+        Multiplica el producto por los valores del bloque. Un cero lo anula sin
+        importar los demás factores (1e200 * 1e200 * 0 es 0, no un desborde).
+        """
+        if self._zero or not chunk.all():
+            self._zero = True
+            return
+        mantissas, exponents = np.frexp(chunk)
+        self._exponent += int(exponents.sum())
+        for start in range(0, len(mantissas), self.MANTISSA_BLOCK):
+            partial = float(np.prod(mantissas[start : start + self.MANTISSA_BLOCK]))
+            self._scale(self._mantissa * partial, 0)
+
+    def _scale(self, mantissa: float, exponent: int) -> None:
+        """Normaliza mantissa * 2**exponent y lo acumula en el exponente."""
+        self._mantissa, shift = math.frexp(mantissa)
+        self._exponent += exponent + shift
+
+    def _product(self) -> float:
+        """Retorna el producto acumulado (±inf si excede el rango de los float)."""
+        if self._zero:
+            return 0.0
+        try:
+            return math.ldexp(self._mantissa, self._exponent)
+        except OverflowError:
+            return math.copysign(math.inf, self._mantissa)
+
+    def _combine(self, size: int, mean: float, m2: float) -> None:
+        """Combina (n, media, M2) del acumulado con los de otro grupo (Chan et al.)."""
+        total = self.count + size
+        delta = mean - self._mean
+        self._mean += delta * size / total
+        self._m2 += m2 + delta * delta * self.count * size / total
+
+    def result(self, ddof: int = 0) -> float:
+        """
+        Retorna el resultado de la reducción.
+
+        Args:
+            ddof: Grados de libertad descontados en la varianza (0 poblacional, 1 muestral)
+
+        Raises:
+            ValueError: Si no hay valores suficientes o el resultado excede
+                        el rango de los float (p. ej. el producto de [1e200, 1e200])
+        """
+        if self.count == 0:
+            raise ValueError("Se requiere al menos un valor")
+        result = self._value(ddof)
+        if not math.isfinite(result):
+            raise ValueError(OVERFLOW_MESSAGE)
+        return result
+
+    def _value(self, ddof: int) -> float:
+        """Retorna el resultado de la reducción sin validarlo."""
+        operation = self.operation
+        if operation == "sum":
+            return self._sum.value
+        if operation == "mean":
+            return self._sum.value / self.count
+        if operation == "product":
+            return self._product()
+        if operation == "min":
+            return self._min
+        if operation == "max":
+            return self._max
+        if self.count <= ddof:
+            raise ValueError(f"La varianza con ddof={ddof} requiere más de {ddof} valores")
+        return self._m2 / (self.count - ddof)
+
+
+def check_reduction(operation: str, percentile: Optional[float] = None, ddof: int = 0) -> None:
+    """
+    Valida una reducción y sus parámetros.
+
+    Raises:
+        ValueError: Si la operación, el percentil o ddof no son válidos
+    """
+    if operation not in REDUCTIONS:
+        raise ValueError(f"Reducción no soportada: {operation}")
+    if ddof not in (0, 1):
+        raise ValueError("ddof debe ser 0 o 1")
+    if operation == "percentile":
+        if not isinstance(percentile, (int, float)) or not 0 <= percentile <= 100:
+            raise ValueError("'percentile' debe estar entre 0 y 100")
+    elif percentile is not None:
+        raise ValueError("'percentile' solo se usa con la reducción percentile")
+
+
+def reduce_chunk(values: np.ndarray, operation: str, chunk_size: int = 65_536) -> StreamingReducer:
+    """
+    Acumula un arreglo en un reductor, por bloques de chunk_size.
+    Los reductores de varias partes se combinan con StreamingReducer.merge.
+    """
+    reducer = StreamingReducer(operation)
+    for start in range(0, len(values), chunk_size):
+        reducer.update(values[start : start + chunk_size])
+    return reducer
+
+
+def reduce_values(
+    values: np.ndarray,
+    operation: str,
+    percentile: Optional[float] = None,
+    ddof: int = 0,
+    chunk_size: int = 65_536,
+) -> float:
+    """
+    Reduce un arreglo de valores a un solo número.
+
+    Args:
+        values: Valores (float64)
+        operation: Una de REDUCTIONS
+        percentile: Percentil entre 0 y 100 (solo para "percentile")
+        ddof: 0 para la varianza poblacional, 1 para la muestral
+        chunk_size: Valores por bloque
+
+    Returns:
+        El resultado de la reducción
+
+    Raises:
+        ValueError: Si la operación o sus parámetros no son válidos,
+                    no hay valores, hay valores no finitos o el resultado
+                    excede el rango de los float
+    """
+    check_reduction(operation, percentile, ddof)
+    if operation == "percentile":
+        if len(values) == 0:
+            raise ValueError("Se requiere al menos un valor")
+        if not np.isfinite(values).all():
+            raise ValueError("Los valores deben ser números finitos")
+        # El percentil exacto necesita todos los valores: una selección O(n) sobre una copia
+        return float(np.percentile(values, percentile))
+    return reduce_chunk(values, operation, chunk_size).result(ddof)
@@ -3,21 +3,36 @@ Esquemas de datos para validación con Pydantic.
 Principio SOLID: Interface Segregation - Interfaces específicas para cada caso de uso.
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from pydantic import BaseModel, FiniteFloat, Field, validator
+from typing import Dict, List, Literal, Optional
+
+from .compiler import parse_packed_chain
+from .operations import OperationFactory
+
+OPERATOR_DESCRIPTION = "Operador registrado (ver GET /operations), p. ej. +, -, *, /, ^, root"
+
+
+def operator_error() -> ValueError:
+    """Error de validación con los operadores registrados."""
+    return ValueError(
+        f"Operador debe ser: {', '.join(OperationFactory.get_supported_operations())}"
+    )
 
 
 class OperationRequest(BaseModel):
     """Esquema para una operación simple."""
 
-    num1: float = Field(..., description="Primer número")
-    num2: float = Field(..., description="Segundo número")
-    operator: str = Field(..., description="Operador matemático: +, -, *, /")
+    num1: FiniteFloat = Field(..., description="Primer número")
+    num2: FiniteFloat = Field(..., description="Segundo número")
+    operator: str = Field(..., description=OPERATOR_DESCRIPTION)
+    numeric: Literal["float", "decimal", "fraction"] = Field(
+        "float", description="Modo numérico: float (por defecto), decimal o fraction (exacto)"
+    )
 
     @validator("operator")
     def validate_operator(cls, v):
-        if v not in ["+", "-", "*", "/"]:
-            raise ValueError("Operador debe ser: +, -, *, /")
+        if not OperationFactory.is_supported(v):
+            raise operator_error()
         return v
 
     class Config:
@@ -27,14 +42,16 @@ class OperationRequest(BaseModel):
 class ChainOperationItem(BaseModel):
     """Esquema para un elemento de operación en cadena."""
 
-    num1: Optional[float] = Field(None, description="Primer número (solo en primera operación)")
-    num2: float = Field(..., description="Segundo número")
-    operator: str = Field(..., description="Operador matemático: +, -, *, /")
+    num1: Optional[FiniteFloat] = Field(
+        None, description="Primer número (solo en primera operación)"
+    )
+    num2: FiniteFloat = Field(..., description="Segundo número")
+    operator: str = Field(..., description=OPERATOR_DESCRIPTION)
 
     @validator("operator")
     def validate_operator(cls, v):
-        if v not in ["+", "-", "*", "/"]:
-            raise ValueError("Operador debe ser: +, -, *, /")
+        if not OperationFactory.is_supported(v):
+            raise operator_error()
         return v
 
 
@@ -42,6 +59,9 @@ class ChainOperationRequest(BaseModel):
     """Esquema para operaciones en cadena."""
 
     operations: List[ChainOperationItem] = Field(..., min_items=1)
+    numeric: Literal["float", "decimal", "fraction"] = Field(
+        "float", description="Modo numérico: float (por defecto), decimal o fraction (exacto)"
+    )
 
     class Config:
         schema_extra = {
@@ -55,11 +75,219 @@ class ChainOperationRequest(BaseModel):
         }
 
 
+class CompactChainRequest(BaseModel):
+    """
+    Esquema compacto para operaciones en cadena: arreglos paralelos de operadores
+    y operandos, o una cadena empaquetada como "+5*2-3". Se valida en una sola
+    pasada, sin un modelo por paso.
+    """
+
+    num1: FiniteFloat = Field(..., description="Número inicial de la cadena")
+    chain: Optional[str] = Field(None, description='Pasos empaquetados, p. ej. "+5*2-3"')
+    operators: Optional[List[str]] = Field(None, description="Operador de cada paso")
+    operands: Optional[List[FiniteFloat]] = Field(None, description="Segundo número de cada paso")
+
+    @validator("operands", always=True)
+    def validate_steps(cls, v, values):
+        if "operators" not in values:
+            return v
+        chain, operators = values.get("chain"), values["operators"]
+        if chain is not None:
+            if operators is not None or v is not None:
+                raise ValueError("Use 'chain' u 'operators' y 'operands', no ambos")
+            operators, v = parse_packed_chain(chain)
+            values["operators"] = operators
+            return v
+        if operators is None or v is None:
+            raise ValueError("Se requiere 'chain' o 'operators' y 'operands'")
+        if not operators:
+            raise ValueError("Se requiere al menos una operación")
+        if len(operators) != len(v):
+            raise ValueError("operators y operands deben tener la misma longitud")
+        invalid = set(operators).difference(OperationFactory.get_supported_operations())
+        if invalid:
+            raise ValueError(f"Operación no soportada: {', '.join(sorted(invalid))}")
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {"num1": 10, "operators": ["+", "*", "-"], "operands": [5, 2, 3]}
+        }
+
+
+class CompiledChainRequest(BaseModel):
+    """Esquema para ejecutar una cadena compilada."""
+
+    num1: FiniteFloat = Field(..., description="Número inicial de la cadena")
+
+    class Config:
+        schema_extra = {"example": {"num1": 10}}
+
+
+class CompiledChainStep(BaseModel):
+    """Esquema para un paso de una cadena compilada."""
+
+    operator: str
+    num2: float
+
+
+class CompiledChainResponse(BaseModel):
+    """Esquema de respuesta al compilar una cadena."""
+
+    compiled_id: str = Field(..., description="Identificador para POST /calculate-chain/{id}")
+    steps: List[CompiledChainStep] = Field(..., description="Pasos tras combinar constantes")
+    source_steps: int = Field(..., description="Cantidad de pasos de la cadena original")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "compiled_id": "3f2a9c0d1e4b5a67",
+                "steps": [{"operator": "+", "num2": 5}, {"operator": "*", "num2": 6}],
+                "source_steps": 3,
+            }
+        }
+
+
+class EvaluateRequest(BaseModel):
+    """Esquema para evaluar una expresión aritmética."""
+
+    expression: str = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Expresión con +, -, *, /, //, %, ^ y paréntesis",
+    )
+    variables: Dict[str, FiniteFloat] = Field(
+        default_factory=dict, description="Valores de las variables de la expresión"
+    )
+
+    class Config:
+        schema_extra = {"example": {"expression": "(x + 5) * 2 - 3", "variables": {"x": 10}}}
+
+
+class TemplateRequest(BaseModel):
+    """Esquema para registrar una plantilla de fórmula."""
+
+    expression: str = Field(..., min_length=1, max_length=1000, description="Fórmula con variables")
+
+    class Config:
+        schema_extra = {"example": {"expression": "price * qty - discount"}}
+
+
+class TemplateResponse(BaseModel):
+    """Esquema de respuesta al registrar una plantilla."""
+
+    template_id: str = Field(..., description="Identificador para /templates/{id}/evaluate")
+    expression: str
+    variables: List[str]
+
+
+class TemplateEvaluateRequest(BaseModel):
+    """Esquema para evaluar una plantilla sobre columnas de valores."""
+
+    bindings: Dict[str, List[FiniteFloat]] = Field(
+        ..., description="Columna de valores por cada variable"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "bindings": {"price": [10, 2.5], "qty": [3, 4], "discount": [5, 0]},
+            }
+        }
+
+
+class BatchOperationRequest(BaseModel):
+    """Esquema para operaciones independientes en lote (formato columnar)."""
+
+    num1: List[FiniteFloat] = Field(..., min_items=1, description="Primeros números")
+    num2: List[FiniteFloat] = Field(..., min_items=1, description="Segundos números")
+    operator: List[str] = Field(..., min_items=1, description="Operador de cada elemento")
+
+    @validator("operator")
+    def validate_operator(cls, v, values):
+        if not all(map(OperationFactory.is_supported, set(v))):
+            raise operator_error()
+        for field in ("num1", "num2"):
+            if field in values and len(values[field]) != len(v):
+                raise ValueError("num1, num2 y operator deben tener la misma longitud")
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {"num1": [10, 6, 1], "num2": [5, 3, 0], "operator": ["+", "*", "/"]}
+        }
+
+
+class ReduceRequest(BaseModel):
+    """Esquema para reducir un arreglo de valores a un solo número."""
+
+    operation: Literal["sum", "product", "mean", "min", "max", "variance", "percentile"] = Field(
+        ..., description="Reducción a aplicar"
+    )
+    values: List[FiniteFloat] = Field(..., min_items=1, description="Valores a reducir")
+    percentile: Optional[float] = Field(
+        None, ge=0, le=100, description="Percentil (solo para 'percentile')"
+    )
+    ddof: int = Field(0, ge=0, le=1, description="Varianza poblacional (0) o muestral (1)")
+
+    @validator("percentile", always=True)
+    def validate_percentile(cls, v, values):
+        if (v is None) == (values.get("operation") == "percentile"):
+            raise ValueError("'percentile' se requiere solo con la reducción percentile")
+        return v
+
+    class Config:
+        schema_extra = {"example": {"operation": "mean", "values": [1.5, 2.5, 4.0]}}
+
+
+class BatchItemError(BaseModel):
+    """Esquema para el error de un elemento del lote."""
+
+    index: int
+    detail: str
+
+
+class BatchOperationResponse(BaseModel):
+    """Esquema de respuesta para operaciones en lote."""
+
+    results: List[Optional[float]] = Field(
+        ..., description="Resultado de cada elemento (null si falló)"
+    )
+    errors: List[BatchItemError] = Field(default_factory=list)
+    count: int
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "results": [15.0, 18.0, None],
+                "errors": [{"index": 2, "detail": "No se puede dividir por cero"}],
+                "count": 3,
+            }
+        }
+
+
+class ReduceResponse(BaseModel):
+    """Esquema de respuesta para una reducción."""
+
+    operation: str
+    result: float
+    count: int = Field(..., description="Cantidad de valores reducidos")
+
+    class Config:
+        schema_extra = {"example": {"operation": "mean", "result": 2.6667, "count": 3}}
+
+
 class OperationResponse(BaseModel):
     """Esquema de respuesta para operaciones."""
 
     result: float = Field(..., description="Resultado de la operación")
-    message: str = Field(default="Operación exitosa")
+    message: Optional[str] = Field(
+        default="Operación exitosa", description="Mensaje formateado (se omite si es nulo)"
+    )
+    exact: Optional[str] = Field(
+        None, description="Resultado exacto (solo en los modos decimal y fraction)"
+    )
 
     class Config:
         schema_extra = {"example": {"result": 15.0, "message": "Operación exitosa"}}
@@ -79,12 +307,45 @@ class HistoryResponse(BaseModel):
 
     history: List[HistoryItem]
     count: int
+    total: int = Field(0, description="Total de operaciones en historial")
+    offset: int = 0
 
     class Config:
         schema_extra = {
             "example": {
                 "history": [{"num1": 10, "num2": 5, "operator": "+", "result": 15}],
                 "count": 1,
+                "total": 1,
+                "offset": 0,
+            }
+        }
+
+
+class HistoryStatsResponse(BaseModel):
+    """Esquema de respuesta para las estadísticas del historial."""
+
+    count: int = Field(..., description="Operaciones en el historial")
+    operators: Dict[str, int] = Field(..., description="Operaciones por operador")
+    sum: float = Field(..., description="Suma de los resultados finitos")
+    mean: Optional[float] = Field(None, description="Media de los resultados finitos")
+    min: Optional[float] = None
+    max: Optional[float] = None
+    recorded: int = Field(..., description="Operaciones registradas desde la última limpieza")
+    errors: int = Field(..., description="Operaciones fallidas desde la última limpieza")
+    error_rate: float = Field(..., description="errors / (recorded + errors)")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "count": 3,
+                "operators": {"+": 2, "/": 1},
+                "sum": 42.5,
+                "mean": 14.1667,
+                "min": 2.5,
+                "max": 25.0,
+                "recorded": 3,
+                "errors": 1,
+                "error_rate": 0.25,
             }
         }
 
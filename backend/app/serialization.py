@@ -0,0 +1,56 @@
+"""
+Módulo de serialización rápida de respuestas.
+Escribe las respuestas JSON directamente a bytes (con orjson si está instalado),
+sin construir modelos de Pydantic ni pasar por el codificador genérico de FastAPI.
+Principio SOLID: Single Responsibility - Solo se encarga de serializar respuestas.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializa a JSON en bytes.
+
+    Con orjson, NaN e infinito se escriben como null; sin orjson se usa el
+    módulo json con las mismas opciones que JSONResponse de Starlette.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class FastJSONResponse(Response):
+    """Respuesta JSON serializada con dumps, sin validar contra response_model."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def operation_payload(
+    result: float, message: Optional[str] = None, exact: Optional[str] = None
+) -> Dict[str, Any]:
+    """Retorna el cuerpo de OperationResponse; message y exact solo se incluyen si se entregan."""
+    payload: Dict[str, Any] = {"result": result}
+    if message is not None:
+        payload["message"] = message
+    if exact is not None:
+        payload["exact"] = exact
+    return payload
+
+
+def history_payload(history: List[Dict[str, Any]], total: int, offset: int) -> Dict[str, Any]:
+    """Retorna el cuerpo de HistoryResponse."""
+    return {"history": history, "count": len(history), "total": total, "offset": offset}
@@ -0,0 +1,115 @@
+"""
+Módulo de sesiones interactivas.
+Mantiene un acumulador por sesión (p. ej. una conexión WebSocket) al que se
+aplican operaciones incrementales {operator, num2}.
+Principio SOLID: Single Responsibility - Solo se encarga del estado de cada sesión.
+"""
+
+import json
+import secrets
+from typing import Any, Dict
+
+from .calculator import Calculator
+
+
+def _number(message: Dict[str, Any], field: str) -> float:
+    """Retorna un campo numérico del mensaje."""
+    value = message[field]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{field}' debe ser un número")
+    return float(value)
+
+
+class Session:
+    """
+    Sesión con un acumulador (total en curso).
+    Cada operación se aplica sobre el acumulador y lo reemplaza por el resultado.
+    """
+
+    __slots__ = ("session_id", "accumulator")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.accumulator = 0.0
+
+    def apply(self, calculator: Calculator, message: Any) -> float:
+        """
+        Aplica un mensaje a la sesión y retorna el nuevo acumulador.
+
+        Mensajes:
+            {"operator": "+", "num2": 5}: aplica la operación al acumulador
+            {"num1": 10}: reemplaza el acumulador (se puede combinar con operator/num2)
+            {"action": "clear"}: reinicia el acumulador a 0
+
+        Raises:
+            ValueError: Si el mensaje no es válido o la operación falla;
+                        en ese caso el acumulador no cambia
+        """
+        if not isinstance(message, dict):
+            raise ValueError("Cada mensaje debe ser un objeto JSON")
+        if message.get("action") == "clear":
+            self.accumulator = 0.0
+            return self.accumulator
+
+        start = _number(message, "num1") if "num1" in message else self.accumulator
+        if "operator" in message or "num2" in message:
+            if "operator" not in message or "num2" not in message:
+                raise ValueError("Cada operación debe tener 'operator' y 'num2'")
+            start = calculator.calculate(start, _number(message, "num2"), message["operator"])
+        elif "num1" not in message:
+            raise ValueError("Se espera 'operator' y 'num2', 'num1' o 'action'")
+
+        self.accumulator = start
+        return start
+
+    def handle(self, calculator: Calculator, text: str) -> Dict[str, Any]:
+        """
+        Procesa un mensaje de texto JSON.
+
+        Returns:
+            {"result": acumulador} o {"error": detalle, "result": acumulador sin cambios}
+        """
+        try:
+            return {"result": self.apply(calculator, json.loads(text))}
+        except (ValueError, TypeError) as e:
+            return {"error": str(e), "result": self.accumulator}
+
+
+class SessionManager:
+    """
+    Registro de sesiones abiertas con un máximo de sesiones simultáneas.
+    Las sesiones inactivas más de idle_timeout segundos se cierran.
+    """
+
+    def __init__(self, max_sessions: int = 1_000, idle_timeout: float = 300.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, Session] = {}
+        self.rejected = 0
+        self.evicted = 0
+
+    def open(self) -> Session:
+        """
+        Abre una sesión nueva.
+
+        Raises:
+            ValueError: Si se alcanzó el máximo de sesiones simultáneas
+        """
+        if len(self._sessions) >= self.max_sessions:
+            self.rejected += 1
+            raise ValueError("Se alcanzó el máximo de sesiones simultáneas")
+        session = Session(secrets.token_hex(8))
+        self._sessions[session.session_id] = session
+        return session
+
+    def close(self, session: Session) -> None:
+        """Cierra una sesión (no falla si ya estaba cerrada)."""
+        self._sessions.pop(session.session_id, None)
+
+    def evict(self, session: Session) -> None:
+        """Cierra una sesión por inactividad."""
+        self.evicted += 1
+        self.close(session)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,237 @@
+"""
+Módulo de estadísticas del historial.
+Mantiene agregados (conteo por operador, suma, media, mínimo, máximo y tasa de
+error) que se actualizan al agregar y al descartar operaciones, de modo que
+consultarlos es O(1) sin importar el tamaño del historial.
+Principio SOLID: Single Responsibility - Solo se encarga de los agregados.
+"""
+
+import math
+import operator as op
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class CompensatedSum:
+    """
+    Suma con compensación de Neumaier: acumula el error de redondeo de cada
+    suma para que sumar (y restar) muchos valores no pierda precisión.
+    """
+
+    __slots__ = ("_total", "_compensation")
+
+    def __init__(self) -> None:
+        self._total = 0.0
+        self._compensation = 0.0
+
+    def add(self, value: float) -> None:
+        """Suma un valor."""
+        total = self._total + value
+        if abs(self._total) >= abs(value):
+            self._compensation += (self._total - total) + value
+        else:
+            self._compensation += (value - total) + self._total
+        self._total = total
+
+    @property
+    def value(self) -> float:
+        """Retorna la suma acumulada."""
+        return self._total + self._compensation
+
+
+class HistoryStats:
+    """
+    Agregados de una ventana FIFO de resultados.
+
+    Las operaciones se descartan siempre desde la más antigua, por lo que el
+    mínimo y el máximo se mantienen con colas monótonas de (secuencia, valor):
+    cada valor entra y sale una sola vez (O(1) amortizado). La suma usa
+    CompensatedSum para que sumar y restar no acumule error.
+    La suma, la media, el mínimo y el máximo solo consideran resultados finitos.
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        """Reinicia todos los agregados."""
+        self._operators: Dict[str, int] = {}
+        self._sum = CompensatedSum()
+        self._finite = 0
+        self._count = 0
+        # Secuencia de la próxima operación y de la más antigua en la ventana
+        self._next = 0
+        self._first = 0
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        self.recorded = 0
+        self.errors = 0
+
+    def _push(self, sequence: int, value: float) -> None:
+        """Agrega un valor finito a las colas del mínimo y del máximo."""
+        low = self._min
+        while low and low[-1][1] >= value:
+            low.pop()
+        low.append((sequence, value))
+        high = self._max
+        while high and high[-1][1] <= value:
+            high.pop()
+        high.append((sequence, value))
+
+    def add(self, operator: str, result: float) -> None:
+        """Registra una operación nueva."""
+        self._operators[operator] = self._operators.get(operator, 0) + 1
+        self._count += 1
+        self.recorded += 1
+        if math.isfinite(result):
+            self._finite += 1
+            self._sum.add(result)
+            self._push(self._next, result)
+        self._next += 1
+
+    def add_many(self, operators: Dict[str, int], results: np.ndarray) -> None:
+        """
+        Registra varias operaciones en orden.
+
+        Args:
+            operators: Cantidad de operaciones nuevas por operador
+            results: Resultados en orden cronológico
+        """
+        for operator, count in operators.items():
+            self._operators[operator] = self._operators.get(operator, 0) + count
+        size = len(results)
+        self._count += size
+        self.recorded += size
+
+        finite = np.isfinite(results)
+        if finite.any():
+            values = results[finite]
+            sequences = self._next + np.flatnonzero(finite)
+            self._finite += len(values)
+            self._sum.add(math.fsum(values.tolist()))
+            self._extend_queue(self._min, sequences, values, np.minimum, op.lt)
+            self._extend_queue(self._max, sequences, values, np.maximum, op.gt)
+        self._next += size
+
+    @staticmethod
+    def _extend_queue(
+        queue: Deque[Tuple[int, float]],
+        sequences: np.ndarray,
+        values: np.ndarray,
+        accumulate: np.ufunc,
+        precedes: Callable[[Any, Any], Any],
+    ) -> None:
+        """
+        Agrega valores finitos nuevos a una cola monótona.
+
+        Solo los mínimos (máximos) estrictos de cada sufijo pueden quedar en la
+        cola y ya están ordenados, así que basta con recortar la cola una vez
+        y extenderla con ellos.
+        """
+        suffix = accumulate.accumulate(values[::-1])[::-1]
+        keep = np.append(precedes(values[:-1], suffix[1:]), True)
+        head = suffix[0]
+        while queue and not precedes(queue[-1][1], head):
+            queue.pop()
+        queue.extend(zip(sequences[keep].tolist(), values[keep].tolist()))
+
+    def remove(self, operator: str, result: float) -> None:
+        """Descarta la operación más antigua de la ventana."""
+        remaining = self._operators.get(operator, 0) - 1
+        if remaining > 0:
+            self._operators[operator] = remaining
+        else:
+            self._operators.pop(operator, None)
+        self._count -= 1
+        if math.isfinite(result):
+            self._finite -= 1
+            self._sum.add(-result)
+        self._evict(1)
+
+    def remove_many(self, operators: Dict[str, int], results: np.ndarray) -> None:
+        """
+        Descarta las operaciones más antiguas de la ventana.
+
+        Args:
+            operators: Cantidad de operaciones descartadas por operador
+            results: Resultados descartados
+        """
+        for operator, count in operators.items():
+            remaining = self._operators.get(operator, 0) - count
+            if remaining > 0:
+                self._operators[operator] = remaining
+            else:
+                self._operators.pop(operator, None)
+        size = len(results)
+        self._count -= size
+
+        values = results[np.isfinite(results)]
+        if len(values):
+            self._finite -= len(values)
+            self._sum.add(-math.fsum(values.tolist()))
+
+        self._evict(size)
+
+    def _evict(self, size: int) -> None:
+        """Avanza el inicio de la ventana y saca de las colas lo que quedó fuera."""
+        self._first += size
+        for queue in (self._min, self._max):
+            while queue and queue[0][0] < self._first:
+                queue.popleft()
+        if self._finite == 0:
+            self._sum = CompensatedSum()
+
+    def record_errors(self, count: int = 1) -> None:
+        """Registra operaciones que fallaron (no entran a la ventana)."""
+        self.errors += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna los agregados actuales."""
+        minimum: Optional[float] = self._min[0][1] if self._min else None
+        maximum: Optional[float] = self._max[0][1] if self._max else None
+        return stats_payload(
+            dict(self._operators),
+            self._finite,
+            self._sum.value,
+            minimum,
+            maximum,
+            self.recorded,
+            self.errors,
+        )
+
+
+def stats_payload(
+    operators: Dict[str, int],
+    finite: int,
+    total: float,
+    minimum: Optional[float],
+    maximum: Optional[float],
+    recorded: int,
+    errors: int,
+) -> Dict[str, Any]:
+    """
+    Arma la respuesta de stats a partir de los agregados de una ventana.
+
+    Args:
+        operators: Cantidad de operaciones por operador en la ventana
+        finite: Cantidad de resultados finitos (los que entran en suma, media, mínimo y máximo)
+        total: Suma de los resultados finitos
+        minimum: Mínimo de los resultados finitos (None si no hay)
+        maximum: Máximo de los resultados finitos (None si no hay)
+        recorded: Operaciones registradas (incluidas las ya descartadas)
+        errors: Operaciones que fallaron
+    """
+    attempts = recorded + errors
+    return {
+        "count": sum(operators.values()),
+        "operators": operators,
+        "sum": total,
+        "mean": total / finite if finite else None,
+        "min": minimum,
+        "max": maximum,
+        "recorded": recorded,
+        "errors": errors,
+        "error_rate": errors / attempts if attempts else 0.0,
+    }
@@ -0,0 +1,105 @@
+"""
+Módulo de evaluación en streaming.
+Evalúa operaciones recibidas como JSON delimitado por líneas (NDJSON) con un
+pipeline de generadores, sin cargar la entrada completa en memoria.
+Principio SOLID: Single Responsibility - Solo se encarga de leer, evaluar y escribir líneas.
+"""
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .calculator import Calculator
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[List[bytes]]:
+    """
+    Agrupa los fragmentos recibidos en líneas completas.
+
+    Produce una lista con las líneas completas de cada fragmento, de modo que
+    la memoria usada depende del tamaño del fragmento y no del total recibido.
+
+    Raises:
+        ValueError: Si una línea supera max_line_bytes
+    """
+    pending = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"Línea demasiado larga (máximo {max_line_bytes} bytes)")
+        if lines:
+            yield lines
+    if pending:
+        yield [pending]
+
+
+def evaluate_line(calculator: Calculator, line: bytes) -> Dict[str, Any]:
+    """
+    Evalúa una línea con un objeto {"num1", "num2", "operator"}.
+
+    Returns:
+        {"result": ...} o {"error": ...}; los errores no interrumpen el stream
+    """
+    try:
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            raise ValueError("Cada línea debe ser un objeto JSON")
+        for field in ("num1", "num2", "operator"):
+            if field not in item:
+                raise ValueError(f"Falta el campo '{field}'")
+        result = calculator.calculate(float(item["num1"]), float(item["num2"]), item["operator"])
+        return {"result": result}
+    except (ValueError, TypeError) as e:
+        return {"error": str(e)}
+
+
+async def evaluate_stream(
+    calculator: Calculator, chunks: AsyncIterable[bytes]
+) -> AsyncIterator[bytes]:
+    """
+    Evalúa un stream NDJSON de operaciones y produce los resultados como NDJSON.
+
+    Cada línea de salida incluye el número de línea de entrada ("line", desde 1).
+    Las líneas vacías se omiten. Los resultados de cada fragmento recibido se
+    escriben juntos; el siguiente fragmento no se lee hasta que el cliente
+    consume la salida (backpressure).
+    """
+    line_number = 0
+    try:
+        async for lines in iter_lines(chunks):
+            output = []
+            for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                evaluated = evaluate_line(calculator, line)
+                evaluated["line"] = line_number
+                output.append(json.dumps(evaluated))
+            if output:
+                yield ("\n".join(output) + "\n").encode()
+    except ValueError as e:
+        yield (json.dumps({"line": line_number + 1, "error": str(e)}) + "\n").encode()
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que puede leer el cuerpo de la petición mientras responde.
+
+    StreamingResponse escucha la desconexión del cliente consumiendo los mensajes
+    de `receive`, lo que roba fragmentos al cuerpo que aún se está leyendo con
+    `request.stream()`. Aquí la desconexión la detecta la lectura del cuerpo.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
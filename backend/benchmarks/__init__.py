@@ -0,0 +1,3 @@
+"""
+Paquete de benchmarks de la API.
+"""
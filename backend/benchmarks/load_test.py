@@ -0,0 +1,314 @@
+"""
+Benchmark de carga y latencia de la API.
+
+Levanta un proceso real de uvicorn, ejecuta cada escenario con niveles de
+concurrencia fijos y reporta latencias p50/p95/p99 y peticiones por segundo.
+Los resultados se guardan en JSON para comparar ejecuciones y fallar ante
+regresiones mayores al umbral.
+
+Uso (desde backend/):
+    python -m benchmarks.load_test --output resultados.json
+    python -m benchmarks.load_test --baseline resultados.json --threshold 0.2
+    python -m benchmarks.load_test --env CALCULADORA_FAST_SERIALIZATION=true
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+BATCH_SIZE = 100
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "calculate": {
+        "method": "POST",
+        "path": "/calculate",
+        "json": {"num1": 10, "num2": 5, "operator": "+"},
+    },
+    "calculate-chain": {
+        "method": "POST",
+        "path": "/calculate-chain",
+        "json": {
+            "operations": [
+                {"num1": 10, "operator": "+", "num2": 5},
+                {"operator": "*", "num2": 2},
+                {"operator": "-", "num2": 3},
+            ]
+        },
+    },
+    "calculate-chain-compact": {
+        "method": "POST",
+        "path": "/calculate-chain/compact",
+        "json": {"num1": 10, "chain": "+5*2-3"},
+    },
+    "calculate-batch": {
+        "method": "POST",
+        "path": "/calculate-batch",
+        "json": {
+            "num1": list(range(BATCH_SIZE)),
+            "num2": [2] * BATCH_SIZE,
+            "operator": ["+", "-", "*", "/"] * (BATCH_SIZE // 4),
+        },
+    },
+    "history": {"method": "GET", "path": "/history", "params": {"limit": 100}},
+}
+
+
+def percentile(latencies: Sequence[float], fraction: float) -> float:
+    """Retorna el percentil (método nearest-rank) de una lista de latencias."""
+    if not latencies:
+        return 0.0
+    ordered = sorted(latencies)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(
+    scenario: str, concurrency: int, latencies: List[float], errors: int, elapsed: float
+) -> Dict[str, Any]:
+    """Resume las latencias (en segundos) de un escenario."""
+    total = len(latencies) + errors
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compara dos ejecuciones y retorna las regresiones encontradas.
+
+    Hay regresión si el p95 sube o las peticiones por segundo bajan
+    más que `threshold` (fracción, p. ej. 0.2 = 20%), o si aparecen errores.
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        key = (result["scenario"], result["concurrency"])
+        before = previous.get(key)
+        if before is None:
+            continue
+        label = f"{result['scenario']} (concurrencia {result['concurrency']})"
+        if before["p95_ms"] > 0 and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{label}: p95 {before['p95_ms']:.2f} ms -> {result['p95_ms']:.2f} ms"
+            )
+        if result["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{label}: rps {before['rps']:.0f} -> {result['rps']:.0f}")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{label}: errores {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def free_port() -> int:
+    """Retorna un puerto TCP libre en localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """Proceso de uvicorn levantado para el benchmark."""
+
+    def __init__(self, port: int, workers: int = 1, env: Optional[Dict[str, str]] = None):
+        self.port = port
+        self.workers = workers
+        self.env = env or {}
+        self.url = f"http://127.0.0.1:{port}"
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "Server":
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.workers),
+                "--log-level",
+                "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **self.env},
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError("uvicorn terminó antes de estar listo")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("uvicorn no respondió a /health a tiempo")
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: str, concurrency: int, requests: int
+) -> Dict[str, Any]:
+    """Ejecuta `requests` peticiones de un escenario con `concurrency` clientes."""
+    spec = SCENARIOS[scenario]
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    spec["method"], spec["path"], json=spec.get("json"), params=spec.get("params")
+                )
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(scenario, concurrency, latencies, errors, time.perf_counter() - start)
+
+
+async def run_all(
+    url: str,
+    scenarios: Sequence[str],
+    concurrency_levels: Sequence[int],
+    requests: int,
+    warmup: int,
+) -> List[Dict[str, Any]]:
+    """Ejecuta todos los escenarios en todos los niveles de concurrencia."""
+    limits = httpx.Limits(max_connections=max(concurrency_levels))
+    results = []
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        for scenario in scenarios:
+            await run_scenario(client, scenario, 1, warmup)
+            for concurrency in concurrency_levels:
+                results.append(await run_scenario(client, scenario, concurrency, requests))
+    return results
+
+
+def print_table(results: Sequence[Dict[str, Any]]) -> None:
+    """Imprime los resultados como tabla."""
+    header = f"{'escenario':<25}{'conc':>6}{'req':>8}{'err':>6}{'rps':>10}"
+    header += f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    for r in results:
+        print(
+            f"{r['scenario']:<25}{r['concurrency']:>6}{r['requests']:>8}{r['errors']:>6}"
+            f"{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la API calculadora")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por nivel")
+    parser.add_argument("--warmup", type=int, default=50, help="Peticiones de calentamiento")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn")
+    parser.add_argument("--url", help="Usar un servidor ya levantado en lugar de uvicorn")
+    parser.add_argument("--output", type=Path, help="Archivo JSON para guardar resultados")
+    parser.add_argument("--baseline", type=Path, help="Resultados previos para comparar")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Regresión tolerada (0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--env",
+        nargs="+",
+        default=[],
+        metavar="CLAVE=VALOR",
+        help="Variables de entorno para uvicorn (p. ej. CALCULADORA_FAST_SERIALIZATION=true)",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_env(pairs: Sequence[str]) -> Dict[str, str]:
+    """Convierte una lista de CLAVE=VALOR en un diccionario."""
+    env = {}
+    for pair in pairs:
+        key, separator, value = pair.partition("=")
+        if not separator or not key:
+            raise ValueError(f"Variable de entorno inválida: {pair!r} (se espera CLAVE=VALOR)")
+        env[key] = value
+    return env
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+
+    def execute(url: str) -> List[Dict[str, Any]]:
+        return asyncio.run(
+            run_all(url, args.scenarios, args.concurrency, args.requests, args.warmup)
+        )
+
+    if args.url:
+        results = execute(args.url)
+    else:
+        with Server(free_port(), args.workers, parse_env(args.env)) as server:
+            results = execute(server.url)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workers": args.workers,
+            "requests": args.requests,
+            "env": parse_env(args.env),
+        },
+        "results": results,
+    }
+    print_table(results)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESIÓN: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
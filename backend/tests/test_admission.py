@@ -0,0 +1,206 @@
+"""
+Tests unitarios para el control de admisión.
+Prueba los token buckets, el barrido de clientes inactivos, el costo por tamaño
+y los rechazos 429/503 del middleware.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.admission import AdmissionController, AdmissionMiddleware, TokenBuckets
+
+
+class FakeClock:
+    """Reloj controlado por el test."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBuckets:
+    """Tests para TokenBuckets."""
+
+    def test_burst_and_refill(self):
+        """Prueba consumir la ráfaga y recuperar tokens con el tiempo."""
+        clock = FakeClock()
+        buckets = TokenBuckets(rate=2.0, burst=3.0, clock=clock)
+        assert [buckets.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert buckets.acquire("a") == pytest.approx(0.5)
+        assert buckets.acquire("b") == 0.0
+        clock.now = 0.5
+        assert buckets.acquire("a") == 0.0
+
+    def test_cost(self):
+        """Prueba cobrar varios tokens y limitar el costo a la ráfaga."""
+        buckets = TokenBuckets(rate=1.0, burst=10.0, clock=FakeClock())
+        assert buckets.acquire("a", 4.0) == 0.0
+        assert buckets.acquire("a", 10.0) == pytest.approx(4.0)
+        assert buckets.acquire("b", 1_000.0) == 0.0
+        assert buckets.acquire("b") == pytest.approx(1.0)
+
+    def test_sweep_releases_full_buckets(self):
+        """Prueba que el barrido libere solo los buckets ya rellenados."""
+        clock = FakeClock()
+        buckets = TokenBuckets(rate=1.0, burst=5.0, sweep_interval=100.0, clock=clock)
+        buckets.acquire("idle", 1.0)
+        buckets.acquire("busy", 5.0)
+        clock.now = 2.0
+        assert buckets.sweep() == 1
+        assert len(buckets) == 1
+        # El bucket vaciado conserva su estado
+        assert buckets.acquire("busy", 5.0) == pytest.approx(3.0)
+
+    def test_periodic_sweep_and_growth(self):
+        """Prueba crecer al llenar los slots y barrer al vencer el intervalo."""
+        clock = FakeClock()
+        buckets = TokenBuckets(
+            rate=1.0, burst=1.0, sweep_interval=10.0, initial_slots=2, clock=clock
+        )
+        for client in range(5):
+            buckets.acquire(str(client))
+        assert len(buckets) == 5
+        assert buckets.stats()["slots"] == 8
+        clock.now = 10.0
+        buckets.acquire("new")
+        assert len(buckets) == 1
+        assert buckets.stats()["swept"] == 5
+
+    def test_invalid(self):
+        """Prueba rechazar un ritmo o una ráfaga inválidos."""
+        with pytest.raises(ValueError):
+            TokenBuckets(rate=0, burst=1)
+        with pytest.raises(ValueError):
+            TokenBuckets(rate=1, burst=0.5)
+
+
+def make_client(controller, **kwargs):
+    """Crea una app de prueba con el middleware de admisión."""
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller, **kwargs)
+
+    @app.post("/work")
+    async def work():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestAdmissionMiddleware:
+    """Tests para AdmissionMiddleware."""
+
+    def test_disabled(self):
+        """Prueba que desactivado no limite nada."""
+        controller = AdmissionController(enabled=False, rate=1.0, burst=1.0)
+        client = make_client(controller)
+        assert all(client.post("/work").status_code == 200 for _ in range(5))
+        assert controller.admitted == 0
+
+    def test_rate_limit_per_client(self):
+        """Prueba el 429 por cliente, con Retry-After, según el header de API key."""
+        controller = AdmissionController(enabled=True, rate=0.1, burst=2.0)
+        client = make_client(controller, api_keys=["a", "b"])
+        headers = {"X-API-Key": "a"}
+        assert client.post("/work", headers=headers).status_code == 200
+        assert client.post("/work", headers=headers).status_code == 200
+        response = client.post("/work", headers=headers)
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "10"
+        assert "detail" in response.json()
+        assert client.post("/work", headers={"X-API-Key": "b"}).status_code == 200
+        assert controller.stats()["rate_limited"] == 1
+        assert controller.stats()["clients"] == 2
+
+    def test_unknown_api_key_uses_ip(self):
+        """Prueba que una clave no configurada no dé un bucket nuevo (se limita por IP)."""
+        controller = AdmissionController(enabled=True, rate=0.1, burst=2.0)
+        client = make_client(controller, api_keys=["a"])
+        assert client.post("/work", headers={"X-API-Key": "x1"}).status_code == 200
+        assert client.post("/work", headers={"X-API-Key": "x2"}).status_code == 200
+        assert client.post("/work", headers={"X-API-Key": "x3"}).status_code == 429
+        assert client.post("/work").status_code == 429
+        assert client.post("/work", headers={"X-API-Key": "a"}).status_code == 200
+        assert controller.stats()["clients"] == 2
+
+    def test_cost_by_body_size(self):
+        """Prueba que un cuerpo grande cueste más tokens."""
+        controller = AdmissionController(enabled=True, rate=0.1, burst=4.0, cost_bytes=100)
+        client = make_client(controller)
+        assert controller.cost(350) == 4.0
+        assert client.post("/work", content=b"x" * 350).status_code == 200
+        assert client.post("/work").status_code == 429
+
+    def test_chunked_body_costs_burst(self):
+        """Prueba que un cuerpo sin Content-Length cueste la ráfaga completa."""
+        controller = AdmissionController(enabled=True, rate=0.1, burst=4.0, cost_bytes=100)
+        client = make_client(controller)
+        assert controller.cost(None) == 4.0
+        response = client.post("/work", content=iter([b"x" * 10, b"y" * 10]))
+        assert response.status_code == 200
+        assert client.post("/work").status_code == 429
+
+    def test_options_not_charged(self):
+        """Prueba que las peticiones OPTIONS no consuman tokens."""
+        controller = AdmissionController(enabled=True, rate=0.1, burst=1.0)
+        client = make_client(controller)
+        assert all(client.options("/work").status_code == 405 for _ in range(3))
+        assert client.post("/work").status_code == 200
+        assert controller.admitted == 1
+
+    def test_exempt_paths(self):
+        """Prueba que /health no se limite."""
+        controller = AdmissionController(enabled=True, rate=0.1, burst=1.0)
+        client = make_client(controller)
+        assert all(client.get("/health").status_code == 200 for _ in range(3))
+
+    def test_concurrency_limit(self):
+        """Prueba el 503 inmediato al superar las peticiones en curso."""
+        controller = AdmissionController(enabled=True, rate=100.0, burst=100.0, max_concurrency=1)
+        app = make_client(controller).app
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(client.get("/slow"), client.get("/slow"))
+
+        statuses = sorted(response.status_code for response in asyncio.run(scenario()))
+        assert statuses == [200, 503]
+        assert controller.overloaded == 1
+        assert controller.in_flight == 0
+
+
+class TestAdmissionCors:
+    """Tests del orden de los middlewares de la API."""
+
+    def test_rejection_has_cors_headers(self):
+        """Prueba que un 503 de admisión lleve los headers CORS y el preflight pase."""
+        from app.main import admission, app
+
+        client = TestClient(app)
+        origin = {"Origin": "http://localhost:5173"}
+        enabled, in_flight = admission.enabled, admission.in_flight
+        admission.enabled, admission.in_flight = True, admission.max_concurrency
+        try:
+            response = client.post("/calculate", json={}, headers=origin)
+            preflight = client.options(
+                "/calculate", headers={**origin, "Access-Control-Request-Method": "POST"}
+            )
+        finally:
+            admission.enabled, admission.in_flight = enabled, in_flight
+        assert response.status_code == 503
+        assert response.headers["access-control-allow-origin"] == origin["Origin"]
+        assert preflight.status_code == 200
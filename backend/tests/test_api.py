@@ -3,9 +3,16 @@ Tests de integración para los endpoints de la API.
 Prueba todos los endpoints con diferentes casos.
 """
 
+import json
+
+import msgpack
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app, calculator
+from starlette.websockets import WebSocketDisconnect
+from app.config import settings
+from app.history import FileHistoryStore, SQLiteHistoryStore
+from app.main import app, calculator, sessions
 
 
 @pytest.fixture
@@ -41,7 +48,7 @@ class TestRootEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert "operations" in data
-        assert len(data["operations"]) == 4
+        assert len(data["operations"]) == data["count"] == 10
 
 
 class TestCalculateEndpoint:
@@ -79,9 +86,58 @@ class TestCalculateEndpoint:
         assert response.status_code == 400
         assert "detail" in response.json()
 
+    def test_calculate_extended_operator(self, client):
+        """Prueba una operación del catálogo extendido."""
+        response = client.post("/calculate", json={"num1": 27, "num2": 3, "operator": "root"})
+        assert response.status_code == 200
+        assert response.json()["result"] == pytest.approx(3)
+
+        response = client.post("/calculate", json={"num1": -4, "num2": 2, "operator": "root"})
+        assert response.status_code == 400
+        assert "Raíz no definida" in response.json()["detail"]
+
+    @pytest.mark.parametrize(
+        "num1,num2,operator",
+        [
+            (10, 400, "^"),
+            (-10, 401, "^"),
+            (1, 1000, "exp"),
+            (1e308, 10, "*"),
+            (1e308, 1e-10, "/"),
+            (1.7e308, 1.7e308, "+"),
+            (-1.7e308, 1.7e308, "-"),
+        ],
+    )
+    def test_calculate_overflow(self, client, num1, num2, operator):
+        """Prueba que un resultado que desborda retorne error 400 y no se guarde."""
+        response = client.post(
+            "/calculate", json={"num1": num1, "num2": num2, "operator": operator}
+        )
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+
+        response = client.get("/history")
+        assert response.status_code == 200
+        assert response.json()["count"] == 0
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            '{"num1": 1e400, "num2": 1, "operator": "+"}',
+            '{"num1": 1, "num2": NaN, "operator": "+"}',
+        ],
+    )
+    def test_calculate_non_finite_input(self, client, payload):
+        """Prueba que un número no finito en la entrada retorne error 422."""
+        response = client.post(
+            "/calculate", content=payload, headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert client.get("/history").status_code == 200
+
     def test_calculate_invalid_operator(self, client):
         """Prueba que operador inválido retorne error 422."""
-        response = client.post("/calculate", json={"num1": 10, "num2": 5, "operator": "%"})
+        response = client.post("/calculate", json={"num1": 10, "num2": 5, "operator": "&"})
         assert response.status_code == 422
 
     def test_calculate_missing_fields(self, client):
@@ -154,6 +210,689 @@ class TestCalculateChainEndpoint:
         )
         assert response.status_code == 400
 
+    def test_chain_overflow(self, client):
+        """Prueba que un paso que desborda retorne 400 sin guardar ±inf en el historial."""
+        response = client.post(
+            "/calculate-chain",
+            json={
+                "operations": [
+                    {"num1": 1e308, "operator": "*", "num2": 10},
+                    {"operator": "-", "num2": 1},
+                ]
+            },
+        )
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+
+        response = client.get("/history")
+        assert response.status_code == 200
+        assert response.json()["count"] == 0
+
+
+class TestNumericModes:
+    """Tests para los modos numéricos de /calculate y /calculate-chain."""
+
+    def test_default_has_no_exact(self, client):
+        """Prueba que el modo float no incluya el campo exact."""
+        response = client.post("/calculate", json={"num1": 0.1, "num2": 0.2, "operator": "+"})
+        assert response.json() == {
+            "result": 0.30000000000000004,
+            "message": "0.1 + 0.2 = 0.30000000000000004",
+        }
+
+    def test_decimal(self, client):
+        """Prueba el resultado exacto en modo decimal."""
+        response = client.post(
+            "/calculate",
+            json={"num1": 0.1, "num2": 0.2, "operator": "+", "numeric": "decimal"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["exact"] == "0.3"
+        assert data["result"] == 0.3
+        assert data["message"] == "0.1 + 0.2 = 0.3"
+
+    def test_fraction_chain(self, client):
+        """Prueba una cadena exacta en modo fraction."""
+        response = client.post(
+            "/calculate-chain",
+            json={
+                "operations": [
+                    {"num1": 1, "operator": "/", "num2": 3},
+                    {"operator": "+", "num2": 0.5},
+                ],
+                "numeric": "fraction",
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["exact"] == "5/6"
+
+    @pytest.mark.parametrize("numeric", ["decimal", "fraction"])
+    def test_result_beyond_float_range(self, client, numeric):
+        """Prueba que un resultado exacto sin aproximación float retorne error 400."""
+        response = client.post(
+            "/calculate",
+            json={"num1": 1e300, "num2": 1e300, "operator": "*", "numeric": numeric},
+        )
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+        assert client.get("/history").status_code == 200
+
+    @pytest.mark.parametrize("operator,num2", [("^", 0.5), ("root", 2), ("log", 2), ("exp", 1)])
+    def test_fraction_rejects_inexact_operations(self, client, operator, num2):
+        """Prueba que el modo fraction rechace resultados no racionales."""
+        response = client.post(
+            "/calculate",
+            json={"num1": 2, "num2": num2, "operator": operator, "numeric": "fraction"},
+        )
+        assert response.status_code == 400
+        assert "no es racional" in response.json()["detail"]
+
+        response = client.post(
+            "/calculate", json={"num1": 2, "num2": 3, "operator": "^", "numeric": "fraction"}
+        )
+        assert response.json()["exact"] == "8"
+
+    def test_fraction_digit_limit(self, client):
+        """Prueba que una fracción demasiado grande retorne 400 sin registrar el paso que falla."""
+        operations = [{"num1": 1, "operator": "*", "num2": 1.0000001}]
+        operations += [{"operator": "*", "num2": 1.0000001}] * 199
+        response = client.post(
+            "/calculate-chain", json={"operations": operations, "numeric": "fraction"}
+        )
+        assert response.status_code == 400
+        assert "máximo de 1000 dígitos" in response.json()["detail"]
+
+        response = client.get("/history")
+        assert response.status_code == 200
+        assert 0 < response.json()["count"] < 200
+
+    def test_invalid_mode(self, client):
+        """Prueba que un modo desconocido retorne error 422."""
+        response = client.post(
+            "/calculate", json={"num1": 1, "num2": 2, "operator": "+", "numeric": "complex"}
+        )
+        assert response.status_code == 422
+
+    def test_division_by_zero(self, client):
+        """Prueba la división por cero en modo decimal."""
+        response = client.post(
+            "/calculate", json={"num1": 1, "num2": 0, "operator": "/", "numeric": "decimal"}
+        )
+        assert response.status_code == 400
+
+
+class TestCompactChainEndpoint:
+    """Tests para el endpoint de cadena en formato compacto."""
+
+    def test_parallel_arrays(self, client):
+        """Prueba la cadena como arreglos paralelos."""
+        response = client.post(
+            "/calculate-chain/compact",
+            json={"num1": 10, "operators": ["+", "*", "-"], "operands": [5, 2, 3]},
+        )
+        assert response.status_code == 200
+        assert response.json()["result"] == 27
+
+    def test_packed_string(self, client):
+        """Prueba la cadena empaquetada y su registro en historial."""
+        response = client.post("/calculate-chain/compact", json={"num1": 10, "chain": "+5*2-3"})
+        assert response.status_code == 200
+        assert response.json()["result"] == 27
+        assert client.get("/history").json()["count"] == 3
+
+    def test_invalid_packed_string(self, client):
+        """Prueba que una cadena empaquetada inválida retorne error 422."""
+        response = client.post("/calculate-chain/compact", json={"num1": 10, "chain": "+5*"})
+        assert response.status_code == 422
+
+    def test_length_mismatch(self, client):
+        """Prueba que arreglos de distinta longitud retornen error 422."""
+        response = client.post(
+            "/calculate-chain/compact",
+            json={"num1": 10, "operators": ["+", "*"], "operands": [5]},
+        )
+        assert response.status_code == 422
+
+    def test_division_by_zero(self, client):
+        """Prueba división por cero en formato compacto."""
+        response = client.post("/calculate-chain/compact", json={"num1": 10, "chain": "+5/0"})
+        assert response.status_code == 400
+        assert "dividir por cero" in response.json()["detail"].lower()
+
+    def test_unexpected_error(self, client, monkeypatch):
+        """Prueba que un error inesperado retorne 500 como los demás endpoints."""
+
+        async def fail(*args):
+            raise RuntimeError("fallo interno")
+
+        monkeypatch.setattr(calculator, "calculate_chain_compact_async", fail)
+        response = client.post("/calculate-chain/compact", json={"num1": 10, "chain": "+5"})
+        assert response.status_code == 500
+        assert response.json()["detail"] == "Error inesperado: fallo interno"
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"num1": 1e308, "chain": "*10"},
+            {"num1": 1e308, "operators": ["*"], "operands": [10]},
+        ],
+    )
+    def test_overflow(self, client, payload):
+        """Prueba que un paso que desborda retorne 400 en ambos formatos."""
+        response = client.post("/calculate-chain/compact", json=payload)
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+        assert client.get("/history").status_code == 200
+
+    def test_packed_literal_out_of_range(self, client):
+        """Prueba que un literal fuera de rango en la cadena empaquetada se rechace."""
+        response = client.post("/calculate-chain/compact", json={"num1": 1, "chain": "+1e400"})
+        assert response.status_code == 422
+
+
+class TestCompiledChainEndpoints:
+    """Tests para los endpoints de cadenas compiladas."""
+
+    def test_compile_and_run_chain(self, client):
+        """Prueba compilar una cadena y ejecutarla con nuevos números iniciales."""
+        response = client.post(
+            "/calculate-chain/compile",
+            json={
+                "operations": [
+                    {"num1": 10, "operator": "+", "num2": 5},
+                    {"operator": "*", "num2": 2},
+                    {"operator": "*", "num2": 4},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["source_steps"] == 3
+        assert data["steps"] == [{"operator": "+", "num2": 5}, {"operator": "*", "num2": 8}]
+
+        response = client.post(f"/calculate-chain/{data['compiled_id']}", json={"num1": 2})
+        assert response.status_code == 200
+        assert response.json()["result"] == 56
+
+    def test_run_unknown_compiled_chain(self, client):
+        """Prueba que un identificador desconocido retorne error 404."""
+        response = client.post("/calculate-chain/noexiste", json={"num1": 1})
+        assert response.status_code == 404
+
+    def test_run_compiled_chain_division_by_zero(self, client):
+        """Prueba que la división por cero retorne error 400."""
+        response = client.post(
+            "/calculate-chain/compile", json={"operations": [{"operator": "/", "num2": 0}]}
+        )
+        compiled_id = response.json()["compiled_id"]
+        response = client.post(f"/calculate-chain/{compiled_id}", json={"num1": 1})
+        assert response.status_code == 400
+
+    def test_run_compiled_chain_overflow(self, client):
+        """Prueba que un paso que desborda retorne error 400."""
+        response = client.post(
+            "/calculate-chain/compile", json={"operations": [{"operator": "*", "num2": 10}]}
+        )
+        compiled_id = response.json()["compiled_id"]
+        response = client.post(f"/calculate-chain/{compiled_id}", json={"num1": 1e308})
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+
+
+class TestCalculateBatchEndpoint:
+    """Tests para el endpoint de operaciones en lote."""
+
+    def test_batch_operations(self, client):
+        """Prueba lote con varios operadores."""
+        response = client.post(
+            "/calculate-batch",
+            json={"num1": [10, 6, 9], "num2": [5, 3, 3], "operator": ["+", "*", "/"]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"] == [15, 18, 3]
+        assert data["errors"] == []
+        assert data["count"] == 3
+
+    def test_batch_division_by_zero_does_not_fail_batch(self, client):
+        """Prueba que la división por cero se reporte por elemento."""
+        response = client.post(
+            "/calculate-batch",
+            json={"num1": [10, 1], "num2": [5, 0], "operator": ["+", "/"]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"] == [15, None]
+        assert data["errors"][0]["index"] == 1
+
+    def test_batch_overflow_does_not_fail_batch(self, client):
+        """Prueba que los desbordes de ^ y exp se reporten por elemento."""
+        response = client.post(
+            "/calculate-batch",
+            json={
+                "num1": [10, 2, 1, 0],
+                "num2": [400, 3, 1000, 1000],
+                "operator": ["^"] * 2 + ["exp"] * 2,
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"] == [None, 8, None, 0]
+        assert [error["index"] for error in data["errors"]] == [0, 2]
+        assert "excede el rango" in data["errors"][0]["detail"]
+        assert client.get("/history").json()["count"] == 2
+
+    def test_batch_length_mismatch(self, client):
+        """Prueba que arreglos de distinta longitud retornen error 422."""
+        response = client.post(
+            "/calculate-batch", json={"num1": [1, 2], "num2": [1], "operator": ["+", "+"]}
+        )
+        assert response.status_code == 422
+
+    def test_batch_invalid_operator(self, client):
+        """Prueba que operador inválido retorne error 422."""
+        response = client.post(
+            "/calculate-batch", json={"num1": [1], "num2": [1], "operator": ["&"]}
+        )
+        assert response.status_code == 422
+
+
+class TestReduceEndpoint:
+    """Tests para el endpoint /reduce."""
+
+    def test_reduce_json(self, client):
+        """Prueba una reducción con JSON y su entrada única en el historial."""
+        response = client.post("/reduce", json={"operation": "sum", "values": [0.1] * 10})
+        assert response.status_code == 200
+        assert response.json() == {"operation": "sum", "result": 1.0, "count": 10}
+        assert client.get("/history").json()["count"] == 1
+
+    def test_reduce_overflow(self, client):
+        """Prueba que un resultado fuera del rango de los float retorne error 400."""
+        response = client.post("/reduce", json={"operation": "product", "values": [1e200, 1e200]})
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+        assert client.get("/history").json()["count"] == 0
+
+    def test_reduce_product_with_zero(self, client):
+        """Prueba que un cero anule el producto aunque los demás factores desborden."""
+        response = client.post(
+            "/reduce", json={"operation": "product", "values": [1e200, 1e200, 0]}
+        )
+        assert response.status_code == 200
+        assert response.json()["result"] == 0
+
+    def test_reduce_percentile_required(self, client):
+        """Prueba que percentile se requiera solo con la reducción percentile."""
+        response = client.post("/reduce", json={"operation": "percentile", "values": [1, 2]})
+        assert response.status_code == 422
+        response = client.post(
+            "/reduce", json={"operation": "mean", "values": [1, 2], "percentile": 50}
+        )
+        assert response.status_code == 422
+
+    def test_reduce_float64(self, client):
+        """Prueba una reducción con el cuerpo en float64 y opciones en la query."""
+        values = np.arange(1.0, 101.0)
+        response = client.post(
+            "/reduce",
+            params={"operation": "percentile", "percentile": 90},
+            content=values.astype("<f8").tobytes(),
+            headers={"Content-Type": "application/x-float64"},
+        )
+        assert response.status_code == 200
+        assert np.frombuffer(response.content, dtype="<f8")[0] == pytest.approx(90.1)
+
+    def test_reduce_msgpack(self, client):
+        """Prueba una reducción con MessagePack."""
+        response = client.post(
+            "/reduce",
+            content=msgpack.packb(
+                {"operation": "variance", "values": np.array([1.0, 3.0]).tobytes(), "ddof": 1}
+            ),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        assert response.status_code == 200
+        assert msgpack.unpackb(response.content) == {
+            "operation": "variance",
+            "result": 2.0,
+            "count": 2,
+        }
+
+    def test_reduce_binary_invalid(self, client):
+        """Prueba que una reducción binaria inválida retorne 400."""
+        response = client.post(
+            "/reduce",
+            params={"operation": "median"},
+            content=np.ones(2).tobytes(),
+            headers={"Content-Type": "application/x-float64"},
+        )
+        assert response.status_code == 400
+
+
+class TestBinaryProtocol:
+    """Tests para los cuerpos MessagePack y float64 en /calculate y /calculate-batch."""
+
+    @staticmethod
+    def float64_body(num1, num2, operators) -> bytes:
+        table = calculator.get_supported_operations()
+        return (
+            np.asarray(num1, dtype="<f8").tobytes()
+            + np.asarray(num2, dtype="<f8").tobytes()
+            + bytes(table.index(operator) for operator in operators)
+        )
+
+    def test_calculate_msgpack(self, client):
+        """Prueba /calculate con MessagePack."""
+        response = client.post(
+            "/calculate",
+            content=msgpack.packb({"num1": 10, "num2": 5, "operator": "*"}),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == {"result": 50}
+
+    def test_calculate_msgpack_invalid_operator(self, client):
+        """Prueba que MessagePack se valida igual que JSON (422)."""
+        response = client.post(
+            "/calculate",
+            content=msgpack.packb({"num1": 10, "num2": 5, "operator": "&"}),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize("path", ["/calculate", "/calculate-batch", "/reduce"])
+    def test_msgpack_non_string_keys(self, client, path):
+        """Prueba que un mapa MessagePack con claves binarias retorne 400."""
+        response = client.post(
+            path,
+            content=msgpack.packb({b"num1": 10, "num2": 5, "operator": "*"}, use_bin_type=True),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        assert response.status_code == 400
+        assert "claves" in response.json()["detail"]
+
+    def test_calculate_float64(self, client):
+        """Prueba /calculate con una operación float64."""
+        response = client.post(
+            "/calculate",
+            content=self.float64_body([10], [4], ["/"]),
+            headers={"Content-Type": "application/x-float64"},
+        )
+        assert response.status_code == 200
+        assert np.frombuffer(response.content[:8], dtype="<f8")[0] == 2.5
+        assert response.content[8:] == b"\x00"
+
+    def test_calculate_float64_division_by_zero(self, client):
+        """Prueba que un error en /calculate float64 retorne 400."""
+        response = client.post(
+            "/calculate",
+            content=self.float64_body([10], [0], ["/"]),
+            headers={"Content-Type": "application/x-float64"},
+        )
+        assert response.status_code == 400
+
+    def test_batch_float64(self, client):
+        """Prueba /calculate-batch con float64 y errores por elemento."""
+        response = client.post(
+            "/calculate-batch",
+            content=self.float64_body([1, 6, 1], [2, 3, 0], ["+", "*", "/"]),
+            headers={"Content-Type": "application/x-float64"},
+        )
+        assert response.status_code == 200
+        results = np.frombuffer(response.content[:24], dtype="<f8")
+        assert results[:2].tolist() == [3, 18]
+        assert np.isnan(results[2])
+        assert response.content[24:] == b"\x00\x00\x01"
+        assert client.get("/history").json()["count"] == 2
+
+    def test_batch_float64_invalid_body(self, client):
+        """Prueba que un cuerpo float64 mal formado retorne 400."""
+        response = client.post(
+            "/calculate-batch",
+            content=b"\x00" * 10,
+            headers={"Content-Type": "application/x-float64"},
+        )
+        assert response.status_code == 400
+
+    def test_batch_msgpack(self, client):
+        """Prueba /calculate-batch con columnas bin y listas en MessagePack."""
+        body = msgpack.packb(
+            {
+                "num1": np.array([1, 6, 1], dtype="<f8").tobytes(),
+                "num2": [2, 3, 0],
+                "operator": ["+", "*", "/"],
+            }
+        )
+        response = client.post(
+            "/calculate-batch", content=body, headers={"Content-Type": "application/msgpack"}
+        )
+        assert response.status_code == 200
+        data = msgpack.unpackb(response.content)
+        results = np.frombuffer(data["results"], dtype="<f8")
+        assert results[:2].tolist() == [3, 18]
+        assert np.isnan(results[2])
+        assert data["count"] == 3
+        assert data["errors"] == [{"index": 2, "detail": "No se puede dividir por cero"}]
+
+    def test_batch_msgpack_invalid_operator_list(self, client):
+        """Prueba que operator debe ser una lista de textos."""
+        body = msgpack.packb({"num1": [1], "num2": [2], "operator": [1]})
+        response = client.post(
+            "/calculate-batch", content=body, headers={"Content-Type": "application/msgpack"}
+        )
+        assert response.status_code == 400
+
+    def test_json_still_default(self, client):
+        """Prueba que JSON sigue funcionando en las rutas con protocolo binario."""
+        response = client.post("/calculate", json={"num1": 1, "num2": 2, "operator": "+"})
+        assert response.json()["result"] == 3
+
+
+class TestEvaluateEndpoint:
+    """Tests para el endpoint de evaluación de expresiones."""
+
+    def test_evaluate_expression(self, client):
+        """Prueba evaluar una expresión con paréntesis."""
+        response = client.post("/evaluate", json={"expression": "(10 + 5) * 2 - 3"})
+        assert response.status_code == 200
+        assert response.json()["result"] == 27
+
+    def test_evaluate_with_variables(self, client):
+        """Prueba evaluar una expresión con variables."""
+        response = client.post(
+            "/evaluate", json={"expression": "price * qty", "variables": {"price": 2.5, "qty": 4}}
+        )
+        assert response.status_code == 200
+        assert response.json()["result"] == 10
+
+    def test_evaluate_invalid_expression(self, client):
+        """Prueba que una expresión inválida retorne error 400."""
+        response = client.post("/evaluate", json={"expression": "2 * (3"})
+        assert response.status_code == 400
+
+    def test_evaluate_division_by_zero(self, client):
+        """Prueba que la división por cero retorne error 400."""
+        response = client.post("/evaluate", json={"expression": "1 / 0"})
+        assert response.status_code == 400
+
+    def test_evaluate_overflow(self, client):
+        """Prueba que un resultado que desborda retorne error 400."""
+        response = client.post("/evaluate", json={"expression": "10 ^ 400"})
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+
+    @pytest.mark.parametrize("expression", ["1e308 * 10", "x * 10", "1e308 / 1e-10 + 1"])
+    def test_evaluate_scalar_overflow(self, client, expression):
+        """Prueba que el desborde de cualquier operador retorne error 400."""
+        response = client.post(
+            "/evaluate", json={"expression": expression, "variables": {"x": 1e308}}
+        )
+        assert response.status_code == 400
+        assert "excede el rango" in response.json()["detail"]
+
+    def test_evaluate_literal_out_of_range(self, client):
+        """Prueba que un literal fuera de rango retorne error 400."""
+        response = client.post("/evaluate", json={"expression": "1e400 - 1"})
+        assert response.status_code == 400
+        assert "fuera de rango" in response.json()["detail"]
+
+
+class TestTemplateEndpoints:
+    """Tests para los endpoints de plantillas de fórmulas."""
+
+    def test_register_and_evaluate_template(self, client):
+        """Prueba registrar una plantilla y evaluarla sobre columnas."""
+        response = client.post("/templates", json={"expression": "price * qty - discount"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["variables"] == ["discount", "price", "qty"]
+
+        response = client.post(
+            f"/templates/{data['template_id']}/evaluate",
+            json={"bindings": {"price": [10, 2.5], "qty": [3, 4], "discount": [5, 0]}},
+        )
+        assert response.status_code == 200
+        assert response.json()["results"] == [25, 10]
+
+    def test_register_invalid_template(self, client):
+        """Prueba que una fórmula inválida retorne error 400."""
+        response = client.post("/templates", json={"expression": "price *"})
+        assert response.status_code == 400
+
+    def test_evaluate_unknown_template(self, client):
+        """Prueba que un identificador desconocido retorne error 404."""
+        response = client.post("/templates/noexiste/evaluate", json={"bindings": {"x": [1]}})
+        assert response.status_code == 404
+
+    def test_evaluate_template_missing_binding(self, client):
+        """Prueba que una variable sin columna retorne error 400."""
+        template_id = client.post("/templates", json={"expression": "a + b"}).json()["template_id"]
+        response = client.post(f"/templates/{template_id}/evaluate", json={"bindings": {"a": [1]}})
+        assert response.status_code == 400
+
+    def test_evaluate_template_overflow(self, client):
+        """Prueba que un desborde se reporte como error del elemento."""
+        template_id = client.post("/templates", json={"expression": "x ^ 400"}).json()[
+            "template_id"
+        ]
+        response = client.post(
+            f"/templates/{template_id}/evaluate", json={"bindings": {"x": [10, 1]}}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"] == [None, 1]
+        assert data["errors"][0]["index"] == 0
+
+
+class TestCalculateStreamEndpoint:
+    """Tests para el endpoint de evaluación en streaming."""
+
+    def test_stream_operations(self, client):
+        """Prueba evaluar un stream NDJSON de operaciones."""
+
+        def body():
+            yield b'{"num1": 10, "num2": 5, "operator": "+"}\n'
+            yield b'{"num1": 1, "num2": 0, "operator": "/"}\n'
+
+        response = client.post(
+            "/calculate-stream", content=body(), headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"result": 15, "line": 1}
+        assert lines[1]["line"] == 2 and "error" in lines[1]
+
+
+class TestCacheEndpoints:
+    """Tests para los endpoints de la caché de resultados."""
+
+    def test_cache_stats(self, client):
+        """Prueba obtener los contadores de la caché."""
+        response = client.get("/cache/stats")
+        assert response.status_code == 200
+        assert "enabled" in response.json()
+
+    def test_executor_stats(self, client):
+        """Prueba que el pool de procesos esté desactivado por defecto."""
+        response = client.get("/executor/stats")
+        assert response.status_code == 200
+        assert response.json() == {"enabled": False}
+
+    def test_admission_stats(self, client):
+        """Prueba que el control de admisión esté desactivado por defecto."""
+        response = client.get("/admission/stats")
+        assert response.status_code == 200
+        assert response.json()["enabled"] is False
+
+    def test_coalescing_stats(self, client):
+        """Prueba que la coalescencia de cadenas esté desactivada por defecto."""
+        response = client.get("/coalescing/stats")
+        assert response.status_code == 200
+        assert response.json() == {"enabled": False}
+
+    def test_clear_cache(self, client):
+        """Prueba limpiar la caché."""
+        response = client.delete("/cache")
+        assert response.status_code == 200
+        assert "message" in response.json()
+
+
+class TestSessionWebSocket:
+    """Tests para el endpoint WebSocket /ws/session."""
+
+    def test_running_total(self, client):
+        """Prueba una sesión con acumulador."""
+        with client.websocket_connect("/ws/session") as websocket:
+            hello = websocket.receive_json()
+            assert hello["result"] == 0
+            assert len(hello["session"]) == 16
+
+            websocket.send_json({"num1": 10})
+            assert websocket.receive_json() == {"result": 10}
+            websocket.send_json({"operator": "*", "num2": 3})
+            assert websocket.receive_json() == {"result": 30}
+            websocket.send_json({"operator": "/", "num2": 0})
+            response = websocket.receive_json()
+            assert response["result"] == 30
+            assert "dividir por cero" in response["error"].lower()
+            assert len(sessions) == 1
+        assert len(sessions) == 0
+        assert client.get("/history").json()["count"] == 1
+
+    def test_max_sessions(self, client, monkeypatch):
+        """Prueba que sobre el máximo de sesiones la conexión se cierre con 1013."""
+        monkeypatch.setattr(sessions, "max_sessions", 0)
+        with client.websocket_connect("/ws/session") as websocket:
+            with pytest.raises(WebSocketDisconnect) as disconnect:
+                websocket.receive_json()
+        assert disconnect.value.code == 1013
+
+    def test_idle_session_is_closed(self, client, monkeypatch):
+        """Prueba que una sesión inactiva se cierre con 1001."""
+        monkeypatch.setattr(sessions, "idle_timeout", 0.05)
+        with client.websocket_connect("/ws/session") as websocket:
+            websocket.receive_json()
+            with pytest.raises(WebSocketDisconnect) as disconnect:
+                websocket.receive_json()
+        assert disconnect.value.code == 1001
+        assert len(sessions) == 0
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def store_client(request, tmp_path, monkeypatch):
+    """Fixture de cliente con el historial en SQLite o en el log en disco."""
+    if request.param == "sqlite":
+        store = SQLiteHistoryStore(str(tmp_path / "history.db"))
+    else:
+        store = FileHistoryStore(str(tmp_path / "history.log"))
+    monkeypatch.setattr(calculator, "history", store)
+    yield TestClient(app)
+    store.close()
+
 
 class TestHistoryEndpoints:
     """Tests para endpoints de historial."""
@@ -197,6 +936,86 @@ class TestHistoryEndpoints:
         response = client.get("/history")
         assert response.json()["count"] == 0
 
+    def test_history_pagination(self, client):
+        """Prueba leer el historial por páginas."""
+        for i in range(5):
+            client.post("/calculate", json={"num1": i, "num2": 1, "operator": "+"})
+
+        response = client.get("/history", params={"offset": 1, "limit": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert data["total"] == 5
+        assert data["offset"] == 1
+        assert [item["num1"] for item in data["history"]] == [1, 2]
+
+    def test_history_filters(self, client):
+        """Prueba filtrar el historial por operador y rango de resultado."""
+        for operator in ("+", "*", "+"):
+            client.post("/calculate", json={"num1": 4, "num2": 2, "operator": operator})
+
+        data = client.get("/history", params={"operator": "+"}).json()
+        assert data["total"] == 2
+        assert all(item["operator"] == "+" for item in data["history"])
+
+        data = client.get("/history", params={"min_result": 7}).json()
+        assert [item["result"] for item in data["history"]] == [8]
+
+        data = client.get("/history", params={"since": 0, "until": 1}).json()
+        assert data["count"] == 0
+
+    def test_history_filters_other_backends(self, store_client):
+        """Prueba los filtros del historial con los backends sqlite y file."""
+        for operator in ("+", "*", "+"):
+            store_client.post("/calculate", json={"num1": 4, "num2": 2, "operator": operator})
+
+        data = store_client.get("/history", params={"operator": "+"}).json()
+        assert data["total"] == 2
+        assert all(item["operator"] == "+" for item in data["history"])
+
+        data = store_client.get("/history", params={"min_result": 7}).json()
+        assert [item["result"] for item in data["history"]] == [8]
+
+        data = store_client.get("/history", params={"since": 0, "until": 1}).json()
+        assert data["count"] == 0
+
+    def test_history_stats(self, client):
+        """Prueba los agregados del historial y la tasa de error."""
+        client.post("/calculate", json={"num1": 4, "num2": 2, "operator": "+"})
+        client.post("/calculate", json={"num1": 4, "num2": 2, "operator": "*"})
+        client.post("/calculate", json={"num1": 4, "num2": 0, "operator": "/"})
+
+        response = client.get("/history/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert data["operators"] == {"+": 1, "*": 1}
+        assert data["min"] == 6
+        assert data["max"] == 8
+        assert data["mean"] == 7
+        assert data["errors"] == 1
+        assert data["error_rate"] == pytest.approx(1 / 3)
+
+    def test_history_stats_other_backends(self, store_client):
+        """Prueba los agregados del historial con los backends sqlite y file."""
+        store_client.post("/calculate", json={"num1": 4, "num2": 2, "operator": "+"})
+        store_client.post("/calculate", json={"num1": 4, "num2": 2, "operator": "*"})
+        store_client.post("/calculate", json={"num1": 4, "num2": 0, "operator": "/"})
+
+        response = store_client.get("/history/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert data["operators"] == {"+": 1, "*": 1}
+        assert (data["min"], data["max"], data["mean"]) == (6, 8, 7)
+        assert data["errors"] == 1
+        assert data["error_rate"] == pytest.approx(1 / 3)
+
+    def test_history_invalid_limit(self, client):
+        """Prueba que un limit inválido retorne error 422."""
+        response = client.get("/history", params={"limit": 0})
+        assert response.status_code == 422
+
     def test_history_from_chain(self, client):
         """Prueba que operaciones en cadena aparezcan en historial."""
         client.post(
@@ -212,3 +1031,83 @@ class TestHistoryEndpoints:
         response = client.get("/history")
         data = response.json()
         assert data["count"] == 2  # Dos operaciones en la cadena
+
+
+@pytest.fixture
+def fast_client(client, monkeypatch):
+    """Fixture de cliente con serialización rápida activada."""
+    monkeypatch.setattr(settings, "fast_serialization", True)
+    return client
+
+
+class TestFastSerialization:
+    """Tests para el modo de serialización rápida."""
+
+    def test_calculate_without_message(self, fast_client):
+        """Prueba que en modo rápido el mensaje se omite por defecto."""
+        response = fast_client.post("/calculate", json={"num1": 10, "num2": 5, "operator": "+"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"result": 15}
+
+    def test_calculate_with_message(self, fast_client):
+        """Prueba pedir el mensaje en modo rápido."""
+        response = fast_client.post(
+            "/calculate",
+            params={"message": "true"},
+            json={"num1": 10, "num2": 5, "operator": "+"},
+        )
+        assert response.json() == {"result": 15, "message": "10.0 + 5.0 = 15.0"}
+
+    def test_calculate_error(self, fast_client):
+        """Prueba que los errores mantienen el formato en modo rápido."""
+        response = fast_client.post("/calculate", json={"num1": 1, "num2": 0, "operator": "/"})
+        assert response.status_code == 400
+        assert "detail" in response.json()
+
+    def test_message_optional_in_default_mode(self, client):
+        """Prueba que ?message=false omite el mensaje también en el modo normal."""
+        response = client.post(
+            "/calculate",
+            params={"message": "false"},
+            json={"num1": 10, "num2": 5, "operator": "+"},
+        )
+        assert response.json() == {"result": 15}
+
+    def test_message_optional_in_default_mode_chain(self, client):
+        """Prueba que ?message=false omite el mensaje de las cadenas en el modo normal."""
+        response = client.post(
+            "/calculate-chain",
+            params={"message": "false"},
+            json={"operations": [{"num1": 10, "operator": "+", "num2": 5}]},
+        )
+        assert response.json() == {"result": 15}
+
+    def test_chain(self, fast_client):
+        """Prueba operaciones en cadena en modo rápido."""
+        response = fast_client.post(
+            "/calculate-chain",
+            json={"operations": [{"num1": 10, "operator": "+", "num2": 5}]},
+        )
+        assert response.json() == {"result": 15}
+
+    def test_batch(self, fast_client):
+        """Prueba el lote en modo rápido."""
+        response = fast_client.post(
+            "/calculate-batch",
+            json={"num1": [1, 1], "num2": [2, 0], "operator": ["+", "/"]},
+        )
+        data = response.json()
+        assert data["results"] == [3, None]
+        assert data["count"] == 2
+        assert data["errors"][0]["index"] == 1
+
+    def test_history_matches_default_mode(self, fast_client, monkeypatch):
+        """Prueba que /history retorna el mismo cuerpo en ambos modos."""
+        for i in range(3):
+            fast_client.post("/calculate", json={"num1": i, "num2": 1, "operator": "+"})
+        fast = fast_client.get("/history", params={"offset": 1}).json()
+        monkeypatch.setattr(settings, "fast_serialization", False)
+        default = fast_client.get("/history", params={"offset": 1}).json()
+        assert fast == default
+        assert fast["count"] == 2
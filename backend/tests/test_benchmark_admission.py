@@ -0,0 +1,39 @@
+"""
+Benchmarks del control de admisión.
+Mide el costo de cobrar un token (por petición) y de barrer los clientes inactivos.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import time
+
+import pytest
+from app.admission import TokenBuckets
+
+CLIENTS = 100_000
+ACQUIRES = 200_000
+
+
+@pytest.mark.benchmark
+class TestAdmissionBenchmark:
+    """Benchmarks de TokenBuckets."""
+
+    def test_acquire_and_sweep(self):
+        """Reporta el costo por petición y el de un barrido con muchos clientes."""
+        buckets = TokenBuckets(rate=1_000.0, burst=1_000.0, sweep_interval=3_600.0)
+        keys = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(CLIENTS)]
+
+        start = time.perf_counter()
+        for i in range(ACQUIRES):
+            buckets.acquire(keys[i % CLIENTS])
+        acquire_time = (time.perf_counter() - start) / ACQUIRES
+
+        time.sleep(1.0)
+        start = time.perf_counter()
+        swept = buckets.sweep()
+        sweep_time = time.perf_counter() - start
+
+        print(
+            f"\nacquire: {acquire_time * 1e6:.2f} µs por petición; "
+            f"barrido de {CLIENTS} clientes: {sweep_time * 1e3:.1f} ms ({swept} liberados)"
+        )
+        assert swept == CLIENTS
@@ -0,0 +1,56 @@
+"""
+Benchmarks de validación de cadenas largas.
+Compara el formato de un objeto por paso (ChainOperationRequest + dict por paso)
+con el formato compacto (arreglos paralelos o cadena empaquetada).
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import time
+
+import pytest
+
+from app.schemas import ChainOperationRequest, CompactChainRequest
+
+STEPS = 5_000
+ITERATIONS = 20
+
+
+def best_of(function, iterations: int = ITERATIONS, repeats: int = 3) -> float:
+    """Retorna el menor tiempo por llamada (en segundos) de varias repeticiones."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+
+@pytest.mark.benchmark
+class TestChainValidationBenchmark:
+    """Benchmarks de validación de una cadena de 5000 pasos."""
+
+    def test_compact_formats(self):
+        """Reporta el tiempo de validación de cada formato."""
+        operators = ["+", "*", "-", "/"] * (STEPS // 4)
+        operands = [float(i % 7 + 1) for i in range(STEPS)]
+        objects = {
+            "operations": [{"num1": 1, "operator": operators[0], "num2": operands[0]}]
+            + [{"operator": op, "num2": n} for op, n in zip(operators[1:], operands[1:])]
+        }
+        arrays = {"num1": 1, "operators": operators, "operands": operands}
+        packed = {"num1": 1, "chain": "".join(f"{op}{n:g}" for op, n in zip(operators, operands))}
+
+        def per_item():
+            request = ChainOperationRequest(**objects)
+            return [op.dict() for op in request.operations]
+
+        per_item_time = best_of(per_item)
+        arrays_time = best_of(lambda: CompactChainRequest(**arrays))
+        packed_time = best_of(lambda: CompactChainRequest(**packed))
+        print(
+            f"\n{STEPS} pasos: objetos {per_item_time * 1e3:.2f} ms, "
+            f"arreglos {arrays_time * 1e3:.2f} ms, empaquetada {packed_time * 1e3:.2f} ms"
+        )
+        assert arrays_time < per_item_time
+        assert packed_time < per_item_time
@@ -0,0 +1,105 @@
+"""
+Benchmarks del historial.
+Mide operaciones agregadas por segundo con 1, 4 y 8 procesos escribiendo
+en el mismo historial SQLite (como N workers de uvicorn) y el tiempo de
+recuperación del log binario persistente.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import multiprocessing
+import time
+
+import pytest
+import numpy as np
+from app.history import FileHistoryStore, RingBufferHistory, SQLiteHistoryStore
+
+APPENDS_PER_WORKER = 500
+
+
+def append_worker(path: str, count: int, barrier, elapsed) -> None:
+    """Agrega `count` operaciones desde un proceso independiente y reporta su duración."""
+    store = SQLiteHistoryStore(path, capacity=100_000)
+    barrier.wait()
+    start = time.perf_counter()
+    for i in range(count):
+        store.append(i, 1, "+", i + 1)
+    elapsed.put(time.perf_counter() - start)
+    store.close()
+
+
+@pytest.mark.benchmark
+class TestHistoryThroughputBenchmark:
+    """Benchmarks de escritura concurrente en el historial."""
+
+    @pytest.mark.parametrize("workers", [1, 4, 8])
+    def test_sqlite_throughput(self, tmp_path, workers):
+        """Reporta el throughput con varios procesos y verifica que no se pierdan escrituras."""
+        path = str(tmp_path / "history.db")
+        SQLiteHistoryStore(path, capacity=100_000).close()
+
+        # El tiempo se mide dentro de los workers para excluir el arranque de procesos
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(workers)
+        durations = context.Queue()
+        processes = [
+            context.Process(
+                target=append_worker, args=(path, APPENDS_PER_WORKER, barrier, durations)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        elapsed = max(durations.get(timeout=60) for _ in processes)
+        for process in processes:
+            process.join()
+
+        total = workers * APPENDS_PER_WORKER
+        print(f"\nSQLite {workers} worker(s): {total / elapsed:,.0f} ops/s")
+        assert all(process.exitcode == 0 for process in processes)
+        assert len(SQLiteHistoryStore(path, capacity=100_000)) == total
+
+    def test_memory_throughput(self):
+        """Reporta el throughput del historial en memoria (un proceso)."""
+        store = RingBufferHistory(capacity=10_000)
+        total = 100_000
+        start = time.perf_counter()
+        for i in range(total):
+            store.append(i, 1, "+", i + 1)
+        elapsed = time.perf_counter() - start
+        print(f"\nMemoria 1 worker: {total / elapsed:,.0f} ops/s")
+        assert len(store) == 10_000
+
+
+@pytest.mark.benchmark
+class TestFileHistoryBenchmark:
+    """Benchmarks del log binario persistente."""
+
+    def test_recovery_with_10m_records(self, tmp_path):
+        """Verifica que abrir un log de 10M registros tome menos de un segundo."""
+        path = str(tmp_path / "history.log")
+        FileHistoryStore(path).close()
+        records = np.zeros(10_000_000, dtype=FileHistoryStore.RECORD)
+        with open(path, "ab") as f:
+            f.write(records.tobytes())
+        with open(path + ".ops", "w") as f:
+            f.write("+\n")
+
+        start = time.perf_counter()
+        store = FileHistoryStore(path, capacity=10_000)
+        page = store.get_page(limit=100)
+        elapsed = time.perf_counter() - start
+        print(f"\nRecuperación de 10M registros: {elapsed * 1000:.0f} ms")
+        assert len(page) == 100
+        assert elapsed < 1.0
+
+    def test_append_throughput(self, tmp_path):
+        """Reporta el throughput de escritura con group commit."""
+        store = FileHistoryStore(str(tmp_path / "history.log"), capacity=10_000)
+        total = 100_000
+        start = time.perf_counter()
+        for i in range(total):
+            store.append(i, 1, "+", i + 1)
+        store.flush()
+        elapsed = time.perf_counter() - start
+        print(f"\nLog binario 1 worker: {total / elapsed:,.0f} ops/s")
+        assert len(store) == 10_000
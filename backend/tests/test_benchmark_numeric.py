@@ -0,0 +1,58 @@
+"""
+Benchmarks de los modos numéricos.
+Compara el costo de una operación y de una cadena en los modos float,
+decimal y fraction para elegir el modo según la carga.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import timeit
+
+import pytest
+from app.calculator import Calculator
+from app.history import RingBufferHistory
+
+ITERATIONS = 20_000
+CHAIN_ITERATIONS = 200
+CHAIN = [{"num1": 0.1, "operator": "+", "num2": 0.2}] + [
+    {"operator": operator, "num2": 1.1} for operator in "+*-/" * 25
+]
+
+
+def per_call_us(statement, number: int) -> float:
+    """Retorna el mejor tiempo por llamada en microsegundos."""
+    return min(timeit.repeat(statement, number=number, repeat=3)) / number * 1e6
+
+
+@pytest.mark.benchmark
+class TestNumericModeBenchmark:
+    """Benchmarks de los modos numéricos."""
+
+    def setup_method(self):
+        """Calculadora con historial acotado."""
+        self.calculator = Calculator(history=RingBufferHistory(capacity=1_000))
+
+    def test_single_operation(self):
+        """Compara una división en cada modo con la ruta float por defecto."""
+        calculator = self.calculator
+        base = per_call_us(lambda: calculator.calculate(0.1, 0.3, "/"), ITERATIONS)
+        lines = [f"\nfloat (calculate): {base:.2f} µs"]
+        for numeric in ("float", "decimal", "fraction"):
+            elapsed = per_call_us(
+                lambda: calculator.calculate_numeric(0.1, 0.3, "/", numeric), ITERATIONS
+            )
+            lines.append(f"{numeric}: {elapsed:.2f} µs ({elapsed / base:.1f}x)")
+        print("\n".join(lines))
+        assert base > 0
+
+    def test_chain(self):
+        """Compara una cadena de 100 pasos en cada modo."""
+        calculator = self.calculator
+        base = per_call_us(lambda: calculator.calculate_chain(CHAIN), CHAIN_ITERATIONS)
+        lines = [f"\ncadena float (calculate_chain): {base:.1f} µs"]
+        for numeric in ("decimal", "fraction"):
+            elapsed = per_call_us(
+                lambda: calculator.calculate_chain_numeric(CHAIN, numeric), CHAIN_ITERATIONS
+            )
+            lines.append(f"cadena {numeric}: {elapsed:.1f} µs ({elapsed / base:.1f}x)")
+        print("\n".join(lines))
+        assert base > 0
@@ -0,0 +1,83 @@
+"""
+Benchmarks del pool de procesos.
+Mide el retraso máximo del event loop (un temporizador de 1 ms) mientras se
+ejecuta una cadena larga y un lote grande en línea y en el pool de procesos.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from app.calculator import Calculator
+from app.executor import OffloadExecutor
+from app.history import RingBufferHistory
+
+CHAIN_STEPS = 200_000
+BATCH_SIZE = 2_000_000
+
+
+async def max_loop_lag(coroutine):
+    """Ejecuta la corrutina y retorna (tiempo total, retraso máximo del event loop)."""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await coroutine
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, lag
+
+
+@pytest.mark.benchmark
+class TestOffloadBenchmark:
+    """Benchmarks del event loop con y sin pool de procesos."""
+
+    @pytest.fixture(scope="class")
+    def executor(self):
+        """Pool de cuatro workers con el umbral por defecto."""
+        pool = OffloadExecutor(workers=4)
+        pool.start()
+        yield pool
+        pool.shutdown()
+
+    def test_chain_loop_lag(self, executor):
+        """Compara el retraso del event loop con una cadena larga."""
+        steps = np.random.default_rng(0).random(CHAIN_STEPS).tolist()
+        operators = ["+"] * CHAIN_STEPS
+        for label, pool in (("en línea", None), ("pool", executor)):
+            calculator = Calculator(history=RingBufferHistory(CHAIN_STEPS), executor=pool)
+            elapsed, lag = asyncio.run(
+                max_loop_lag(calculator.calculate_chain_compact_async(0.0, operators, steps))
+            )
+            print(
+                f"\ncadena de {CHAIN_STEPS} pasos {label}: {elapsed * 1e3:.0f} ms, "
+                f"retraso máximo del loop {lag * 1e3:.1f} ms"
+            )
+
+    def test_batch_loop_lag(self, executor):
+        """Compara el retraso del event loop con un lote grande repartido en bloques."""
+        rng = np.random.default_rng(1)
+        a, b = rng.random(BATCH_SIZE), rng.random(BATCH_SIZE) + 1
+        ops = np.array(["+", "-", "*", "/", "^"], dtype=object)[rng.integers(0, 5, BATCH_SIZE)]
+        for label, pool in (("en línea", None), ("pool", executor)):
+            calculator = Calculator(history=RingBufferHistory(10), executor=pool)
+            elapsed, lag = asyncio.run(
+                max_loop_lag(calculator.calculate_batch_arrays_async(a, b, ops))
+            )
+            print(
+                f"\nlote de {BATCH_SIZE} elementos {label}: {elapsed * 1e3:.0f} ms, "
+                f"retraso máximo del loop {lag * 1e3:.1f} ms"
+            )
+        assert executor.stats()["completed"] > 0
@@ -0,0 +1,48 @@
+"""
+Micro-benchmarks del factory de operaciones.
+Compara el costo por llamada de instanciar la operación en cada cálculo
+frente a reutilizar la instancia compartida del factory.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import timeit
+
+import pytest
+from app.calculator import Calculator
+from app.history import RingBufferHistory
+from app.operations import OperationFactory
+
+ITERATIONS = 200_000
+
+
+def per_call_ns(statement) -> float:
+    """Retorna el mejor tiempo por llamada en nanosegundos."""
+    best = min(timeit.repeat(statement, number=ITERATIONS, repeat=5))
+    return best / ITERATIONS * 1e9
+
+
+def create_fresh(operator: str):
+    """Comportamiento anterior: una instancia nueva por llamada."""
+    operation_class = OperationFactory._operations.get(operator)
+    if operation_class is None:
+        raise ValueError(f"Operación no soportada: {operator}")
+    return operation_class()
+
+
+@pytest.mark.benchmark
+class TestOperationFactoryBenchmark:
+    """Benchmarks de obtención y ejecución de operaciones."""
+
+    def test_shared_instance_is_cheaper_than_instantiation(self):
+        """Prueba que reutilizar la instancia sea más barato que crearla."""
+        before = per_call_ns(lambda: create_fresh("*"))
+        after = per_call_ns(lambda: OperationFactory.create_operation("*"))
+        print(f"\ncreate_operation: instancia nueva {before:.0f} ns, compartida {after:.0f} ns")
+        assert after < before
+
+    def test_calculate_per_call_overhead(self):
+        """Reporta el costo por llamada de Calculator.calculate."""
+        calculator = Calculator(history=RingBufferHistory(capacity=1_000))
+        elapsed = per_call_ns(lambda: calculator.calculate(6.0, 7.0, "*"))
+        print(f"\nCalculator.calculate: {elapsed:.0f} ns/llamada")
+        assert elapsed > 0
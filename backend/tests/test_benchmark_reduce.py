@@ -0,0 +1,68 @@
+"""
+Benchmarks de las reducciones.
+Compara sumar una columna con una cadena de pasos "+" (una entrada de historial
+por paso) frente a Calculator.reduce (una sola entrada), y la memoria adicional
+de las reducciones por bloques.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+from app.calculator import Calculator
+from app.history import RingBufferHistory
+
+SIZE = 100_000
+LARGE_SIZE = 5_000_000
+
+
+@pytest.mark.benchmark
+class TestReduceBenchmark:
+    """Benchmarks de Calculator.reduce."""
+
+    def test_reduce_vs_chain(self):
+        """Compara la suma por cadena con la reducción."""
+        values = np.random.default_rng(0).random(SIZE)
+        calculator = Calculator(history=RingBufferHistory(capacity=SIZE))
+        operations = [{"num1": 0.0, "operator": "+", "num2": values[0]}] + [
+            {"operator": "+", "num2": value} for value in values[1:].tolist()
+        ]
+
+        start = time.perf_counter()
+        chained = calculator.calculate_chain(operations)
+        chain_time = time.perf_counter() - start
+        entries = calculator.get_history_count()
+
+        calculator.clear_history()
+        start = time.perf_counter()
+        reduced = calculator.reduce(values, "sum")
+        reduce_time = time.perf_counter() - start
+
+        print(
+            f"\nsuma de {SIZE} valores: cadena {chain_time * 1e3:.1f} ms ({entries} entradas), "
+            f"reduce {reduce_time * 1e3:.2f} ms (1 entrada), "
+            f"{chain_time / reduce_time:.0f}x"
+        )
+        assert reduced == pytest.approx(chained)
+        assert calculator.get_history_count() == 1
+
+    @pytest.mark.parametrize("operation", ["sum", "mean", "variance", "min", "percentile"])
+    def test_large_reduction(self, operation):
+        """Reporta tiempo y memoria adicional de reducir 5M valores."""
+        values = np.random.default_rng(1).random(LARGE_SIZE)
+        calculator = Calculator(history=RingBufferHistory(capacity=10))
+        percentile = 99.0 if operation == "percentile" else None
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        calculator.reduce(values, operation, percentile)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"\n{operation} de {LARGE_SIZE} valores: {elapsed * 1e3:.1f} ms, "
+            f"memoria adicional {peak / 2**20:.1f} MiB"
+        )
+        assert elapsed > 0
@@ -0,0 +1,78 @@
+"""
+Benchmarks de serialización de respuestas.
+Compara el camino por defecto (modelo de Pydantic + jsonable_encoder + JSONResponse)
+con la serialización directa a bytes de FastJSONResponse.
+Ejecutar con: pytest -m benchmark -s
+"""
+
+import time
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas import HistoryResponse, OperationResponse
+from app.serialization import FastJSONResponse, history_payload, operation_payload
+
+ITERATIONS = 20_000
+HISTORY_ITERATIONS = 200
+HISTORY_SIZE = 1_000
+
+
+def best_of(function, iterations: int, repeats: int = 3) -> float:
+    """Retorna el menor tiempo por llamada (en segundos) de varias repeticiones."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+
+@pytest.mark.benchmark
+class TestSerializationBenchmark:
+    """Benchmarks del camino de respuesta."""
+
+    def test_operation_response(self):
+        """Compara la respuesta de /calculate con y sin el modo rápido."""
+        num1, num2, result = 10.0, 5.0, 15.0
+
+        def default():
+            model = OperationResponse(result=result, message=f"{num1} + {num2} = {result}")
+            return JSONResponse(jsonable_encoder(model)).body
+
+        def fast():
+            return FastJSONResponse(operation_payload(result)).body
+
+        default_time = best_of(default, ITERATIONS)
+        fast_time = best_of(fast, ITERATIONS)
+        print(
+            f"\n/calculate: por defecto {default_time * 1e6:.2f} µs, "
+            f"rápido {fast_time * 1e6:.2f} µs ({default_time / fast_time:.1f}x)"
+        )
+        assert fast_time < default_time
+
+    def test_history_response(self):
+        """Compara la respuesta de /history con 1000 operaciones."""
+        history = [
+            {"num1": float(i), "num2": 2.0, "operator": "*", "result": i * 2.0}
+            for i in range(HISTORY_SIZE)
+        ]
+
+        def default():
+            model = HistoryResponse(
+                history=history, count=len(history), total=len(history), offset=0
+            )
+            return JSONResponse(jsonable_encoder(model)).body
+
+        def fast():
+            return FastJSONResponse(history_payload(history, len(history), 0)).body
+
+        default_time = best_of(default, HISTORY_ITERATIONS)
+        fast_time = best_of(fast, HISTORY_ITERATIONS)
+        print(
+            f"\n/history ({HISTORY_SIZE}): por defecto {default_time * 1e3:.2f} ms, "
+            f"rápido {fast_time * 1e3:.2f} ms ({default_time / fast_time:.1f}x)"
+        )
+        assert fast_time < default_time
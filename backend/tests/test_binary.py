@@ -0,0 +1,110 @@
+"""
+Tests para el protocolo binario.
+Prueba la decodificación float64 y MessagePack y la negociación por Content-Type.
+"""
+
+import msgpack
+import numpy as np
+import pytest
+
+from app.binary import (
+    FLOAT64,
+    MSGPACK,
+    decode_float64,
+    encode_float64,
+    float64_column,
+    media_type_of,
+    unpack,
+)
+
+TABLE = ["+", "-", "*", "/"]
+
+
+def float64_body(num1, num2, codes) -> bytes:
+    """Construye un cuerpo float64 a partir de columnas."""
+    return (
+        np.asarray(num1, dtype="<f8").tobytes()
+        + np.asarray(num2, dtype="<f8").tobytes()
+        + bytes(codes)
+    )
+
+
+class TestMediaType:
+    """Tests para la negociación del formato."""
+
+    @pytest.mark.parametrize(
+        "content_type, expected",
+        [
+            ("application/msgpack", MSGPACK),
+            ("application/x-msgpack; charset=binary", MSGPACK),
+            ("Application/X-Float64", FLOAT64),
+            ("application/json", ""),
+        ],
+    )
+    def test_media_type_of(self, content_type, expected):
+        """Prueba reconocer los Content-Type binarios."""
+        assert media_type_of(content_type) == expected
+
+
+class TestFloat64:
+    """Tests para el formato float64."""
+
+    def test_decode(self):
+        """Prueba decodificar columnas y códigos de operador."""
+        num1, num2, operators = decode_float64(float64_body([1, 2], [3, 4], [0, 3]), TABLE)
+        assert num1.tolist() == [1, 2]
+        assert num2.tolist() == [3, 4]
+        assert operators.tolist() == ["+", "/"]
+
+    def test_decode_is_zero_copy(self):
+        """Prueba que los números son vistas del cuerpo."""
+        body = float64_body([1], [2], [0])
+        num1, _, _ = decode_float64(body, TABLE)
+        assert num1.base is not None
+        assert not num1.flags.writeable
+
+    @pytest.mark.parametrize("body", [b"", b"\x00" * 18])
+    def test_invalid_size(self, body):
+        """Prueba que el cuerpo debe tener 17 bytes por operación."""
+        with pytest.raises(ValueError, match="17 bytes"):
+            decode_float64(body, TABLE)
+
+    def test_invalid_code(self):
+        """Prueba que un código fuera de la tabla es inválido."""
+        with pytest.raises(ValueError, match="Código de operador"):
+            decode_float64(float64_body([1], [2], [4]), TABLE)
+
+    def test_encode(self):
+        """Prueba codificar resultados y la máscara de errores."""
+        body = encode_float64(np.array([1.5, np.nan]), np.array([False, True]))
+        assert np.frombuffer(body[:16], dtype="<f8")[0] == 1.5
+        assert body[16:] == b"\x00\x01"
+
+
+class TestMessagePack:
+    """Tests para la decodificación MessagePack."""
+
+    def test_column_from_bin(self):
+        """Prueba leer una columna bin de float64."""
+        column = float64_column(np.array([1.0, 2.0], dtype="<f8").tobytes())
+        assert column.tolist() == [1.0, 2.0]
+
+    def test_column_from_list(self):
+        """Prueba leer una columna como lista."""
+        assert float64_column([1, 2]).tolist() == [1.0, 2.0]
+
+    @pytest.mark.parametrize("value", [b"\x00" * 7, "1,2", None])
+    def test_invalid_column(self, value):
+        """Prueba columnas inválidas."""
+        with pytest.raises(ValueError):
+            float64_column(value)
+
+    def test_unpack_requires_map(self):
+        """Prueba que el cuerpo debe ser un mapa."""
+        assert unpack(msgpack.packb({"a": 1})) == {"a": 1}
+        with pytest.raises(ValueError):
+            unpack(msgpack.packb([1, 2]))
+        with pytest.raises(ValueError):
+            unpack(b"\xc1")
+        with pytest.raises(ValueError, match="claves"):
+            unpack(msgpack.packb({b"num1": 2}, use_bin_type=True))
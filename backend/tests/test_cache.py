@@ -0,0 +1,76 @@
+"""
+Tests unitarios para la caché de resultados.
+Prueba aciertos, expiración por tiempo y descarte LRU.
+"""
+
+import pytest
+from app.cache import ResultCache
+
+
+class FakeClock:
+    """Reloj controlable para probar la expiración."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResultCache:
+    """Tests para la caché LRU con TTL."""
+
+    def test_miss_then_hit(self):
+        """Prueba un fallo seguido de un acierto."""
+        cache = ResultCache(max_entries=2)
+        assert cache.get("a") == (False, None)
+        cache.put("a", 1)
+        assert cache.get("a") == (True, 1)
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_expires_after_ttl(self):
+        """Prueba que las entradas expiren después del TTL."""
+        clock = FakeClock()
+        cache = ResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 10
+        assert cache.get("a") == (True, 1)
+        clock.now = 10.5
+        assert cache.get("a") == (False, None)
+        assert len(cache) == 0
+
+    def test_without_ttl_never_expires(self):
+        """Prueba que sin TTL las entradas no expiren."""
+        clock = FakeClock()
+        cache = ResultCache(max_entries=2, ttl_seconds=None, clock=clock)
+        cache.put("a", 1)
+        clock.now = 1e9
+        assert cache.get("a") == (True, 1)
+
+    def test_evicts_least_recently_used(self):
+        """Prueba que se descarte la entrada menos usada."""
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_clear(self):
+        """Prueba limpiar la caché y sus contadores."""
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
+
+    def test_invalid_max_entries(self):
+        """Prueba que una capacidad cero lance error."""
+        with pytest.raises(ValueError, match="al menos una entrada"):
+            ResultCache(max_entries=0)
@@ -4,7 +4,9 @@ Prueba operaciones simples, en cadena e historial.
 """
 
 import pytest
+from app.cache import ResultCache
 from app.calculator import Calculator
+from app.history import RingBufferHistory
 
 
 class TestCalculatorBasicOperations:
@@ -42,7 +44,7 @@ class TestCalculatorBasicOperations:
     def test_calculate_invalid_operator(self):
         """Prueba que operador inválido lance error."""
         with pytest.raises(ValueError, match="Operación no soportada"):
-            self.calculator.calculate(10, 5, "%")
+            self.calculator.calculate(10, 5, "&")
 
 
 class TestCalculatorChainOperations:
@@ -108,6 +110,197 @@ class TestCalculatorChainOperations:
         with pytest.raises(ValueError, match="No se puede dividir por cero"):
             self.calculator.calculate_chain(operations)
 
+    def test_chain_compact(self):
+        """Prueba la cadena con arreglos paralelos y su historial."""
+        assert self.calculator.calculate_chain_compact(10, ["+", "*", "-"], [5, 2, 3]) == 27
+        assert [item["result"] for item in self.calculator.get_history()] == [15, 30, 27]
+
+    def test_chain_compact_length_mismatch(self):
+        """Prueba que los arreglos deben tener la misma longitud."""
+        with pytest.raises(ValueError, match="misma longitud"):
+            self.calculator.calculate_chain_compact(10, ["+", "*"], [5])
+
+    def test_chain_compact_empty(self):
+        """Prueba que se requiere al menos un paso."""
+        with pytest.raises(ValueError):
+            self.calculator.calculate_chain_compact(10, [], [])
+
+
+class TestCalculatorResultCache:
+    """Tests para la caché de resultados de la calculadora."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.cache = ResultCache(max_entries=16)
+        self.calculator = Calculator(result_cache=self.cache, cache_records_history=True)
+
+    def test_repeated_calculation_hits_cache(self):
+        """Prueba que un cálculo repetido se obtenga de la caché."""
+        assert self.calculator.calculate(10, 5, "+") == 15
+        assert self.calculator.calculate(10.0, 5.0, "+") == 15
+        assert self.cache.hits == 1
+        assert self.calculator.get_history_count() == 2
+
+    def test_cache_hits_can_skip_history(self):
+        """Prueba que los aciertos puedan omitir el historial."""
+        calculator = Calculator(result_cache=ResultCache(), cache_records_history=False)
+        calculator.calculate(10, 5, "+")
+        calculator.calculate(10, 5, "+")
+        assert calculator.get_history_count() == 1
+
+    def test_repeated_chain_hits_cache(self):
+        """Prueba que una cadena repetida se obtenga de la caché con sus pasos."""
+        operations = [{"num1": 10, "operator": "+", "num2": 5}, {"operator": "*", "num2": 2}]
+        assert self.calculator.calculate_chain(operations) == 30
+        assert self.calculator.calculate_chain(operations) == 30
+        assert self.cache.hits == 1
+        history = self.calculator.get_history()
+        assert len(history) == 4
+        assert history[2:] == history[:2]
+
+    def test_errors_are_not_cached(self):
+        """Prueba que los errores no se guarden en caché."""
+        with pytest.raises(ValueError):
+            self.calculator.calculate(1, 0, "/")
+        assert len(self.cache) == 0
+
+    def test_cache_stats(self):
+        """Prueba los contadores expuestos por la calculadora."""
+        self.calculator.calculate(1, 1, "+")
+        stats = self.calculator.get_cache_stats()
+        assert stats["enabled"] is True
+        assert stats["misses"] == 1
+
+    def test_cache_disabled_by_default(self):
+        """Prueba que la caché esté desactivada por defecto."""
+        assert Calculator().get_cache_stats() == {"enabled": False}
+
+
+class TestCalculatorCompiledChains:
+    """Tests para cadenas compiladas."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator()
+
+    def test_run_compiled_chain(self):
+        """Prueba ejecutar una cadena compilada con distintos números iniciales."""
+        operations = [{"num1": 10, "operator": "+", "num2": 5}, {"operator": "*", "num2": 2}]
+        compiled = self.calculator.compile_chain(operations)
+        assert self.calculator.run_compiled_chain(compiled, 10) == 30
+        assert self.calculator.run_compiled_chain(compiled, 1) == 12
+
+    def test_compiled_chain_single_history_entry(self):
+        """Prueba que cada ejecución compilada registre una sola entrada."""
+        operations = [{"operator": "+", "num2": 5}, {"operator": "*", "num2": 2}]
+        compiled = self.calculator.compile_chain(operations)
+        self.calculator.run_compiled_chain(compiled, 10)
+        assert self.calculator.get_history() == [
+            {"num1": 10, "num2": 2, "operator": "chain", "result": 30}
+        ]
+
+    def test_get_compiled_chain(self):
+        """Prueba recuperar una cadena compilada por identificador."""
+        compiled = self.calculator.compile_chain([{"operator": "-", "num2": 1}])
+        assert self.calculator.get_compiled_chain(compiled.chain_id) is compiled
+        assert self.calculator.get_compiled_chain("desconocido") is None
+
+
+class TestCalculatorExpressions:
+    """Tests para la evaluación de expresiones."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator()
+
+    def test_evaluate_expression(self):
+        """Prueba evaluar una expresión con precedencia y paréntesis."""
+        assert self.calculator.evaluate("(10 + 5) * 2 - 3") == 27
+        assert self.calculator.evaluate("10 + 5 * 2 - 3") == 17
+
+    def test_evaluate_with_variables(self):
+        """Prueba evaluar una expresión con variables."""
+        assert self.calculator.evaluate("x * 2", {"x": 21}) == 42
+
+    def test_evaluate_does_not_record_history(self):
+        """Prueba que evaluar no agregue entradas al historial."""
+        self.calculator.evaluate("1 + 1")
+        assert self.calculator.get_history_count() == 0
+
+
+class TestCalculatorTemplates:
+    """Tests para plantillas de fórmulas evaluadas sobre columnas."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator()
+
+    def test_evaluate_template(self):
+        """Prueba evaluar una plantilla sobre varias filas."""
+        _, template = self.calculator.register_template("price * qty - discount")
+        evaluated = self.calculator.evaluate_template(
+            template, {"price": [10, 2.5], "qty": [3, 4], "discount": [5, 0]}
+        )
+        assert evaluated == {"results": [25, 10], "errors": []}
+
+    def test_evaluate_template_errors_per_row(self):
+        """Prueba que los errores se reporten por fila."""
+        _, template = self.calculator.register_template("a / b")
+        evaluated = self.calculator.evaluate_template(template, {"a": [1, 2], "b": [0, 4]})
+        assert evaluated["results"] == [None, 0.5]
+        assert evaluated["errors"][0]["index"] == 0
+
+    def test_evaluate_template_missing_variable(self):
+        """Prueba que una variable sin columna lance error."""
+        _, template = self.calculator.register_template("a + b")
+        with pytest.raises(ValueError, match="Faltan valores para: b"):
+            self.calculator.evaluate_template(template, {"a": [1]})
+
+    def test_evaluate_template_length_mismatch(self):
+        """Prueba que columnas de distinta longitud lancen error."""
+        _, template = self.calculator.register_template("a + b")
+        with pytest.raises(ValueError, match="misma longitud"):
+            self.calculator.evaluate_template(template, {"a": [1, 2], "b": [1]})
+
+
+class TestCalculatorBatchOperations:
+    """Tests para operaciones en lote."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator()
+
+    def test_batch_mixed_operators(self):
+        """Prueba lote con operadores mezclados."""
+        batch = self.calculator.calculate_batch(
+            [10, 10, 10, 10], [5, 5, 5, 5], ["+", "-", "*", "/"]
+        )
+        assert batch["results"] == [15, 5, 50, 2]
+        assert batch["errors"] == []
+
+    def test_batch_division_by_zero_per_element(self):
+        """Prueba que la división por cero solo falle en su elemento."""
+        batch = self.calculator.calculate_batch([10, 1, 6], [2, 0, 3], ["/", "/", "*"])
+        assert batch["results"] == [5, None, 18]
+        assert batch["errors"] == [{"index": 1, "detail": "No se puede dividir por cero"}]
+
+    def test_batch_invalid_operator_per_element(self):
+        """Prueba que un operador inválido se reporte por elemento."""
+        batch = self.calculator.calculate_batch([1, 2], [1, 2], ["+", "&"])
+        assert batch["results"] == [2, None]
+        assert "Operación no soportada" in batch["errors"][0]["detail"]
+
+    def test_batch_length_mismatch(self):
+        """Prueba que arreglos de distinta longitud lancen error."""
+        with pytest.raises(ValueError, match="misma longitud"):
+            self.calculator.calculate_batch([1, 2], [1], ["+", "+"])
+
+    def test_batch_saves_successful_items_in_history(self):
+        """Prueba que solo los elementos exitosos se guarden en historial."""
+        self.calculator.calculate_batch([10, 1], [5, 0], ["+", "/"])
+        history = self.calculator.get_history()
+        assert history == [{"num1": 10, "num2": 5, "operator": "+", "result": 15}]
+
 
 class TestCalculatorHistory:
     """Tests para el historial de la calculadora."""
@@ -157,11 +350,103 @@ class TestCalculatorHistory:
         history = self.calculator.get_history()
         assert len(history) == 0
 
+    def test_history_is_bounded(self):
+        """Prueba que el historial respete la capacidad configurada."""
+        calculator = Calculator(history=RingBufferHistory(capacity=2))
+        for i in range(5):
+            calculator.calculate(i, 1, "+")
+        assert calculator.get_history_count() == 2
+        assert [item["num1"] for item in calculator.get_history()] == [3, 4]
+
+    def test_history_window(self):
+        """Prueba leer una ventana del historial."""
+        for i in range(5):
+            self.calculator.calculate(i, 1, "+")
+        history = self.calculator.get_history(offset=1, limit=2)
+        assert [item["num1"] for item in history] == [1, 2]
+
     def test_get_supported_operations(self):
         """Prueba obtener operaciones soportadas."""
         operations = self.calculator.get_supported_operations()
-        assert len(operations) == 4
+        assert len(operations) == 10
+        assert "root" in operations
         assert "+" in operations
         assert "-" in operations
         assert "*" in operations
         assert "/" in operations
+
+    def test_history_stats_count_errors(self):
+        """Prueba que las estadísticas cuenten las operaciones fallidas."""
+        calculator = Calculator(history=RingBufferHistory(capacity=2))
+        for i in range(3):
+            calculator.calculate(i, 1, "+")
+        with pytest.raises(ValueError):
+            calculator.calculate(1, 0, "/")
+        calculator.calculate_batch([1, 1], [0, 1], ["/", "/"])
+
+        stats = calculator.get_history_stats()
+        assert stats["count"] == 2
+        assert stats["operators"] == {"+": 1, "/": 1}
+        assert stats["min"] == 1
+        assert stats["max"] == 3
+        assert stats["recorded"] == 4
+        assert stats["errors"] == 2
+
+
+class TestCalculatorNumericModes:
+    """Tests para los modos numéricos de la calculadora."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator(history=RingBufferHistory(capacity=10))
+
+    def test_decimal_is_exact(self):
+        """Prueba que 0.1 + 0.2 sea exactamente 0.3 en modo decimal."""
+        result, exact = self.calculator.calculate_numeric(0.1, 0.2, "+", "decimal")
+        assert exact == "0.3"
+        assert result == 0.3
+
+    def test_fraction_chain(self):
+        """Prueba que la cadena mantenga la fracción exacta entre pasos."""
+        operations = [{"num1": 1, "operator": "/", "num2": 3}, {"operator": "*", "num2": 3}]
+        result, exact = self.calculator.calculate_chain_numeric(operations, "fraction")
+        assert exact == "1"
+        assert result == 1.0
+        history = self.calculator.get_history()
+        assert [item["result"] for item in history] == [pytest.approx(1 / 3), 1.0]
+
+    def test_division_by_zero(self):
+        """Prueba que la división por cero falle y cuente como error."""
+        with pytest.raises(ValueError, match="dividir por cero"):
+            self.calculator.calculate_numeric(1, 0, "/", "decimal")
+        assert self.calculator.get_history_stats()["errors"] == 1
+
+    def test_invalid_mode(self):
+        """Prueba que un modo desconocido lance error."""
+        with pytest.raises(ValueError, match="Modo numérico no soportado"):
+            self.calculator.calculate_numeric(1, 2, "+", "complex")
+
+
+class TestCalculatorReduce:
+    """Tests para las reducciones de la calculadora."""
+
+    def test_single_history_entry(self):
+        """Prueba que una reducción registre una sola entrada en el historial."""
+        calculator = Calculator(history=RingBufferHistory(capacity=10))
+        assert calculator.reduce([1.0, 2.0, 3.0, 4.0], "mean") == 2.5
+        assert calculator.get_history() == [
+            {"num1": 4.0, "num2": 0.0, "operator": "mean", "result": 2.5}
+        ]
+
+    def test_percentile_entry(self):
+        """Prueba que el percentil se registre como num2."""
+        calculator = Calculator(history=RingBufferHistory(capacity=10))
+        calculator.reduce([1.0, 2.0, 3.0], "percentile", percentile=50)
+        assert calculator.get_history()[0]["num2"] == 50.0
+
+    def test_invalid_reduction(self):
+        """Prueba que una reducción inválida lance error y no se registre."""
+        calculator = Calculator(history=RingBufferHistory(capacity=10))
+        with pytest.raises(ValueError, match="Reducción no soportada"):
+            calculator.reduce([1.0], "median")
+        assert calculator.get_history_count() == 0
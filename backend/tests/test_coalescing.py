@@ -0,0 +1,141 @@
+"""
+Tests unitarios para la coalescencia de peticiones (single-flight).
+Prueba que las peticiones concurrentes con la misma clave compartan un cálculo,
+la propagación de errores y la cancelación.
+"""
+
+import asyncio
+
+import pytest
+from app.coalescing import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests para SingleFlight."""
+
+    def test_concurrent_same_key_share(self):
+        """Prueba que las peticiones concurrentes con la misma clave compartan el cálculo."""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        async def scenario():
+            return await asyncio.gather(*(flight.run("k", compute) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert [result for result, _ in results] == [42] * 5
+        assert [shared for _, shared in results] == [False] + [True] * 4
+        assert flight.stats() == {
+            "in_flight": 0,
+            "leaders": 1,
+            "coalesced": 4,
+            "coalesced_rate": 0.8,
+        }
+
+    def test_different_keys_and_sequential(self):
+        """Prueba que otras claves y las peticiones posteriores calculen de nuevo."""
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0)
+            return 1
+
+        async def scenario():
+            await asyncio.gather(flight.run("a", compute), flight.run("b", compute))
+            await flight.run("a", compute)
+
+        asyncio.run(scenario())
+        assert flight.leaders == 3
+        assert flight.coalesced == 0
+
+    def test_error_propagates_to_all(self):
+        """Prueba que el error del cálculo llegue a todas las peticiones que lo esperan."""
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("División por cero no permitida")
+
+        async def scenario():
+            return await asyncio.gather(
+                *(flight.run("k", compute) for _ in range(3)), return_exceptions=True
+            )
+
+        errors = asyncio.run(scenario())
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert len(flight) == 0
+
+    def test_waiter_cancellation_keeps_flight(self):
+        """Prueba que cancelar una petición que espera no cancele el cálculo compartido."""
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        async def scenario():
+            leader = asyncio.create_task(flight.run("k", compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.run("k", compute))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            return await leader
+
+        assert asyncio.run(scenario()) == ("ok", False)
+
+    def test_leader_cancellation_keeps_flight(self):
+        """Prueba que cancelar la petición líder no cancele a las que esperan su cálculo."""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        async def scenario():
+            leader = asyncio.create_task(flight.run("k", compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(flight.run("k", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await waiter
+
+        # La petición que espera recibe el resultado y, como nadie más lo hizo, no es compartido
+        assert asyncio.run(scenario()) == ("ok", False)
+        assert len(calls) == 1
+        assert len(flight) == 0
+
+    def test_cancellation_of_all_cancels_compute(self):
+        """Prueba que el cálculo se cancele y la clave se libere si nadie lo espera."""
+        flight = SingleFlight()
+        cancelled = []
+
+        async def compute():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "ok"
+
+        async def scenario():
+            leader = asyncio.create_task(flight.run("k", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            assert len(flight) == 0
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        assert cancelled == [1]
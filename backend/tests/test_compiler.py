@@ -0,0 +1,141 @@
+"""
+Tests unitarios para la compilación de cadenas.
+Prueba el plegado de constantes, la ejecución y la caché por forma.
+"""
+
+import random
+
+import pytest
+from app.calculator import run_steps
+from app.compiler import ChainCompiler, fold_steps, parse_packed_chain
+
+
+class TestFoldSteps:
+    """Tests para el plegado de constantes."""
+
+    def test_fold_power_of_two_multiplications(self):
+        """Prueba que *2, *-4 se combine en *-8."""
+        assert fold_steps([("*", 2), ("*", -4)]) == [("*", -8)]
+
+    def test_fold_power_of_two_divisions(self):
+        """Prueba que /0.5, /0.25 se combine en /0.125."""
+        assert fold_steps([("/", 0.5), ("/", 0.25)]) == [("/", 0.125)]
+
+    @pytest.mark.parametrize(
+        "steps",
+        [
+            [("+", 1), ("+", 1)],
+            [("+", 5), ("-", 3)],
+            [("*", 3), ("*", 7)],
+            [("/", 3), ("/", 7)],
+            [("/", 2), ("/", 4)],
+            [("*", 0.5), ("*", 0.5)],
+            [("*", 2.0**600), ("*", 2.0**600)],
+            [("*", 2.0**600), ("*", 2.0**-600)],
+        ],
+    )
+    def test_does_not_fold_rounding_steps(self, steps):
+        """Prueba que no se combinen pasos que redondean o cuyo producto desborda."""
+        assert fold_steps(steps) == steps
+
+    def test_does_not_fold_mixed_operators(self):
+        """Prueba que no se combinen operadores distintos."""
+        steps = [("*", 2), ("/", 0.5), ("*", 2)]
+        assert fold_steps(steps) == steps
+
+    def test_folded_matches_sequential(self):
+        """Prueba con cadenas aleatorias que la cadena compilada coincida con run_steps."""
+        rng = random.Random(0)
+        constants = [1, 2, -2, 4, 0.5, 0.25, -0.5, 3, 7, 0.1, 1e16, 2.0**600, 2.0**-600, 0]
+        starts = [0.0, -0.0, 1.0, -3.5, 1e16, 1e308, -1e308, 5e-324, 7 * 5e-324, 2.2e-308]
+        compiler = ChainCompiler()
+        for _ in range(2_000):
+            steps = [(rng.choice("+-*/"), rng.choice(constants)) for _ in range(rng.randint(1, 6))]
+            compiled = compiler.compile([{"operator": op, "num2": n} for op, n in steps])
+            for num1 in starts:
+                expected, _, error = run_steps(num1, steps)
+                if error is not None:
+                    with pytest.raises(ValueError, match=error):
+                        compiled(num1)
+                    continue
+                result = compiled(num1)
+                assert repr(result) == repr(expected), (num1, steps, compiled.steps)
+
+
+class TestParsePackedChain:
+    """Tests para la cadena empaquetada."""
+
+    def test_parse(self):
+        """Prueba separar operadores y operandos."""
+        assert parse_packed_chain("+5*2-3") == (["+", "*", "-"], [5.0, 2.0, 3.0])
+
+    def test_signed_decimals_and_spaces(self):
+        """Prueba operandos con signo, decimales, exponentes y espacios."""
+        assert parse_packed_chain(" * -2.5 / .5 + 1e3 ") == (
+            ["*", "/", "+"],
+            [-2.5, 0.5, 1000.0],
+        )
+
+    def test_multi_character_operators(self):
+        """Prueba operadores de varios caracteres como // y root."""
+        assert parse_packed_chain("//2/2root3^2") == (
+            ["//", "/", "root", "^"],
+            [2.0, 2.0, 3.0, 2.0],
+        )
+
+    @pytest.mark.parametrize("chain", ["", "   ", "5+1", "+", "+5x", "+5 &2"])
+    def test_invalid(self, chain):
+        """Prueba cadenas inválidas."""
+        with pytest.raises(ValueError):
+            parse_packed_chain(chain)
+
+
+class TestChainCompiler:
+    """Tests para el compilador de cadenas."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.compiler = ChainCompiler(max_entries=2)
+
+    def test_compiled_chain_matches_sequential_result(self):
+        """Prueba ((10 + 5) * 2) - 3 = 27 con la cadena compilada."""
+        compiled = self.compiler.compile(
+            [
+                {"num1": 10, "operator": "+", "num2": 5},
+                {"operator": "*", "num2": 2},
+                {"operator": "-", "num2": 3},
+            ]
+        )
+        assert compiled(10) == 27
+        assert compiled(0) == 7
+
+    def test_same_shape_shares_compiled_chain(self):
+        """Prueba que cadenas con la misma forma compartan el programa."""
+        first = self.compiler.compile([{"num1": 1, "operator": "+", "num2": 5}])
+        second = self.compiler.compile([{"num1": 99, "operator": "+", "num2": 5}])
+        assert first is second
+        assert self.compiler.get(first.chain_id) is first
+
+    def test_cache_evicts_least_recently_used(self):
+        """Prueba que la caché descarte la cadena menos usada."""
+        first = self.compiler.compile([{"operator": "+", "num2": 1}])
+        self.compiler.compile([{"operator": "+", "num2": 2}])
+        self.compiler.compile([{"operator": "+", "num2": 3}])
+        assert len(self.compiler) == 2
+        assert self.compiler.get(first.chain_id) is None
+
+    def test_division_by_zero_at_runtime(self):
+        """Prueba que la división por cero falle al ejecutar."""
+        compiled = self.compiler.compile([{"operator": "/", "num2": 0}])
+        with pytest.raises(ValueError, match="No se puede dividir por cero"):
+            compiled(10)
+
+    def test_empty_chain(self):
+        """Prueba que una cadena vacía lance error."""
+        with pytest.raises(ValueError, match="Se requiere al menos una operación"):
+            self.compiler.compile([])
+
+    def test_invalid_operator(self):
+        """Prueba que un operador inválido lance error."""
+        with pytest.raises(ValueError, match="Operación no soportada"):
+            self.compiler.compile([{"operator": "&", "num2": 1}])
@@ -0,0 +1,278 @@
+"""
+Tests unitarios para el pool de procesos.
+Prueba que las peticiones grandes den el mismo resultado en el pool que en línea,
+el reparto por bloques, los errores y los contadores de cola y utilización.
+"""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from app.cache import ResultCache
+from app.calculator import Calculator
+from app.coalescing import SingleFlight
+from app.config import settings
+from app.executor import OffloadExecutor
+from app.history import RingBufferHistory
+
+
+@pytest.fixture(scope="module")
+def executor():
+    """Fixture de un pool de dos workers con umbral y bloques pequeños."""
+    pool = OffloadExecutor(workers=2, threshold=4, chunk_size=3)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def calculator(executor):
+    """Fixture de una calculadora que usa el pool."""
+    return Calculator(history=RingBufferHistory(100), executor=executor)
+
+
+def run(coroutine):
+    """Ejecuta una corrutina en un event loop nuevo."""
+    return asyncio.run(coroutine)
+
+
+class TestOffloadExecutor:
+    """Tests para OffloadExecutor."""
+
+    def test_invalid_configuration(self):
+        """Prueba rechazar una configuración inválida."""
+        with pytest.raises(ValueError):
+            OffloadExecutor(workers=-1)
+        with pytest.raises(ValueError):
+            OffloadExecutor(threshold=0)
+
+    def test_not_started(self):
+        """Prueba que sin iniciar todo se ejecute en línea."""
+        pool = OffloadExecutor(workers=1, threshold=1)
+        assert pool.offloads(100) is False
+        assert pool.stats()["running"] is False
+        with pytest.raises(RuntimeError):
+            run(pool.run(abs, -1))
+
+    def test_run_and_error(self, executor):
+        """Prueba ejecutar en un worker y reenviar los ValueError."""
+        assert run(executor.run(abs, -3)) == 3
+        with pytest.raises(ValueError, match="could not convert"):
+            run(executor.run(float, "x"))
+
+    def test_map_chunks(self, executor):
+        """Prueba repartir columnas en bloques con su índice inicial."""
+        parts = run(executor.map_chunks(np.sum, (np.arange(8),)))
+        assert [offset for offset, _ in parts] == [0, 3, 6]
+        assert [int(total) for _, total in parts] == [3, 12, 13]
+
+    def test_stats(self, executor):
+        """Prueba los contadores de cola y utilización."""
+        run(executor.run(abs, -1))
+        stats = executor.stats()
+        assert stats["running"] is True
+        assert stats["workers"] == 2
+        assert stats["pending"] == stats["queued"] == 0
+        assert stats["completed"] >= 1
+        assert 0.0 <= stats["utilization"] <= 1.0
+
+    def test_broken_pool_restarts_in_background(self):
+        """Prueba que tras la caída de un worker el pool se recree sin bloquear el loop."""
+        pool = OffloadExecutor(workers=1, threshold=1)
+        pool.start()
+        try:
+            with pytest.raises(BrokenProcessPool):
+                run(pool.run(os._exit, 1))
+            # Mientras se recrea, las peticiones se ejecutan en línea
+            assert pool._restarting is not None
+            pool._restarting.join(timeout=30)
+            assert pool.running
+            assert run(pool.run(abs, -2)) == 2
+            assert pool.stats()["restarts"] == 1
+        finally:
+            pool.shutdown()
+
+    def test_failed_restart_is_retried(self, monkeypatch, caplog):
+        """Prueba que un error al recrear el pool se registre y se reintente."""
+        pool = OffloadExecutor(workers=1, threshold=1, restart_delay=0.01)
+        pool.start()
+        spawn = pool._spawn
+        attempts = []
+
+        def flaky_spawn():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("sin recursos")
+            return spawn()
+
+        monkeypatch.setattr(pool, "_spawn", flaky_spawn)
+        try:
+            with pytest.raises(BrokenProcessPool):
+                run(pool.run(os._exit, 1))
+            pool._restarting.join(timeout=30)
+            assert len(attempts) == 2
+            assert pool.running
+            assert pool.stats()["restart_errors"] == 1
+            assert "No se pudo recrear el pool" in caplog.text
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_stops_restart_retries(self, monkeypatch):
+        """Prueba que el shutdown detenga los reintentos de recreación."""
+        pool = OffloadExecutor(workers=1, threshold=1, restart_delay=60)
+        pool.start()
+
+        def failing_spawn():
+            raise OSError("sin recursos")
+
+        monkeypatch.setattr(pool, "_spawn", failing_spawn)
+        with pytest.raises(BrokenProcessPool):
+            run(pool.run(os._exit, 1))
+        pool.shutdown()
+        pool._restarting.join(timeout=5)
+        assert not pool._restarting.is_alive()
+        assert not pool.running
+
+
+class TestCalculatorOffload:
+    """Tests para los métodos async de la calculadora con el pool."""
+
+    def test_small_request_inline(self, calculator, executor):
+        """Prueba que una petición bajo el umbral no vaya al pool."""
+        offloaded = executor.offloaded
+        result = run(calculator.calculate_chain_async([{"num1": 1, "operator": "+", "num2": 2}]))
+        assert result == 3
+        assert executor.offloaded == offloaded
+
+    def test_batch_matches_inline(self, calculator, executor):
+        """Prueba que un lote repartido en bloques coincida con el cálculo en línea."""
+        num1 = [1, 2, 3, 4, 5, 6, 7]
+        num2 = [1, 0, 2, 0, 3, 1, 2]
+        operators = ["+", "/", "*", "/", "^", "&", "-"]
+        offloaded = executor.offloaded
+
+        batch = run(calculator.calculate_batch_async(num1, num2, operators))
+
+        assert executor.offloaded == offloaded + 1
+        assert batch == Calculator(history=RingBufferHistory(100)).calculate_batch(
+            num1, num2, operators
+        )
+        assert [error["index"] for error in batch["errors"]] == [1, 3, 5]
+        assert calculator.get_history_count() == 4
+
+    def test_chain(self, calculator):
+        """Prueba una cadena larga en el pool, con historial en este proceso."""
+        steps = [("+", 1.0)] * 10
+        assert run(calculator.calculate_chain_compact_async(0.0, *zip(*steps))) == 10.0
+        assert calculator.get_history_count() == 10
+
+    def test_chain_cached(self, executor):
+        """Prueba que una cadena del pool se guarde en la caché de este proceso."""
+        calculator = Calculator(
+            history=RingBufferHistory(100),
+            result_cache=ResultCache(10, None),
+            cache_records_history=True,
+            executor=executor,
+        )
+        operators, operands = ["*"] * 5, [2.0] * 5
+        assert run(calculator.calculate_chain_compact_async(1.0, operators, operands)) == 32.0
+        completed = executor.completed
+        assert calculator.calculate_chain_compact(1.0, operators, operands) == 32.0
+        assert executor.completed == completed
+        assert calculator.get_cache_stats()["hits"] == 1
+        assert calculator.get_history_count() == 10
+        assert calculator.get_history()[-1]["result"] == 32.0
+
+    def test_chain_error_records_previous_steps(self, calculator):
+        """Prueba que un error en el pool registre los pasos previos."""
+        operations = [{"num1": 8, "operator": "+", "num2": 2}] + [{"operator": "/", "num2": 0}] * 4
+        with pytest.raises(ValueError, match="cero"):
+            run(calculator.calculate_chain_async(operations))
+        assert calculator.get_history_count() == 1
+        assert calculator.get_history_stats()["errors"] == 1
+
+    @pytest.mark.parametrize(
+        "operation, percentile", [("sum", None), ("variance", None), ("percentile", 90)]
+    )
+    def test_reduce_matches_inline(self, calculator, operation, percentile):
+        """Prueba que la reducción en el pool coincida con la reducción en línea."""
+        values = np.random.default_rng(3).normal(50.0, 5.0, size=10).tolist()
+        expected = Calculator(history=RingBufferHistory(10)).reduce(values, operation, percentile)
+        result = run(calculator.reduce_async(values, operation, percentile))
+        assert result == pytest.approx(expected, rel=1e-12)
+        assert calculator.get_history()[-1]["operator"] == operation
+
+    def test_reduce_error(self, calculator):
+        """Prueba los errores de validación y de los workers en una reducción."""
+        with pytest.raises(ValueError, match="no soportada"):
+            run(calculator.reduce_async([1.0] * 5, "median"))
+        with pytest.raises(ValueError, match="finitos"):
+            run(calculator.reduce_async([1.0, 2.0, 3.0, float("nan"), 4.0], "sum"))
+        assert calculator.get_history_stats()["errors"] == 2
+
+
+class TestCalculatorCoalescing:
+    """Tests para la coalescencia de cadenas idénticas en el pool."""
+
+    def run_concurrently(self, calculator, operations, times=4):
+        """Ejecuta la misma cadena varias veces de forma concurrente."""
+
+        async def scenario():
+            return await asyncio.gather(
+                *(calculator.calculate_chain_async(operations) for _ in range(times)),
+                return_exceptions=True,
+            )
+
+        return run(scenario())
+
+    @pytest.mark.parametrize("records_history, entries", [(True, 20), (False, 5)])
+    def test_identical_chains_share_computation(self, executor, records_history, entries):
+        """Prueba que las cadenas idénticas en curso se calculen una vez en el pool."""
+        calculator = Calculator(
+            history=RingBufferHistory(100),
+            executor=executor,
+            single_flight=SingleFlight(),
+            coalesced_records_history=records_history,
+        )
+        operations = [{"num1": 1, "operator": "+", "num2": 1}] + [{"operator": "*", "num2": 2}] * 4
+        completed = executor.completed
+
+        assert self.run_concurrently(calculator, operations) == [32.0] * 4
+        assert executor.completed == completed + 1
+        assert calculator.get_coalescing_stats()["coalesced"] == 3
+        assert calculator.get_history_count() == entries
+
+    def test_shared_error(self, executor):
+        """Prueba que el error del cálculo compartido llegue a cada petición."""
+        calculator = Calculator(
+            history=RingBufferHistory(100), executor=executor, single_flight=SingleFlight()
+        )
+        operations = [{"num1": 1, "operator": "+", "num2": 1}] + [{"operator": "/", "num2": 0}] * 4
+
+        errors = self.run_concurrently(calculator, operations, times=3)
+
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert calculator.get_history_count() == 3
+        assert calculator.get_history_stats()["errors"] == 3
+
+    def test_disabled_by_default(self, calculator):
+        """Prueba que sin configuración no se coalescan cadenas."""
+        assert calculator.get_coalescing_stats() == {"enabled": False}
+
+    def test_requires_executor(self, monkeypatch):
+        """Prueba que activar la coalescencia sin pool de procesos se rechace al iniciar."""
+        monkeypatch.setattr(settings, "coalescing_enabled", True)
+        with pytest.raises(ValueError, match="pool de procesos"):
+            Calculator(history=RingBufferHistory(10))
+
+    def test_inactive_without_running_pool(self):
+        """Prueba que las estadísticas indiquen si la coalescencia puede aplicarse."""
+        calculator = Calculator(history=RingBufferHistory(10), single_flight=SingleFlight())
+        assert calculator.get_coalescing_stats()["active"] is False
+        pool = OffloadExecutor(workers=1)
+        calculator = Calculator(
+            history=RingBufferHistory(10), executor=pool, single_flight=SingleFlight()
+        )
+        assert calculator.get_coalescing_stats()["active"] is False
@@ -0,0 +1,199 @@
+"""
+Tests unitarios para el análisis y la evaluación de expresiones.
+Prueba precedencia, paréntesis, variables, plegado de constantes y la caché.
+"""
+
+import numpy as np
+import pytest
+from app.expressions import (
+    BinaryOp,
+    CompiledExpression,
+    ExpressionCache,
+    Number,
+    TemplateRegistry,
+    parse,
+    tokenize,
+)
+
+
+def evaluate(expression, **bindings):
+    return CompiledExpression(expression).evaluate(bindings)
+
+
+class TestParser:
+    """Tests para el analizador de expresiones."""
+
+    def test_tokenize(self):
+        """Prueba la división en tokens."""
+        assert tokenize("2.5*(x - 1e3)") == [
+            ("number", "2.5"),
+            ("op", "*"),
+            ("op", "("),
+            ("name", "x"),
+            ("op", "-"),
+            ("number", "1e3"),
+            ("op", ")"),
+        ]
+
+    def test_precedence(self):
+        """Prueba que * tenga mayor precedencia que +."""
+        node = parse("1 + 2 * 3")
+        assert isinstance(node, BinaryOp)
+        assert node.operator == "+"
+        assert isinstance(node.left, Number)
+        assert node.right.operator == "*"
+
+    def test_invalid_character(self):
+        """Prueba que un carácter no válido lance error."""
+        with pytest.raises(ValueError, match="Carácter no válido"):
+            parse("2 $ 3")
+
+    def test_unbalanced_parenthesis(self):
+        """Prueba que un paréntesis sin cerrar lance error."""
+        with pytest.raises(ValueError, match="Falta cerrar un paréntesis"):
+            parse("(1 + 2")
+
+    def test_empty_expression(self):
+        """Prueba que una expresión vacía lance error."""
+        with pytest.raises(ValueError, match="vacía"):
+            parse("   ")
+
+    def test_trailing_tokens(self):
+        """Prueba que tokens sobrantes lancen error."""
+        with pytest.raises(ValueError, match="Token inesperado"):
+            parse("1 2")
+
+    def test_too_deep(self):
+        """Prueba que una expresión demasiado anidada lance error."""
+        with pytest.raises(ValueError, match="demasiado anidada"):
+            parse("(" * 5000 + "1" + ")" * 5000)
+
+
+class TestCompiledExpression:
+    """Tests para la evaluación de expresiones compiladas."""
+
+    def test_parentheses_and_precedence(self):
+        """Prueba (10 + 5) * 2 - 3 = 27."""
+        assert evaluate("(10 + 5) * 2 - 3") == 27
+
+    def test_left_associativity(self):
+        """Prueba que - y / asocien por la izquierda."""
+        assert evaluate("10 - 2 - 3") == 5
+        assert evaluate("8 / 2 / 2") == 2
+
+    def test_extended_operators(self):
+        """Prueba //, % y ^ (que asocia por la derecha y tiene mayor precedencia)."""
+        assert evaluate("2 ^ 3 ^ 2") == 512
+        assert evaluate("1 + 2 ^ 3 * 2") == 17
+        assert evaluate("17 // 5 + 17 % 5") == 5
+
+    def test_unary_minus_and_power(self):
+        """Prueba que el signo unario se aplique después de ^ (como ** en Python)."""
+        assert evaluate("-2 ^ 2") == -4
+        assert evaluate("(-2) ^ 2") == 4
+        assert evaluate("2 ^ -1") == 0.5
+        assert evaluate("2 ^ -3 ^ 2") == 2**-9
+        assert evaluate("-2 ^ 2 * 3") == -12
+        assert evaluate("- -2 ^ 2") == 4
+
+    def test_unary_minus(self):
+        """Prueba la negación unaria."""
+        assert evaluate("-2 * -3") == 6
+        assert evaluate("-(x + 1)", x=4) == -5
+
+    def test_variables(self):
+        """Prueba evaluar con distintos valores de variables."""
+        compiled = CompiledExpression("price * qty - discount")
+        assert compiled.variables == {"price", "qty", "discount"}
+        assert compiled.evaluate({"price": 10, "qty": 3, "discount": 5}) == 25
+        assert compiled.evaluate({"price": 2, "qty": 2, "discount": 0}) == 4
+
+    def test_missing_variable(self):
+        """Prueba que una variable sin valor lance error."""
+        with pytest.raises(ValueError, match="Variable sin valor: x"):
+            evaluate("x + 1")
+
+    def test_division_by_zero(self):
+        """Prueba que la división por cero lance error al evaluar."""
+        compiled = CompiledExpression("1 / (x - x)")
+        with pytest.raises(ValueError, match="No se puede dividir por cero"):
+            compiled.evaluate({"x": 3})
+
+    def test_constant_division_by_zero_reported_on_evaluate(self):
+        """Prueba que 1/0 constante compile y falle al evaluar."""
+        compiled = CompiledExpression("1 / 0 + x")
+        with pytest.raises(ValueError, match="No se puede dividir por cero"):
+            compiled.evaluate({"x": 1})
+
+
+class TestExpressionCache:
+    """Tests para la caché de expresiones."""
+
+    def test_reuses_compiled_expression(self):
+        """Prueba que la misma expresión se analice una sola vez."""
+        cache = ExpressionCache(max_entries=2)
+        assert cache.get("x + 1") is cache.get("x + 1")
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self):
+        """Prueba que se descarte la expresión menos usada."""
+        cache = ExpressionCache(max_entries=2)
+        first = cache.get("1")
+        cache.get("2")
+        cache.get("3")
+        assert len(cache) == 2
+        assert cache.get("1") is not first
+
+
+class TestVectorEvaluation:
+    """Tests para la evaluación vectorizada de expresiones."""
+
+    def test_matches_scalar_evaluation(self):
+        """Prueba que la versión vectorizada coincida con la escalar."""
+        compiled = CompiledExpression("-(price * qty) + discount / 2")
+        price, qty, discount = [10.0, 2.5, -1.0], [3.0, 4.0, 7.0], [5.0, 0.0, 2.0]
+        columns = {
+            "price": np.array(price),
+            "qty": np.array(qty),
+            "discount": np.array(discount),
+        }
+        results, errors = compiled.evaluate_vector(columns, 3)
+        expected = [
+            compiled.evaluate({"price": p, "qty": q, "discount": d})
+            for p, q, d in zip(price, qty, discount)
+        ]
+        assert results.tolist() == expected
+        assert errors.as_list() == []
+
+    def test_errors_per_element(self):
+        """Prueba que la división por cero se reporte solo en su fila."""
+        compiled = CompiledExpression("a / b + 1")
+        results, errors = compiled.evaluate_vector(
+            {"a": np.array([4.0, 1.0]), "b": np.array([2.0, 0.0])}, 2
+        )
+        assert results[0] == 3
+        assert errors.as_list() == [{"index": 1, "detail": "No se puede dividir por cero"}]
+
+
+class TestTemplateRegistry:
+    """Tests para el registro de plantillas."""
+
+    def test_same_expression_same_id(self):
+        """Prueba que la misma fórmula retorne la misma plantilla."""
+        registry = TemplateRegistry()
+        first_id, first = registry.register("x * 2")
+        second_id, second = registry.register("x * 2")
+        assert first_id == second_id
+        assert first is second
+        assert registry.get(first_id) is first
+
+    def test_unknown_template(self):
+        """Prueba que un identificador desconocido retorne None."""
+        assert TemplateRegistry().get("desconocido") is None
+
+    def test_evicts_least_recently_used(self):
+        """Prueba que se descarte la plantilla menos usada."""
+        registry = TemplateRegistry(max_entries=1)
+        first_id, _ = registry.register("x")
+        registry.register("y")
+        assert registry.get(first_id) is None
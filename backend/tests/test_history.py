@@ -0,0 +1,541 @@
+"""
+Tests unitarios para el almacenamiento del historial.
+Prueba el buffer circular, la paginación y el descarte de operaciones antiguas.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import Settings
+from app.history import (
+    ClientHistoryMiddleware,
+    FileHistoryStore,
+    PartitionedHistory,
+    RingBufferHistory,
+    SQLiteHistoryStore,
+    create_history_store,
+    current_client,
+)
+
+
+class TestRingBufferHistory:
+    """Tests para el historial en buffer circular."""
+
+    def test_starts_empty(self):
+        """Prueba que el historial inicie vacío."""
+        history = RingBufferHistory(capacity=3)
+        assert len(history) == 0
+        assert history.get_page() == []
+
+    def test_append_and_read(self):
+        """Prueba agregar y leer una operación."""
+        history = RingBufferHistory(capacity=3)
+        history.append(10, 5, "+", 15)
+        assert history.get_page() == [{"num1": 10, "num2": 5, "operator": "+", "result": 15}]
+
+    def test_evicts_oldest_when_full(self):
+        """Prueba que al llenarse se descarte la operación más antigua."""
+        history = RingBufferHistory(capacity=3)
+        for i in range(5):
+            history.append(i, 1, "+", i + 1)
+        assert len(history) == 3
+        assert [item["num1"] for item in history.get_page()] == [2, 3, 4]
+
+    def test_get_page_window(self):
+        """Prueba la lectura paginada con offset y limit."""
+        history = RingBufferHistory(capacity=10)
+        for i in range(6):
+            history.append(i, 1, "*", i)
+        page = history.get_page(offset=2, limit=3)
+        assert [item["num1"] for item in page] == [2, 3, 4]
+        assert history.get_page(offset=6) == []
+
+    def test_extend_columns(self):
+        """Prueba agregar varias operaciones en columnas."""
+        history = RingBufferHistory(capacity=10)
+        history.append(1, 1, "+", 2)
+        history.extend([4, 6], [2, 3], ["/", "-"], [2, 3])
+        assert history.get_page() == [
+            {"num1": 1, "num2": 1, "operator": "+", "result": 2},
+            {"num1": 4, "num2": 2, "operator": "/", "result": 2},
+            {"num1": 6, "num2": 3, "operator": "-", "result": 3},
+        ]
+
+    def test_extend_larger_than_capacity(self):
+        """Prueba que extender más allá de la capacidad conserve las últimas."""
+        history = RingBufferHistory(capacity=4)
+        history.append(100, 1, "+", 101)
+        history.extend(list(range(7)), [0] * 7, ["+"] * 7, list(range(7)))
+        assert len(history) == 4
+        assert [item["num1"] for item in history.get_page()] == [3, 4, 5, 6]
+
+    def test_extend_wraps_around(self):
+        """Prueba extender cuando el buffer ya dio la vuelta."""
+        history = RingBufferHistory(capacity=4)
+        for i in range(3):
+            history.append(i, 0, "+", i)
+        history.extend([3, 4], [0, 0], ["+", "+"], [3, 4])
+        assert [item["num1"] for item in history.get_page()] == [1, 2, 3, 4]
+
+    def test_clear(self):
+        """Prueba limpiar el historial."""
+        history = RingBufferHistory(capacity=3)
+        history.append(1, 1, "+", 2)
+        history.clear()
+        assert len(history) == 0
+
+    def test_invalid_capacity(self):
+        """Prueba que capacidad cero lance error."""
+        with pytest.raises(ValueError, match="capacidad"):
+            RingBufferHistory(capacity=0)
+
+
+class TestHistoryQuery:
+    """Tests para los filtros del historial en cada backend."""
+
+    @pytest.fixture(params=["memory", "sqlite", "file"])
+    def history(self, request, tmp_path):
+        """Historial de capacidad 5 con 6 operaciones registradas en instantes 1000..1005."""
+        self.now = 1000.0
+
+        def clock():
+            return self.now
+
+        if request.param == "memory":
+            store = RingBufferHistory(capacity=5, clock=clock)
+        elif request.param == "sqlite":
+            store = SQLiteHistoryStore(str(tmp_path / "history.db"), capacity=5, clock=clock)
+        else:
+            store = FileHistoryStore(str(tmp_path / "history.log"), capacity=5, wall_clock=clock)
+        for i in range(6):
+            self.now = 1000.0 + i
+            store.append(i, 1, "+" if i % 2 else "*", i * 10)
+        yield store
+        store.close()
+
+    def test_without_filters(self, history):
+        """Prueba que sin filtros se retorne la página normal."""
+        page, total = history.query(1, 2)
+        assert total == 5
+        assert [item["num1"] for item in page] == [2, 3]
+
+    def test_operator(self, history):
+        """Prueba filtrar por operador después de descartar las antiguas."""
+        page, total = history.query(operator="*")
+        assert total == 2
+        assert [item["num1"] for item in page] == [2, 4]
+
+    def test_unknown_operator(self, history):
+        """Prueba que un operador nunca registrado no tenga coincidencias."""
+        assert history.query(operator="&") == ([], 0)
+
+    def test_result_range_with_pagination(self, history):
+        """Prueba filtrar por rango de resultado y paginar las coincidencias."""
+        page, total = history.query(1, 1, min_result=20, max_result=40)
+        assert total == 3
+        assert [item["result"] for item in page] == [30]
+
+    def test_time_window(self, history):
+        """Prueba filtrar por ventana de tiempo."""
+        page, total = history.query(since=1002, until=1003)
+        assert total == 2
+        assert [item["num1"] for item in page] == [2, 3]
+
+    def test_extend_records_time(self, history):
+        """Prueba que extend registre el instante de las operaciones."""
+        self.now = 2000.0
+        history.extend([7, 8], [1, 1], ["+", "+"], [70, 80])
+        page, total = history.query(since=2000)
+        assert total == 2
+        assert [item["num1"] for item in page] == [7, 8]
+
+
+class TestPartitionedHistory:
+    """Tests para el historial aislado por cliente."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.history = PartitionedHistory(lambda: RingBufferHistory(10), max_partitions=2)
+
+    def as_client(self, client, function, *args):
+        token = current_client.set(client)
+        try:
+            return function(*args)
+        finally:
+            current_client.reset(token)
+
+    def test_isolated_clients(self):
+        """Prueba que cada cliente vea y limpie solo su historial."""
+        self.as_client("a", self.history.append, 1, 1, "+", 2)
+        self.as_client("b", self.history.extend, [5, 6], [1, 1], ["*", "*"], [5, 6])
+        assert self.as_client("a", len, self.history) == 1
+        assert [item["num1"] for item in self.as_client("b", self.history.get_page)] == [5, 6]
+        assert self.as_client("c", self.history.get_page) == []
+        assert self.as_client("c", self.history.query) == ([], 0)
+
+        self.as_client("a", self.history.clear)
+        assert self.as_client("a", len, self.history) == 0
+        assert self.as_client("b", len, self.history) == 2
+
+    def test_reads_do_not_create_partitions(self):
+        """Prueba que leer no cree particiones."""
+        self.as_client("x", self.history.get_page)
+        self.as_client("x", len, self.history)
+        assert self.history.partitions() == 0
+
+    def test_evicts_least_recent_partition(self):
+        """Prueba que se descarte la partición usada hace más tiempo."""
+        for client in ("a", "b"):
+            self.as_client(client, self.history.append, 1, 1, "+", 2)
+        self.as_client("a", len, self.history)
+        self.as_client("c", self.history.append, 1, 1, "+", 2)
+        assert self.history.partitions() == 2
+        assert self.as_client("b", len, self.history) == 0
+        assert self.as_client("a", len, self.history) == 1
+
+    def test_middleware_sets_client(self):
+        """Prueba que el middleware tome la clave de cliente del header."""
+        app = FastAPI()
+        app.add_middleware(ClientHistoryMiddleware, header="X-Client-Id")
+
+        @app.get("/client")
+        async def client():
+            return {"client": current_client.get()}
+
+        test_client = TestClient(app)
+        response = test_client.get("/client", headers={"X-Client-Id": "abc"})
+        assert response.json() == {"client": "abc"}
+        assert test_client.get("/client").json() == {"client": ""}
+
+
+class TestSQLiteHistoryStore:
+    """Tests para el historial compartido en SQLite."""
+
+    def make_store(self, tmp_path, capacity=10):
+        return SQLiteHistoryStore(str(tmp_path / "history.db"), capacity=capacity)
+
+    def test_append_and_read(self, tmp_path):
+        """Prueba agregar y leer una operación."""
+        store = self.make_store(tmp_path)
+        store.append(10, 5, "+", 15)
+        assert len(store) == 1
+        assert store.get_page() == [{"num1": 10, "num2": 5, "operator": "+", "result": 15}]
+
+    def test_uses_wal_mode(self, tmp_path):
+        """Prueba que la base de datos use el modo WAL."""
+        store = self.make_store(tmp_path)
+        mode = store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_window_respects_capacity(self, tmp_path):
+        """Prueba que solo sean visibles las últimas `capacity` operaciones."""
+        store = self.make_store(tmp_path, capacity=3)
+        for i in range(5):
+            store.append(i, 1, "+", i + 1)
+        assert len(store) == 3
+        assert [item["num1"] for item in store.get_page()] == [2, 3, 4]
+        assert [item["num1"] for item in store.get_page(offset=1, limit=1)] == [3]
+
+    def test_extend(self, tmp_path):
+        """Prueba agregar varias operaciones en columnas."""
+        store = self.make_store(tmp_path)
+        store.extend([4, 6], [2, 3], ["/", "-"], [2, 3])
+        assert [item["operator"] for item in store.get_page()] == ["/", "-"]
+
+    def test_shared_between_instances(self, tmp_path):
+        """Prueba que dos instancias (como dos workers) compartan el historial."""
+        first = self.make_store(tmp_path)
+        second = self.make_store(tmp_path)
+        first.append(1, 1, "+", 2)
+        first.flush()
+        assert len(second) == 1
+        second.clear()
+        assert len(first) == 0
+
+    def test_prune_removes_old_rows(self, tmp_path):
+        """Prueba que las filas fuera de la ventana se eliminen."""
+        store = self.make_store(tmp_path, capacity=2)
+        store.extend(list(range(300)), [0] * 300, ["+"] * 300, list(range(300)))
+        store.append(300, 0, "+", 300)
+        store.flush()
+        rows = store._connect().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        assert rows <= 2 + SQLiteHistoryStore.PRUNE_INTERVAL
+        assert [item["num1"] for item in store.get_page()] == [299, 300]
+
+    def test_writes_in_background_while_locked(self, tmp_path):
+        """Prueba que append no espere el lock de la base y el lote se escriba al liberarse."""
+        store = self.make_store(tmp_path)
+        other = self.make_store(tmp_path)
+        blocker = sqlite3.connect(str(tmp_path / "history.db"), isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        start = time.perf_counter()
+        store.append(1, 1, "+", 2)
+        store.extend([2, 3], [1, 1], ["+", "+"], [3, 4])
+        assert time.perf_counter() - start < SQLiteHistoryStore.BUSY_TIMEOUT
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+        deadline = time.monotonic() + 5
+        while len(other) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [item["num1"] for item in other.get_page()] == [1, 2, 3]
+        store.close()
+        other.close()
+
+    def test_adds_time_column_to_existing_database(self, tmp_path):
+        """Prueba abrir una base creada sin la columna del instante."""
+        path = str(tmp_path / "history.db")
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "num1 REAL NOT NULL, num2 REAL NOT NULL, operator TEXT NOT NULL, result REAL NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO history (num1, num2, operator, result) VALUES (1, 1, '+', 2)"
+        )
+        connection.commit()
+        connection.close()
+
+        store = SQLiteHistoryStore(path, clock=lambda: 5000.0)
+        store.append(2, 1, "+", 3)
+        assert store.query(since=5000) == (
+            [{"num1": 2, "num2": 1, "operator": "+", "result": 3}],
+            1,
+        )
+        assert store.query(operator="+")[1] == 2
+        store.close()
+
+    def test_writer_survives_unexpected_errors(self, tmp_path):
+        """Prueba que un error inesperado no detenga el hilo escritor."""
+        store = self.make_store(tmp_path)
+        write_queue = store._write_queue
+        failures = []
+
+        def failing_write_queue():
+            if not failures:
+                failures.append(1)
+                raise RuntimeError("disco no disponible")
+            write_queue()
+
+        store._write_queue = failing_write_queue
+        store.append(1, 1, "+", 2)
+        deadline = time.monotonic() + 5
+        while store._queue and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert failures == [1]
+        store.append(2, 1, "+", 3)
+        store.flush()
+        assert [item["num1"] for item in store.get_page()] == [1, 2]
+        store.close()
+
+    def test_clear_retries_while_locked(self, tmp_path):
+        """Prueba que clear reintente mientras otro proceso tiene la base ocupada."""
+        store = self.make_store(tmp_path)
+        store.append(1, 1, "+", 2)
+        store.flush()
+        blocker = sqlite3.connect(
+            str(tmp_path / "history.db"), isolation_level=None, check_same_thread=False
+        )
+        blocker.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.3, blocker.execute, ("ROLLBACK",))
+        release.start()
+        store.clear()
+        release.join()
+        blocker.close()
+        assert len(store) == 0
+        store.close()
+
+    def test_clear_times_out_while_locked(self, tmp_path):
+        """Prueba que clear falle con TimeoutError si la base sigue ocupada."""
+        store = self.make_store(tmp_path)
+        store.CLEAR_TIMEOUT = 0.2
+        blocker = sqlite3.connect(str(tmp_path / "history.db"), isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        with pytest.raises(TimeoutError, match="ocupado"):
+            store.clear()
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        store.close()
+
+
+class TestFileHistoryStore:
+    """Tests para el historial persistente en log binario."""
+
+    def make_store(self, tmp_path, **kwargs):
+        kwargs.setdefault("capacity", 10)
+        return FileHistoryStore(str(tmp_path / "history.log"), **kwargs)
+
+    def test_append_and_read(self, tmp_path):
+        """Prueba agregar y leer operaciones (incluidas las pendientes de fsync)."""
+        store = self.make_store(tmp_path)
+        store.append(10, 5, "+", 15)
+        store.extend([4, 6], [2, 3], ["/", "-"], [2, 3])
+        assert len(store) == 3
+        assert store.get_page() == [
+            {"num1": 10, "num2": 5, "operator": "+", "result": 15},
+            {"num1": 4, "num2": 2, "operator": "/", "result": 2},
+            {"num1": 6, "num2": 3, "operator": "-", "result": 3},
+        ]
+
+    def test_fixed_width_records(self, tmp_path):
+        """Prueba que cada registro ocupe 33 bytes en el log."""
+        store = self.make_store(tmp_path)
+        store.append(1, 2, "*", 2)
+        store.close()
+        size = (tmp_path / "history.log").stat().st_size
+        assert size == len(FileHistoryStore.MAGIC) + 33
+
+    def test_upgrades_legacy_log(self, tmp_path):
+        """Prueba abrir un log del formato anterior (sin instante) y convertirlo."""
+        path = tmp_path / "history.log"
+        legacy = np.zeros(3, dtype=FileHistoryStore.LEGACY_RECORD)
+        legacy["num1"] = [1, 2, 3]
+        legacy["result"] = [10, 20, 30]
+        path.write_bytes(FileHistoryStore.LEGACY_MAGIC + legacy.tobytes())
+        (tmp_path / "history.log.ops").write_text("+\n", encoding="utf-8")
+
+        store = self.make_store(tmp_path, capacity=2)
+        assert [item["num1"] for item in store.get_page()] == [2, 3]
+        assert store.query(until=0)[1] == 2
+        store.close()
+        assert path.read_bytes().startswith(FileHistoryStore.MAGIC)
+        assert path.stat().st_size == len(FileHistoryStore.MAGIC) + 2 * 33
+
+    def test_recovers_after_restart(self, tmp_path):
+        """Prueba que el historial sobreviva a un reinicio."""
+        store = self.make_store(tmp_path)
+        store.append(10, 5, "+", 15)
+        store.append(3, 2, "pow", 9)
+        store.close()
+
+        reopened = self.make_store(tmp_path)
+        assert [item["operator"] for item in reopened.get_page()] == ["+", "pow"]
+
+    def test_group_commit(self, tmp_path, monkeypatch):
+        """Prueba que los registros se confirmen en bloques de sync_records fuera de append."""
+        fsync = os.fsync
+        threads = []
+
+        def recording_fsync(fd):
+            threads.append(threading.current_thread().name)
+            fsync(fd)
+
+        store = self.make_store(tmp_path, sync_records=3, sync_interval=3600)
+        monkeypatch.setattr(os, "fsync", recording_fsync)
+        path = tmp_path / "history.log"
+        store.append(1, 1, "+", 2)
+        # El primer uso de un operador confirma la tabla de códigos (<path>.ops)
+        threads.clear()
+        store.append(1, 1, "+", 2)
+        assert path.stat().st_size == len(FileHistoryStore.MAGIC)
+        store.append(1, 1, "+", 2)
+        deadline = time.monotonic() + 5
+        while not threads and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.stat().st_size == len(FileHistoryStore.MAGIC) + 3 * 33
+        assert threads == ["history-log-sync"]
+        store.close()
+
+    def test_sync_interval_without_new_writes(self, tmp_path):
+        """Prueba que los pendientes se confirmen tras sync_interval aunque no lleguen más."""
+        store = self.make_store(tmp_path, sync_records=1_000, sync_interval=0.05)
+        path = tmp_path / "history.log"
+        store.append(1, 1, "+", 2)
+        assert path.stat().st_size == len(FileHistoryStore.MAGIC)
+        deadline = time.monotonic() + 5
+        while path.stat().st_size == len(FileHistoryStore.MAGIC) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.stat().st_size == len(FileHistoryStore.MAGIC) + 33
+        store.close()
+
+    def test_discards_torn_record(self, tmp_path):
+        """Prueba que un registro final incompleto se descarte al recuperar."""
+        store = self.make_store(tmp_path)
+        store.append(1, 1, "+", 2)
+        store.close()
+        with open(tmp_path / "history.log", "ab") as f:
+            f.write(b"\x00" * 10)
+
+        reopened = self.make_store(tmp_path)
+        assert len(reopened) == 1
+
+    def test_window_and_compaction(self, tmp_path):
+        """Prueba la ventana de `capacity` registros y la compactación al iniciar."""
+        store = self.make_store(tmp_path, capacity=2)
+        for i in range(5):
+            store.append(i, 0, "+", i)
+        assert [item["num1"] for item in store.get_page()] == [3, 4]
+        store.close()
+
+        reopened = self.make_store(tmp_path, capacity=2)
+        assert [item["num1"] for item in reopened.get_page()] == [3, 4]
+        size = (tmp_path / "history.log").stat().st_size
+        assert size == len(FileHistoryStore.MAGIC) + 2 * 33
+
+    def test_clear(self, tmp_path):
+        """Prueba limpiar el log."""
+        store = self.make_store(tmp_path)
+        store.append(1, 1, "+", 2)
+        store.clear()
+        assert len(store) == 0
+        assert store.get_page() == []
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Prueba que un archivo que no es un log lance error."""
+        (tmp_path / "history.log").write_bytes(b"otra cosa")
+        with pytest.raises(ValueError, match="no es un log"):
+            self.make_store(tmp_path)
+
+
+class TestCreateHistoryStore:
+    """Tests para la selección del backend de historial."""
+
+    def make_settings(self, tmp_path, backend):
+        return Settings.model_construct(
+            history_backend=backend,
+            history_capacity=5,
+            history_sqlite_path=str(tmp_path / "history.db"),
+            history_log_path=str(tmp_path / "history.log"),
+            history_log_sync_records=16,
+            history_log_sync_interval_ms=10,
+        )
+
+    def test_memory_backend(self, tmp_path):
+        """Prueba crear el historial en memoria."""
+        store = create_history_store(self.make_settings(tmp_path, "memory"))
+        assert isinstance(store, RingBufferHistory)
+
+    def test_sqlite_backend(self, tmp_path):
+        """Prueba crear el historial en SQLite."""
+        store = create_history_store(self.make_settings(tmp_path, "sqlite"))
+        assert isinstance(store, SQLiteHistoryStore)
+
+    def test_file_backend(self, tmp_path):
+        """Prueba crear el historial persistente en log binario."""
+        store = create_history_store(self.make_settings(tmp_path, "file"))
+        assert isinstance(store, FileHistoryStore)
+        store.close()
+
+    def test_per_client(self, tmp_path):
+        """Prueba crear el historial aislado por cliente."""
+        config = self.make_settings(tmp_path, "memory")
+        config.history_per_client = True
+        assert isinstance(create_history_store(config), PartitionedHistory)
+
+    def test_per_client_requires_memory(self, tmp_path):
+        """Prueba que el historial por cliente solo esté disponible en memoria."""
+        config = self.make_settings(tmp_path, "sqlite")
+        config.history_per_client = True
+        with pytest.raises(ValueError, match="por cliente"):
+            create_history_store(config)
+
+    def test_invalid_backend(self, tmp_path):
+        """Prueba que un backend desconocido lance error."""
+        with pytest.raises(ValueError, match="Backend de historial no soportado"):
+            create_history_store(self.make_settings(tmp_path, "redis"))
@@ -0,0 +1,109 @@
+"""
+Tests para el benchmark de carga de la API.
+Prueba el cálculo de percentiles, el resumen y la detección de regresiones.
+"""
+
+import json
+
+import pytest
+from benchmarks.load_test import SCENARIOS, compare, main, parse_env, percentile, summarize
+
+
+def make_result(scenario="calculate", concurrency=8, rps=1000.0, p95_ms=5.0, errors=0):
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": 100,
+        "errors": errors,
+        "rps": rps,
+        "p50_ms": 1.0,
+        "p95_ms": p95_ms,
+        "p99_ms": 9.0,
+    }
+
+
+class TestPercentile:
+    """Tests para el cálculo de percentiles."""
+
+    def test_nearest_rank(self):
+        """Prueba el percentil por rango más cercano."""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+
+    def test_empty(self):
+        """Prueba que una lista vacía retorne cero."""
+        assert percentile([], 0.5) == 0.0
+
+    def test_summarize(self):
+        """Prueba el resumen de latencias de un escenario."""
+        summary = summarize("calculate", 4, [0.001, 0.002, 0.003, 0.004], 1, 0.5)
+        assert summary["requests"] == 5
+        assert summary["errors"] == 1
+        assert summary["rps"] == 10
+        assert summary["p50_ms"] == 2.0
+        assert summary["p99_ms"] == 4.0
+
+
+class TestCompare:
+    """Tests para la detección de regresiones."""
+
+    def test_no_regression_within_threshold(self):
+        """Prueba que variaciones dentro del umbral no sean regresiones."""
+        baseline = {"results": [make_result()]}
+        current = {"results": [make_result(rps=900, p95_ms=5.5)]}
+        assert compare(current, baseline, 0.2) == []
+
+    def test_latency_regression(self):
+        """Prueba detectar una subida de p95."""
+        baseline = {"results": [make_result()]}
+        current = {"results": [make_result(p95_ms=7.0)]}
+        assert "p95" in compare(current, baseline, 0.2)[0]
+
+    def test_throughput_regression(self):
+        """Prueba detectar una caída de peticiones por segundo."""
+        baseline = {"results": [make_result()]}
+        current = {"results": [make_result(rps=500)]}
+        assert "rps" in compare(current, baseline, 0.2)[0]
+
+    def test_new_errors_are_regressions(self):
+        """Prueba que aparezcan errores nuevos como regresión."""
+        baseline = {"results": [make_result()]}
+        current = {"results": [make_result(errors=3)]}
+        assert "errores" in compare(current, baseline, 0.2)[0]
+
+    def test_ignores_scenarios_missing_from_baseline(self):
+        """Prueba que escenarios nuevos no se comparen."""
+        baseline = {"results": [make_result(scenario="history")]}
+        current = {"results": [make_result(rps=1)]}
+        assert compare(current, baseline, 0.2) == []
+
+
+class TestParseEnv:
+    """Tests para las variables de entorno del servidor."""
+
+    def test_pairs(self):
+        """Prueba convertir CLAVE=VALOR en diccionario."""
+        env = parse_env(["CALCULADORA_FAST_SERIALIZATION=true", "A=b=c"])
+        assert env == {"CALCULADORA_FAST_SERIALIZATION": "true", "A": "b=c"}
+
+    def test_invalid_pair(self):
+        """Prueba que un par sin '=' es inválido."""
+        with pytest.raises(ValueError):
+            parse_env(["CALCULADORA"])
+
+
+@pytest.mark.benchmark
+class TestLoadTestRun:
+    """Ejecución real del benchmark contra uvicorn."""
+
+    def test_run_against_uvicorn(self, tmp_path):
+        """Prueba una ejecución corta y su comparación contra sí misma."""
+        output = tmp_path / "results.json"
+        argv = ["--concurrency", "1", "4", "--requests", "20", "--warmup", "5"]
+        assert main(argv + ["--output", str(output)]) == 0
+        report = json.loads(output.read_text())
+        assert len(report["results"]) == len(SCENARIOS) * 2
+        assert all(result["errors"] == 0 for result in report["results"])
+        assert main(argv + ["--baseline", str(output), "--threshold", "100"]) == 0
@@ -0,0 +1,157 @@
+"""
+Tests para el módulo de métricas.
+Prueba los histogramas, el formato Prometheus, el middleware y las etapas internas.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.calculator import Calculator
+from app.history import RingBufferHistory
+from app.metrics import Histogram, MetricsRegistry, TimedHistoryStore
+
+
+class TestHistogram:
+    """Tests para el histograma de buckets fijos."""
+
+    def test_observe_counts_bucket(self):
+        """Prueba que cada valor cae en el primer bucket que lo contiene."""
+        histogram = Histogram((0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(5.65)
+        assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+
+    def test_empty_histogram(self):
+        """Prueba un histograma sin observaciones."""
+        histogram = Histogram((0.1,))
+        assert histogram.cumulative() == [("0.1", 0), ("+Inf", 0)]
+
+
+class TestMetricsRegistry:
+    """Tests para el registro y el formato de texto de Prometheus."""
+
+    def test_render_requests(self):
+        """Prueba que se exportan contadores e histogramas por ruta."""
+        registry = MetricsRegistry(enabled=True, buckets=(0.01,))
+        registry.observe_request("POST", "/calculate", 200, 0.002)
+        registry.observe_request("POST", "/calculate", 400, 0.003)
+        text = registry.render()
+        assert (
+            'calculadora_http_requests_total{method="POST",route="/calculate",status="200"} 1'
+            in text
+        )
+        assert (
+            'calculadora_http_request_duration_seconds_bucket{method="POST",route="/calculate",'
+            'le="0.01"} 2' in text
+        )
+        assert (
+            'calculadora_http_request_duration_seconds_count{method="POST",route="/calculate"} 2'
+            in text
+        )
+        assert "# TYPE calculadora_stage_duration_seconds histogram" in text
+        assert text.endswith("\n")
+
+    def test_labels_are_escaped(self):
+        """Prueba que las comillas en las etiquetas se escapan."""
+        registry = MetricsRegistry(enabled=True)
+        registry.observe_request("GET", 'a"b', 200, 0.001)
+        assert 'route="a\\"b"' in registry.render()
+
+    def test_reset(self):
+        """Prueba reiniciar las métricas."""
+        registry = MetricsRegistry(enabled=True)
+        registry.observe_request("GET", "/", 200, 0.001)
+        registry.stage("execute").observe(0.001)
+        registry.reset()
+        assert "calculadora_http_requests_total{" not in registry.render()
+        assert registry.stage("execute").count == 0
+
+
+class TestCalculatorStages:
+    """Tests para las etapas internas medidas por la calculadora."""
+
+    def test_calculate_records_stages(self):
+        """Prueba que calculate mide búsqueda, ejecución y escritura del historial."""
+        registry = MetricsRegistry(enabled=True)
+        calculator = Calculator(history=RingBufferHistory(10), metrics=registry)
+        assert calculator.calculate(2, 3, "+") == 5
+        for stage in ("create_operation", "execute", "history_write"):
+            assert registry.stage(stage).count == 1
+
+    def test_failed_execute_is_measured(self):
+        """Prueba que una ejecución con error también se mide."""
+        registry = MetricsRegistry(enabled=True)
+        calculator = Calculator(history=RingBufferHistory(10), metrics=registry)
+        with pytest.raises(ValueError):
+            calculator.calculate(1, 0, "/")
+        assert registry.stage("execute").count == 1
+        assert registry.stage("history_write").count == 0
+
+    def test_batch_records_stages(self):
+        """Prueba que el lote mide una búsqueda y una ejecución por operador."""
+        registry = MetricsRegistry(enabled=True)
+        calculator = Calculator(history=RingBufferHistory(10), metrics=registry)
+        calculator.calculate_batch([1, 2, 3], [1, 1, 1], ["+", "*", "+"])
+        assert registry.stage("create_operation").count == 2
+        assert registry.stage("execute").count == 2
+        assert registry.stage("history_write").count == 1
+
+    def test_without_metrics_history_is_not_wrapped(self):
+        """Prueba que sin registro de métricas el historial no se decora."""
+        history = RingBufferHistory(10)
+        calculator = Calculator(history=history)
+        assert calculator.history is history
+
+    def test_timed_history_delegates(self):
+        """Prueba que el historial decorado delega lecturas y atributos propios."""
+        history = RingBufferHistory(10)
+        timed = TimedHistoryStore(history, Histogram())
+        timed.append(1, 2, "+", 3)
+        assert len(timed) == 1
+        assert timed.get_page()[0]["result"] == 3
+        assert timed.capacity == 10
+
+
+@pytest.fixture
+def metrics_client(monkeypatch):
+    """Cliente de prueba con métricas activadas y una calculadora instrumentada."""
+    registry = main.metrics
+    registry.reset()
+    monkeypatch.setattr(registry, "enabled", True)
+    calculator = Calculator(history=RingBufferHistory(100), metrics=registry)
+    monkeypatch.setattr(main, "calculator", calculator)
+    yield TestClient(main.app)
+    registry.reset()
+
+
+class TestMetricsEndpoint:
+    """Tests para el endpoint /metrics y el middleware."""
+
+    def test_disabled_returns_404(self):
+        """Prueba que /metrics responde 404 si las métricas están desactivadas."""
+        assert not main.metrics.enabled
+        response = TestClient(main.app).get("/metrics")
+        assert response.status_code == 404
+
+    def test_metrics_by_route_template(self, metrics_client):
+        """Prueba que las rutas se etiquetan con su plantilla y su código."""
+        metrics_client.post("/calculate", json={"num1": 1, "num2": 2, "operator": "+"})
+        metrics_client.post("/calculate", json={"num1": 1, "num2": 0, "operator": "/"})
+        metrics_client.post("/calculate-chain/abc", json={"num1": 1})
+        metrics_client.get("/no-existe")
+
+        response = metrics_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'route="/calculate",status="200"} 1' in text
+        assert 'route="/calculate",status="400"} 1' in text
+        assert 'route="/calculate-chain/{compiled_id}",status="404"} 1' in text
+        assert 'route="unmatched",status="404"} 1' in text
+        assert 'calculadora_stage_duration_seconds_count{stage="execute"} 2' in text
+        assert 'calculadora_stage_duration_seconds_count{stage="history_write"} 1' in text
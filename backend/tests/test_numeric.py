@@ -0,0 +1,94 @@
+"""
+Tests unitarios para los modos numéricos.
+Prueba la conversión de números, el contexto decimal y la aritmética exacta.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+from app.config import Settings
+from app.numeric import DecimalMode, FloatMode, FractionMode, create_numeric_modes
+
+
+class TestNumericModes:
+    """Tests para los modos float, decimal y fraction."""
+
+    def test_float_is_identity(self):
+        """Prueba que el modo float no convierta los números."""
+        value = 0.1
+        assert FloatMode().convert(value) is value
+
+    def test_decimal_uses_shortest_repr(self):
+        """Prueba que 0.1 se convierta exactamente a Decimal("0.1")."""
+        mode = DecimalMode()
+        with mode.context():
+            result = mode.convert(0.1) + mode.convert(0.2)
+        assert result == Decimal("0.3")
+        assert mode.format(result) == "0.3"
+
+    def test_decimal_precision(self):
+        """Prueba que las operaciones se redondeen a la precisión configurada."""
+        mode = DecimalMode(precision=5)
+        with mode.context():
+            result = mode.convert(1) / mode.convert(3)
+        assert mode.format(result) == "0.33333"
+
+    def test_decimal_errors_are_value_errors(self):
+        """Prueba que los errores de aritmética decimal se reporten como ValueError."""
+        mode = DecimalMode()
+        with pytest.raises(ValueError, match="InvalidOperation"):
+            with mode.context():
+                mode.convert(float("inf")) - mode.convert(float("inf"))
+
+    def test_invalid_precision(self):
+        """Prueba que la precisión debe ser positiva."""
+        with pytest.raises(ValueError):
+            DecimalMode(precision=0)
+
+    def test_fraction_is_exact(self):
+        """Prueba la aritmética racional exacta."""
+        mode = FractionMode()
+        result = mode.convert(1) / mode.convert(3)
+        assert result == Fraction(1, 3)
+        assert mode.format(result) == "1/3"
+        assert mode.to_float(result) == pytest.approx(1 / 3)
+
+    def test_fraction_rejects_non_finite(self):
+        """Prueba que el modo fraction rechace infinitos."""
+        with pytest.raises(ValueError, match="finitos"):
+            FractionMode().convert(float("inf"))
+
+    def test_to_float_overflow(self):
+        """Prueba que un valor sin aproximación float finita se rechace."""
+        with pytest.raises(ValueError, match="excede el rango"):
+            FractionMode().to_float(Fraction(10**400, 3))
+        with pytest.raises(ValueError, match="excede el rango"):
+            DecimalMode().to_float(Decimal("1e400"))
+
+    def test_fraction_check(self):
+        """Prueba que el modo fraction solo acepte resultados racionales."""
+        mode = FractionMode()
+        assert mode.check(Fraction(1, 3)) == Fraction(1, 3)
+        with pytest.raises(ValueError, match="no es racional"):
+            mode.check(1.4142135623730951)
+        assert DecimalMode().check(Decimal("1.5")) == Decimal("1.5")
+
+    def test_fraction_max_digits(self):
+        """Prueba que el modo fraction rechace numeradores o denominadores demasiado grandes."""
+        mode = FractionMode(max_digits=10)
+        assert mode.check(Fraction(9_999_999_999, 7)) == Fraction(9_999_999_999, 7)
+        with pytest.raises(ValueError, match="máximo de 10 dígitos"):
+            mode.check(Fraction(10**12, 7))
+        with pytest.raises(ValueError, match="máximo de 10 dígitos"):
+            mode.check(Fraction(1, 10**12))
+        with pytest.raises(ValueError):
+            FractionMode(max_digits=0)
+
+    def test_create_numeric_modes(self):
+        """Prueba crear los modos desde la configuración."""
+        modes = create_numeric_modes(Settings(decimal_precision=4, decimal_rounding="ROUND_DOWN"))
+        assert set(modes) == {"float", "decimal", "fraction"}
+        decimal = modes["decimal"]
+        with decimal.context():
+            assert decimal.format(decimal.convert(2) / decimal.convert(3)) == "0.6666"
@@ -3,8 +3,38 @@ Tests unitarios para el módulo de operaciones.
 Prueba cada operación matemática y el factory pattern.
 """
 
+import numpy as np
 import pytest
-from app.operations import Addition, Subtraction, Multiplication, Division, OperationFactory
+from decimal import Decimal
+from fractions import Fraction
+
+from app.operations import (
+    Addition,
+    Subtraction,
+    Multiplication,
+    Division,
+    Exponential,
+    FloorDivision,
+    Logarithm,
+    Modulo,
+    Operation,
+    OperationFactory,
+    Power,
+    Root,
+    overflow_mask,
+)
+
+
+class Average(Operation):
+    """Operación de prueba para el registro del factory."""
+
+    __slots__ = ()
+
+    def execute(self, a: float, b: float) -> float:
+        return (a + b) / 2
+
+    def get_symbol(self) -> str:
+        return "avg"
 
 
 class TestAddition:
@@ -145,6 +175,106 @@ class TestDivision:
         assert operation.get_symbol() == "/"
 
 
+class TestExtendedOperations:
+    """Tests para potencia, módulo, división entera, raíz, logaritmo y exponencial."""
+
+    def test_power(self):
+        """Prueba la potencia y sus casos no definidos."""
+        assert Power().execute(2, 10) == 1024
+        assert Power().execute(-2, 3) == -8
+        with pytest.raises(ValueError, match="excede el rango"):
+            Power().execute(10.0, 400)
+        with pytest.raises(ValueError, match="Potencia no definida"):
+            Power().execute(0, -1)
+        with pytest.raises(ValueError, match="Potencia no definida"):
+            Power().execute(-8, 0.5)
+
+    def test_power_exact_exponent_limit(self):
+        """Prueba que las fracciones no acepten exponentes enormes."""
+        assert Power().execute(Fraction(1, 2), 3) == Fraction(1, 8)
+        with pytest.raises(ValueError, match="exponente exacto"):
+            Power().execute(Fraction(10), 1e9)
+
+    def test_modulo_and_floor_division(self):
+        """Prueba que el resto tenga el signo del divisor en todos los tipos."""
+        assert Modulo().execute(-7, 3) == 2
+        assert FloorDivision().execute(-7, 3) == -3
+        assert Modulo().execute(Decimal("-7"), Decimal("3")) == Decimal("2")
+        assert FloorDivision().execute(Decimal("-7"), Decimal("3")) == Decimal("-3")
+        assert Modulo().execute(Fraction(-7, 2), Fraction(1)) == Fraction(1, 2)
+        with pytest.raises(ValueError, match="módulo por cero"):
+            Modulo().execute(1, 0)
+        with pytest.raises(ValueError, match="dividir por cero"):
+            FloorDivision().execute(1, 0)
+
+    def test_root(self):
+        """Prueba raíces cuadradas, impares de negativos y no definidas."""
+        assert Root().execute(9, 2) == 3
+        assert Root().execute(-8, 3) == -2
+        with pytest.raises(ValueError, match="Raíz no definida"):
+            Root().execute(-4, 2)
+        with pytest.raises(ValueError, match="Raíz no definida"):
+            Root().execute(4, 0)
+
+    def test_logarithm(self):
+        """Prueba el logaritmo en base b."""
+        assert Logarithm().execute(8, 2) == pytest.approx(3)
+        assert Logarithm().execute(Decimal("100"), Decimal("10")) == Decimal("2")
+        for a, b in ((0, 10), (10, 1), (10, -2)):
+            with pytest.raises(ValueError, match="Logaritmo no definido"):
+                Logarithm().execute(a, b)
+
+    def test_exponential(self):
+        """Prueba a · e^b."""
+        assert Exponential().execute(1, 0) == 1
+        assert Exponential().execute(100, 0.05) == pytest.approx(105.12710963760242)
+        assert Exponential().execute(0, 1000) == 0
+        with pytest.raises(ValueError, match="excede el rango"):
+            Exponential().execute(-1, 1000)
+        with pytest.raises(ValueError, match="excede el rango"):
+            Exponential().execute(1e300, 100)
+
+    @pytest.mark.parametrize("symbol", ["^", "%", "//", "root", "log", "exp"])
+    def test_batch_matches_scalar(self, symbol):
+        """Prueba que el kernel y la máscara de inválidos coincidan con execute."""
+        operation = OperationFactory.create_operation(symbol)
+        a = np.array([8.0, -8.0, 2.5, 0.0, -3.0, 27.0, 1.0, 10.0, 0.0])
+        b = np.array([3.0, 3.0, 2.0, -1.0, 0.5, 1.0, 0.0, 1000.0, 1000.0])
+        results = operation.execute_batch(a, b)
+        invalid = operation.invalid_mask(a, b)
+        overflow = overflow_mask(a, b, results)
+        for i, (x, y) in enumerate(zip(a.tolist(), b.tolist())):
+            try:
+                expected = operation.execute(x, y)
+            except ValueError:
+                assert (invalid is not None and invalid[i]) or overflow[i]
+            else:
+                assert invalid is None or not invalid[i]
+                assert not overflow[i]
+                assert results[i] == pytest.approx(expected)
+
+
+class TestBatchKernels:
+    """Tests para los kernels vectorizados de las operaciones."""
+
+    def test_batch_matches_scalar(self):
+        """Prueba que el kernel vectorizado coincida con execute."""
+        a = np.array([10.0, -3.5, 0.0])
+        b = np.array([4.0, 2.0, 7.0])
+        for operation in (Addition(), Subtraction(), Multiplication(), Division()):
+            expected = [operation.execute(x, y) for x, y in zip(a, b)]
+            assert operation.execute_batch(a, b).tolist() == expected
+
+    def test_division_invalid_mask(self):
+        """Prueba que la división marque los divisores cero."""
+        mask = Division().invalid_mask(np.array([1.0, 2.0]), np.array([0.0, 1.0]))
+        assert mask.tolist() == [True, False]
+
+    def test_addition_has_no_invalid_mask(self):
+        """Prueba que la suma no tenga elementos inválidos."""
+        assert Addition().invalid_mask(np.array([1.0]), np.array([0.0])) is None
+
+
 class TestOperationFactory:
     """Tests para el factory de operaciones."""
 
@@ -175,13 +305,42 @@ class TestOperationFactory:
     def test_invalid_operation(self):
         """Prueba que operador inválido lance error."""
         with pytest.raises(ValueError, match="Operación no soportada"):
-            OperationFactory.create_operation("%")
+            OperationFactory.create_operation("&")
 
     def test_get_supported_operations(self):
         """Prueba obtener lista de operaciones soportadas."""
         operations = OperationFactory.get_supported_operations()
-        assert len(operations) == 4
-        assert "+" in operations
-        assert "-" in operations
-        assert "*" in operations
-        assert "/" in operations
+        assert len(operations) == 10
+        for symbol in ("+", "-", "*", "/", "^", "%", "//", "root", "log", "exp"):
+            assert symbol in operations
+
+    def test_returns_shared_instance(self):
+        """Prueba que el factory reutilice la misma instancia."""
+        assert OperationFactory.create_operation("+") is OperationFactory.create_operation("+")
+
+    def test_operations_are_immutable(self):
+        """Prueba que las operaciones compartidas no acepten atributos."""
+        operation = OperationFactory.create_operation("*")
+        with pytest.raises(AttributeError):
+            operation.state = 1
+
+    def test_register_operation(self):
+        """Prueba registrar una operación nueva."""
+        try:
+            registered = OperationFactory.register_operation(Average)
+            assert OperationFactory.create_operation("avg") is registered
+            assert registered.execute(2, 3) == 2.5
+            assert "avg" in OperationFactory.get_supported_operations()
+        finally:
+            OperationFactory.unregister_operation("avg")
+        assert "avg" not in OperationFactory.get_supported_operations()
+
+    def test_register_invalid_operation(self):
+        """Prueba que registrar algo que no es Operation lance error."""
+        with pytest.raises(ValueError, match="subclase de Operation"):
+            OperationFactory.register_operation(dict)
+
+    def test_unregister_unknown_operation(self):
+        """Prueba que eliminar un operador desconocido lance error."""
+        with pytest.raises(ValueError, match="Operación no soportada"):
+            OperationFactory.unregister_operation("&")
@@ -0,0 +1,147 @@
+"""
+Tests para el perfilador por muestreo.
+Prueba el formato collapsed, el muestreo y los endpoints de administración.
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.profiling import OTHER_STACKS, StackSampler, collapse_stack
+
+
+def inner_function():
+    """Función auxiliar cuya pila se muestrea."""
+    return sys._getframe()
+
+
+class TestCollapseStack:
+    """Tests para el formato collapsed."""
+
+    def test_root_to_leaf(self):
+        """Prueba que la pila va de la raíz a la hoja separada por ';'."""
+        stack = collapse_stack(inner_function())
+        frames = stack.split(";")
+        assert frames[-1] == "tests/test_profiling.py:inner_function"
+        assert frames[-2] == "tests/test_profiling.py:test_root_to_leaf"
+
+    def test_max_depth(self):
+        """Prueba que la profundidad se limita desde la hoja."""
+        stack = collapse_stack(inner_function(), max_depth=1)
+        assert stack == "tests/test_profiling.py:inner_function"
+
+
+class TestStackSampler:
+    """Tests para el perfilador."""
+
+    def test_invalid_interval(self):
+        """Prueba que el intervalo debe ser positivo."""
+        with pytest.raises(ValueError):
+            StackSampler(interval_ms=0)
+
+    def test_sample_aggregates_stacks(self):
+        """Prueba que muestras iguales se agregan en una línea."""
+        sampler = StackSampler()
+        sampler._target = threading.get_ident()
+        sampler.sample()
+        sampler.sample()
+        lines = sampler.collapsed().splitlines()
+        assert len(lines) == 1
+        assert lines[0].endswith(" 2")
+        assert "test_sample_aggregates_stacks" in lines[0]
+        assert sampler.stats()["samples"] == 2
+
+    def test_max_stacks(self):
+        """Prueba que las pilas nuevas se agrupan al llegar al máximo."""
+        sampler = StackSampler(max_stacks=1)
+        sampler._target = threading.get_ident()
+        sampler.sample()
+        sampler.sample()
+        assert OTHER_STACKS not in sampler.collapsed()
+        sampler.reset()
+        sampler._stacks["otra;pila"] = 1
+        sampler.sample()
+        assert f"{OTHER_STACKS} 1" in sampler.collapsed()
+
+    def test_samples_only_during_requests(self):
+        """Prueba que el hilo de muestreo solo registra con peticiones en curso."""
+        sampler = StackSampler(interval_ms=1)
+        sampler.start()
+        try:
+            time.sleep(0.05)
+            assert sampler.samples == 0
+            sampler.active_requests = 1
+            deadline = time.monotonic() + 2
+            while sampler.samples == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert sampler.samples > 0
+        finally:
+            sampler.stop()
+        assert not sampler.running
+
+    def test_reset(self):
+        """Prueba descartar las pilas acumuladas."""
+        sampler = StackSampler()
+        sampler._target = threading.get_ident()
+        sampler.sample()
+        sampler.reset()
+        assert sampler.collapsed() == ""
+        assert sampler.samples == 0
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    """Cliente de prueba con token de administración configurado."""
+    monkeypatch.setattr(main.settings, "admin_token", "secreto")
+    # Como context manager todas las peticiones usan el mismo hilo de event loop
+    with TestClient(main.app) as client:
+        client.headers["X-Admin-Token"] = "secreto"
+        yield client
+    main.profiler.stop()
+    main.profiler.reset()
+
+
+class TestProfilerEndpoints:
+    """Tests para los endpoints /admin/profiler."""
+
+    def test_admin_disabled_without_token(self):
+        """Prueba que sin token configurado los endpoints se rechazan."""
+        response = TestClient(main.app).get("/admin/profiler")
+        assert response.status_code == 403
+
+    def test_wrong_token(self, admin_client):
+        """Prueba que un token incorrecto se rechaza."""
+        response = admin_client.get("/admin/profiler", headers={"X-Admin-Token": "otro"})
+        assert response.status_code == 403
+
+    def test_start_sample_and_dump(self, admin_client):
+        """Prueba iniciar, muestrear peticiones y exportar el perfil."""
+        response = admin_client.post("/admin/profiler/start")
+        assert response.status_code == 200
+        assert response.json()["running"] is True
+
+        main.profiler.active_requests += 1
+        try:
+            deadline = time.monotonic() + 2
+            while main.profiler.samples == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            main.profiler.active_requests -= 1
+
+        response = admin_client.post("/admin/profiler/stop")
+        assert response.json()["running"] is False
+        assert response.json()["samples"] > 0
+
+        response = admin_client.get("/admin/profiler/collapsed")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+
+        assert admin_client.delete("/admin/profiler").status_code == 200
+        assert admin_client.get("/admin/profiler").json()["samples"] == 0
@@ -0,0 +1,129 @@
+"""
+Tests unitarios para las reducciones estadísticas.
+Prueba cada reducción, la combinación por bloques y la validación de parámetros.
+"""
+
+import math
+
+import numpy as np
+import pytest
+from app.reduction import StreamingReducer, reduce_values
+
+VALUES = np.random.default_rng(7).normal(1e6, 3.0, size=10_001)
+
+
+class TestReduceValues:
+    """Tests para reduce_values."""
+
+    @pytest.mark.parametrize(
+        "operation, expected",
+        [
+            ("sum", math.fsum(VALUES.tolist())),
+            ("mean", math.fsum(VALUES.tolist()) / len(VALUES)),
+            ("min", VALUES.min()),
+            ("max", VALUES.max()),
+            ("variance", np.var(VALUES)),
+        ],
+    )
+    def test_chunked_matches_reference(self, operation, expected):
+        """Prueba que el resultado por bloques coincida con el cálculo directo."""
+        assert reduce_values(VALUES, operation, chunk_size=1_000) == pytest.approx(
+            expected, rel=1e-12
+        )
+
+    def test_compensated_sum(self):
+        """Prueba que la suma por bloques no pierda los valores pequeños."""
+        values = np.array([1e16, 1.0, -1e16, 1.0] * 4)
+        assert reduce_values(values, "sum", chunk_size=1) == 8.0
+
+    def test_sample_variance(self):
+        """Prueba la varianza muestral (ddof=1)."""
+        values = np.array([1.0, 2.0, 3.0, 4.0])
+        assert reduce_values(values, "variance", ddof=1, chunk_size=3) == pytest.approx(5 / 3)
+        with pytest.raises(ValueError, match="ddof=1"):
+            reduce_values(values[:1], "variance", ddof=1)
+
+    def test_product(self):
+        """Prueba el producto por bloques."""
+        assert reduce_values(np.array([1.5, 2.0, -4.0]), "product", chunk_size=2) == -12.0
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 10])
+    def test_product_without_intermediate_overflow(self, chunk_size):
+        """Prueba que un cero anule el producto y que los parciales fuera de rango se compensen."""
+        assert reduce_values(np.array([1e200, 1e200, 0.0]), "product", chunk_size=chunk_size) == 0
+        values = np.array([1e200, 1e200, 1e-200, -1e-200])
+        assert reduce_values(values, "product", chunk_size=chunk_size) == pytest.approx(-1.0)
+
+    def test_percentile(self):
+        """Prueba el percentil con interpolación lineal."""
+        values = np.arange(1.0, 101.0)
+        assert reduce_values(values, "percentile", percentile=50) == 50.5
+        assert reduce_values(values, "percentile", percentile=100) == 100.0
+
+    @pytest.mark.parametrize(
+        "operation, percentile",
+        [("median", None), ("percentile", None), ("percentile", 101), ("sum", 50)],
+    )
+    def test_invalid_parameters(self, operation, percentile):
+        """Prueba reducciones y percentiles inválidos."""
+        with pytest.raises(ValueError):
+            reduce_values(np.ones(3), operation, percentile=percentile)
+
+    def test_rejects_non_finite(self):
+        """Prueba que los valores no finitos se rechacen."""
+        with pytest.raises(ValueError, match="finitos"):
+            reduce_values(np.array([1.0, np.nan]), "sum")
+
+    @pytest.mark.parametrize(
+        "operation,values",
+        [
+            ("product", [1e200, 1e200]),
+            ("sum", [1e308, 1e308]),
+            ("mean", [1e308, 1e308]),
+            ("variance", [1e200, -1e200]),
+        ],
+    )
+    def test_rejects_overflowing_result(self, operation, values):
+        """Prueba que un resultado fuera del rango de los float se rechace."""
+        with pytest.raises(ValueError, match="excede el rango"):
+            reduce_values(np.array(values), operation, chunk_size=1)
+
+    def test_empty(self):
+        """Prueba que se requiera al menos un valor."""
+        with pytest.raises(ValueError, match="al menos un valor"):
+            reduce_values(np.array([]), "mean")
+
+
+class TestStreamingReducer:
+    """Tests para el acumulador por bloques."""
+
+    def test_update_in_chunks(self):
+        """Prueba agregar bloques de distinto tamaño."""
+        reducer = StreamingReducer("variance")
+        for chunk in np.array_split(VALUES, [1, 5, 5, 4_000]):
+            reducer.update(chunk)
+        assert reducer.count == len(VALUES)
+        assert reducer.result() == pytest.approx(np.var(VALUES), rel=1e-12)
+
+    @pytest.mark.parametrize("operation", ["sum", "product", "min", "max", "variance"])
+    def test_merge(self, operation):
+        """Prueba combinar reductores de partes distintas del arreglo."""
+        values = VALUES[:50] / 1e6
+        merged = StreamingReducer(operation)
+        for part in np.array_split(values, [7, 7, 30]):
+            reducer = StreamingReducer(operation)
+            reducer.update(part)
+            merged.merge(reducer)
+        expected = reduce_values(values, operation)
+        assert merged.count == len(values)
+        assert merged.result() == pytest.approx(expected, rel=1e-12)
+
+    def test_merge_other_operation(self):
+        """Prueba rechazar combinar reducciones distintas."""
+        with pytest.raises(ValueError):
+            StreamingReducer("sum").merge(StreamingReducer("min"))
+
+    def test_percentile_is_not_streaming(self):
+        """Prueba que el percentil no se acumule por bloques."""
+        with pytest.raises(ValueError):
+            StreamingReducer("percentile")
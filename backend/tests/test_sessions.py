@@ -0,0 +1,93 @@
+"""
+Tests para las sesiones interactivas.
+Prueba el acumulador, los mensajes inválidos y el máximo de sesiones.
+"""
+
+import json
+
+import pytest
+
+from app.calculator import Calculator
+from app.history import RingBufferHistory
+from app.sessions import Session, SessionManager
+
+
+class TestSession:
+    """Tests para el acumulador de una sesión."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator(history=RingBufferHistory(100))
+        self.session = Session("abc")
+
+    def test_running_total(self):
+        """Prueba aplicar operaciones sobre el acumulador."""
+        assert self.session.apply(self.calculator, {"operator": "+", "num2": 5}) == 5
+        assert self.session.apply(self.calculator, {"operator": "*", "num2": 3}) == 15
+        assert self.calculator.get_history_count() == 2
+
+    def test_set_num1(self):
+        """Prueba fijar el acumulador con num1, solo o con una operación."""
+        assert self.session.apply(self.calculator, {"num1": 10}) == 10
+        assert self.session.apply(self.calculator, {"num1": 2, "operator": "-", "num2": 3}) == -1
+
+    def test_clear(self):
+        """Prueba reiniciar el acumulador."""
+        self.session.apply(self.calculator, {"num1": 10})
+        assert self.session.apply(self.calculator, {"action": "clear"}) == 0
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            [1, 2],
+            {},
+            {"operator": "+"},
+            {"operator": "+", "num2": "5"},
+            {"operator": "+", "num2": True},
+            {"operator": "&", "num2": 1},
+            {"operator": "/", "num2": 0},
+        ],
+    )
+    def test_invalid_message_keeps_accumulator(self, message):
+        """Prueba que un mensaje inválido no cambie el acumulador."""
+        self.session.apply(self.calculator, {"num1": 7})
+        with pytest.raises(ValueError):
+            self.session.apply(self.calculator, message)
+        assert self.session.accumulator == 7
+
+    def test_handle(self):
+        """Prueba procesar mensajes de texto JSON."""
+        assert self.session.handle(self.calculator, json.dumps({"num1": 4})) == {"result": 4}
+        response = self.session.handle(self.calculator, "no es json")
+        assert response["result"] == 4
+        assert "error" in response
+
+
+class TestSessionManager:
+    """Tests para el registro de sesiones."""
+
+    def test_open_and_close(self):
+        """Prueba abrir y cerrar sesiones con identificadores únicos."""
+        manager = SessionManager(max_sessions=2)
+        first, second = manager.open(), manager.open()
+        assert first.session_id != second.session_id
+        assert len(manager) == 2
+        manager.close(first)
+        manager.close(first)
+        assert len(manager) == 1
+
+    def test_max_sessions(self):
+        """Prueba que se rechacen sesiones sobre el máximo."""
+        manager = SessionManager(max_sessions=1)
+        manager.open()
+        with pytest.raises(ValueError, match="máximo"):
+            manager.open()
+        assert manager.rejected == 1
+
+    def test_evict(self):
+        """Prueba cerrar una sesión por inactividad."""
+        manager = SessionManager()
+        session = manager.open()
+        manager.evict(session)
+        assert len(manager) == 0
+        assert manager.evicted == 1
@@ -0,0 +1,188 @@
+"""
+Tests unitarios para las estadísticas del historial.
+Prueba los agregados incrementales y su actualización al descartar operaciones.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from app.history import (
+    FileHistoryStore,
+    PartitionedHistory,
+    RingBufferHistory,
+    SQLiteHistoryStore,
+    current_client,
+)
+from app.stats import HistoryStats
+
+
+def expected_stats(rows):
+    """Calcula los agregados recorriendo todas las operaciones."""
+    results = [row["result"] for row in rows if np.isfinite(row["result"])]
+    operators = {}
+    for row in rows:
+        operators[row["operator"]] = operators.get(row["operator"], 0) + 1
+    return {
+        "count": len(rows),
+        "operators": operators,
+        "min": min(results) if results else None,
+        "max": max(results) if results else None,
+        "sum": sum(results),
+    }
+
+
+class TestHistoryStats:
+    """Tests para los agregados incrementales."""
+
+    def test_empty(self):
+        """Prueba los agregados sin operaciones."""
+        stats = HistoryStats().snapshot()
+        assert stats["count"] == 0
+        assert stats["mean"] is None
+        assert stats["min"] is None
+        assert stats["error_rate"] == 0.0
+
+    def test_add_and_remove(self):
+        """Prueba que descartar la más antigua actualice mínimo y máximo."""
+        stats = HistoryStats()
+        for operator, result in (("+", 1.0), ("*", 9.0), ("+", 5.0)):
+            stats.add(operator, result)
+        assert stats.snapshot()["min"] == 1.0
+        stats.remove("+", 1.0)
+        snapshot = stats.snapshot()
+        assert snapshot["operators"] == {"*": 1, "+": 1}
+        assert snapshot["min"] == 5.0
+        assert snapshot["max"] == 9.0
+        assert snapshot["mean"] == 7.0
+        stats.remove("*", 9.0)
+        assert stats.snapshot()["max"] == 5.0
+
+    def test_non_finite_results(self):
+        """Prueba que los resultados no finitos se cuenten pero no se sumen."""
+        stats = HistoryStats()
+        stats.add("*", float("inf"))
+        stats.add("+", 2.0)
+        snapshot = stats.snapshot()
+        assert snapshot["count"] == 2
+        assert snapshot["sum"] == 2.0
+        assert snapshot["max"] == 2.0
+
+    def test_error_rate(self):
+        """Prueba la tasa de error sobre los intentos registrados."""
+        stats = HistoryStats()
+        stats.add("+", 1.0)
+        stats.add("+", 2.0)
+        stats.add("+", 3.0)
+        stats.record_errors()
+        assert stats.snapshot()["error_rate"] == 0.25
+        stats.clear()
+        assert stats.snapshot()["errors"] == 0
+
+
+class TestRingBufferStats:
+    """Tests para las estadísticas del historial en memoria."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_full_scan(self, seed):
+        """Prueba que los agregados coincidan con recorrer la ventana."""
+        rng = random.Random(seed)
+        store = RingBufferHistory(capacity=50)
+        for _ in range(40):
+            if rng.random() < 0.5:
+                store.append(0, 0, rng.choice("+-"), rng.uniform(-100, 100))
+            else:
+                size = rng.randint(1, 80)
+                results = np.array([rng.uniform(-100, 100) for _ in range(size)])
+                operators = [rng.choice("+*/") for _ in range(size)]
+                store.extend(np.zeros(size), np.zeros(size), operators, results)
+
+            stats = store.stats()
+            expected = expected_stats(store.get_page())
+            assert stats["count"] == expected["count"]
+            assert stats["operators"] == expected["operators"]
+            assert stats["min"] == expected["min"]
+            assert stats["max"] == expected["max"]
+            assert stats["sum"] == pytest.approx(expected["sum"], abs=1e-9)
+
+    def test_errors_and_clear(self):
+        """Prueba registrar errores y reiniciar al limpiar."""
+        store = RingBufferHistory(capacity=2)
+        store.append(1, 2, "+", 3)
+        store.record_errors(3)
+        assert store.stats()["error_rate"] == 0.75
+        store.clear()
+        assert store.stats()["count"] == 0
+        assert store.stats()["errors"] == 0
+
+    def test_partitioned(self):
+        """Prueba que cada cliente vea las estadísticas de su partición."""
+        store = PartitionedHistory(lambda: RingBufferHistory(10))
+        token = current_client.set("a")
+        try:
+            store.append(1, 2, "+", 3)
+        finally:
+            current_client.reset(token)
+        assert store.stats()["count"] == 0
+        assert store.partitions() == 1
+
+
+class TestStoreStats:
+    """Tests para las estadísticas de los historiales en SQLite y en el log en disco."""
+
+    @pytest.fixture(params=["sqlite", "file"])
+    def make_store(self, request, tmp_path):
+        """Crea historiales del backend y los cierra al terminar."""
+        stores = []
+
+        def make(capacity):
+            if request.param == "sqlite":
+                store = SQLiteHistoryStore(str(tmp_path / "history.db"), capacity=capacity)
+            else:
+                store = FileHistoryStore(str(tmp_path / "history.log"), capacity=capacity)
+            stores.append(store)
+            return store
+
+        yield make
+        for store in stores:
+            store.close()
+
+    def test_matches_full_scan(self, make_store):
+        """Prueba que los agregados coincidan con recorrer la ventana."""
+        rng = random.Random(0)
+        store = make_store(50)
+        for _ in range(20):
+            size = rng.randint(1, 40)
+            results = np.array([rng.uniform(-100, 100) for _ in range(size)])
+            operators = [rng.choice("+*/") for _ in range(size)]
+            store.extend(np.zeros(size), np.zeros(size), operators, results)
+
+            stats = store.stats()
+            expected = expected_stats(store.get_page())
+            assert stats["count"] == expected["count"]
+            assert stats["operators"] == expected["operators"]
+            assert stats["min"] == expected["min"]
+            assert stats["max"] == expected["max"]
+            assert stats["sum"] == pytest.approx(expected["sum"], abs=1e-9)
+
+    def test_non_finite_results_excluded(self, make_store):
+        """Prueba que los resultados no finitos cuenten pero no entren en los agregados."""
+        store = make_store(10)
+        store.extend([1, 2], [1, 1], ["*", "+"], [float("inf"), 3])
+        stats = store.stats()
+        assert stats["count"] == 2
+        assert (stats["sum"], stats["mean"], stats["min"], stats["max"]) == (3, 3, 3, 3)
+
+    def test_errors_and_clear(self, make_store):
+        """Prueba registrar errores, contar las operaciones descartadas y reiniciar al limpiar."""
+        store = make_store(2)
+        store.extend([1, 2, 3], [1, 1, 1], ["+", "+", "+"], [2, 3, 4])
+        store.record_errors(1)
+        stats = store.stats()
+        assert stats["count"] == 2
+        assert stats["recorded"] == 3
+        assert stats["error_rate"] == 0.25
+        store.clear()
+        assert store.stats()["count"] == 0
+        assert store.stats()["errors"] == 0
+        assert store.stats()["mean"] is None
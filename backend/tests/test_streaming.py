@@ -0,0 +1,77 @@
+"""
+Tests unitarios para la evaluación en streaming (NDJSON).
+Prueba la separación en líneas, la evaluación y el reporte de errores por línea.
+"""
+
+import asyncio
+import json
+
+import pytest
+from app.calculator import Calculator
+from app.history import RingBufferHistory
+from app.streaming import evaluate_stream, iter_lines
+
+
+async def from_chunks(chunks):
+    """Convierte una lista de fragmentos en un iterable asíncrono."""
+    for chunk in chunks:
+        yield chunk
+
+
+def collect(stream):
+    """Ejecuta un generador asíncrono y retorna sus elementos."""
+
+    async def run():
+        return [item async for item in stream]
+
+    return asyncio.run(run())
+
+
+class TestIterLines:
+    """Tests para la separación en líneas."""
+
+    def test_lines_split_across_chunks(self):
+        """Prueba que una línea partida entre fragmentos se reconstruya."""
+        batches = collect(iter_lines(from_chunks([b'{"a":', b" 1}\n{", b'"b": 2}'])))
+        assert [line for batch in batches for line in batch] == [b'{"a": 1}', b'{"b": 2}']
+
+    def test_line_too_long(self):
+        """Prueba que una línea demasiado larga lance error."""
+        with pytest.raises(ValueError, match="demasiado larga"):
+            collect(iter_lines(from_chunks([b"x" * 20]), max_line_bytes=10))
+
+
+class TestEvaluateStream:
+    """Tests para la evaluación del stream."""
+
+    def setup_method(self):
+        """Configuración antes de cada test."""
+        self.calculator = Calculator(history=RingBufferHistory(capacity=100))
+
+    def evaluate(self, chunks):
+        output = b"".join(collect(evaluate_stream(self.calculator, from_chunks(chunks))))
+        return [json.loads(line) for line in output.splitlines()]
+
+    def test_results_per_line(self):
+        """Prueba que cada línea produzca su resultado."""
+        results = self.evaluate(
+            [b'{"num1": 10, "num2": 5, "operator": "+"}\n{"num1": 3, "num2": 2, "operator": "*"}\n']
+        )
+        assert results == [{"result": 15, "line": 1}, {"result": 6, "line": 2}]
+        assert self.calculator.get_history_count() == 2
+
+    def test_errors_do_not_stop_stream(self):
+        """Prueba que los errores se reporten por línea sin detener el stream."""
+        results = self.evaluate(
+            [
+                b'{"num1": 1, "num2": 0, "operator": "/"}\n',
+                b"no es json\n",
+                b'{"num1": 1, "operator": "+"}\n',
+                b"\n",
+                b'{"num1": 1, "num2": 1, "operator": "+"}',
+            ]
+        )
+        assert results[0] == {"error": "No se puede dividir por cero", "line": 1}
+        assert results[1]["line"] == 2 and "error" in results[1]
+        assert results[2] == {"error": "Falta el campo 'num2'", "line": 3}
+        assert results[3] == {"result": 2, "line": 5}